@@ -25,6 +25,7 @@ from gi.repository import Gio
 from gi.repository import GLib
 
 from jarabe import config
+from jarabe.model import launchtimes
 from jarabe.model.network import get_wireless_interfaces
 
 
@@ -104,6 +105,14 @@ def print_build_number():
     print(get_build_number())
 
 
+def get_launch_times():
+    return launchtimes.get_instance().format_statistics()
+
+
+def print_launch_times():
+    print(get_launch_times())
+
+
 def get_firmware_number():
     firmware_no = _read_device_tree('openprom/model')
     if firmware_no is not None:
@@ -19,6 +19,8 @@
 
 import os
 import logging
+import time
+from collections import deque
 from gettext import gettext as _
 
 from gi.repository import GLib
@@ -37,12 +39,16 @@ from sugar3.graphics.scrollingdetector import ScrollingDetector
 from sugar3.graphics.palettewindow import TreeViewInvoker
 from sugar3.datastore import datastore
 
+from jarabe.model import activitysearch
 from jarabe.model import bundleregistry
 from jarabe.model import desktop
 from jarabe.view.palettes import ActivityPalette
 from jarabe.journal import misc
 from jarabe.util.normalize import normalize_string
 
+# Activities added to the list model per main loop iteration
+_POPULATE_SLICE = 20
+
 
 class ActivitiesTreeView(Gtk.TreeView):
     __gtype_name__ = 'SugarActivitiesTreeView'
@@ -57,6 +63,7 @@ class ActivitiesTreeView(Gtk.TreeView):
         self.set_can_focus(False)
 
         self._query = ''
+        self._matches = None
 
         self.set_headers_visible(False)
         self.add_events(Gdk.EventMask.BUTTON_PRESS_MASK |
@@ -68,6 +75,7 @@ class ActivitiesTreeView(Gtk.TreeView):
         self._model = ListModel()
         self._model.set_visible_func(self.__model_visible_cb)
         self.set_model(self._model)
+        self.connect('map', self.__map_cb)
 
         self._favorite_columns = []
         for i in range(desktop.get_number_of_views()):
@@ -85,8 +93,7 @@ class ActivitiesTreeView(Gtk.TreeView):
 
         column = Gtk.TreeViewColumn()
         column.pack_start(self.cell_icon, True)
-        column.add_attribute(self.cell_icon, 'file-name',
-                             self._model.column_icon)
+        column.set_cell_data_func(self.cell_icon, self.__icon_set_data_cb)
         self.append_column(column)
 
         self._icon_column = column
@@ -129,8 +136,8 @@ class ActivitiesTreeView(Gtk.TreeView):
         self.date_column.props.expand = True
         self.date_column.set_sort_column_id(self._model.column_date)
         self.date_column.pack_start(cell_text, True)
-        self.date_column.add_attribute(cell_text, 'text',
-                                       self._model.column_date_text)
+        self.date_column.set_cell_data_func(cell_text,
+                                            self.__date_set_data_cb)
         self.append_column(self.date_column)
 
         self.set_search_column(self._model.column_title)
@@ -157,6 +164,17 @@ class ActivitiesTreeView(Gtk.TreeView):
                 'button-release-event', self.__button_release_cb)
             self._row_activated_armed_path = None
 
+    def __map_cb(self, widget):
+        self._model.populate()
+
+    def __icon_set_data_cb(self, column, cell, model, tree_iter, data):
+        cell.props.file_name = self._model.get_icon(
+            model[tree_iter][self._model.column_bundle_id])
+
+    def __date_set_data_cb(self, column, cell, model, tree_iter, data):
+        timestamp = model[tree_iter][self._model.column_date]
+        cell.props.text = util.timestamp_to_elapsed_string(timestamp)
+
     def __favorite_set_data_cb(self, column, cell, model, tree_iter, data):
         favorite = \
             model[tree_iter][self._model.column_favorites[cell.favorite_view]]
@@ -246,16 +264,19 @@ class ActivitiesTreeView(Gtk.TreeView):
         if isinstance(query, bytes):
             query = query.decode()
         self._query = normalize_string(query)
+        if self._query:
+            self._model.populate_now()
+            self._matches = activitysearch.get_index().get_scores(self._query)
+        else:
+            self._matches = None
         self.get_model().refilter()
         matches = self.get_model().iter_n_children(None)
         return matches
 
     def __model_visible_cb(self, model, tree_iter, data):
-        title = model[tree_iter][self._model.column_title]
-        if isinstance(title, bytes):
-            title = title.decode('utf-8')
-        title = normalize_string(title)
-        return title is not None and title.find(self._query) > -1
+        if self._matches is None:
+            return True
+        return model[tree_iter][self._model.column_bundle_id] in self._matches
 
     def create_palette(self, path, column):
         if column == self._icon_column:
@@ -272,11 +293,16 @@ class ActivitiesTreeView(Gtk.TreeView):
         self.emit('erase-activated', bundle_id)
 
     def get_activities_selected(self):
+        self._model.populate_now()
         activities = []
         for row in self.get_model():
             activities.append(
                 {'name': row[self.get_model().column_activity_name],
                  'bundle_id': row[self.get_model().column_bundle_id]})
+        if self._matches:
+            # Best matches first, in the order of the list otherwise
+            activities.sort(
+                key=lambda activity: -self._matches[activity['bundle_id']])
         return activities
 
     def run_activity(self, bundle_id, resume_mode):
@@ -327,15 +353,13 @@ class ListModel(Gtk.TreeModelSort):
         self.column_favorites = []
         for i in range(desktop.get_number_of_views()):
             self.column_favorites.append(self.column_bundle_id + i + 1)
-        self.column_icon = self.column_favorites[-1] + 1
-        self.column_title = self.column_icon + 1
+        self.column_title = self.column_favorites[-1] + 1
         self.column_version = self.column_title + 1
         self.column_version_text = self.column_version + 1
         self.column_date = self.column_version_text + 1
-        self.column_date_text = self.column_date + 1
-        self.column_activity_name = self.column_date_text + 1
+        self.column_activity_name = self.column_date + 1
 
-        column_types = [str, str, str, str, str, int, str, str]
+        column_types = [str, str, str, str, int, str]
         for i in range(desktop.get_number_of_views()):
             column_types.insert(1, bool)
 
@@ -345,15 +369,57 @@ class ListModel(Gtk.TreeModelSort):
         Gtk.TreeModelSort.__init__(self, model=self._model_filter)
         self.set_sort_column_id(self.column_title, Gtk.SortType.ASCENDING)
 
-        GLib.idle_add(self.__connect_to_bundle_registry_cb)
+        # The rows are added when the list is shown for the first time
+        self._pending_activities = None
+        self._populate_sid = None
+        self._populate_start = None
+        self._activity_keys = set()
+        self._icons = {}
+
+    def populate(self):
+        """Add the installed activities in idle slices, only once"""
+        if self._pending_activities is not None:
+            return
 
-    def __connect_to_bundle_registry_cb(self):
         registry = bundleregistry.get_registry()
-        for info in registry:
-            self._add_activity(info)
+        self._populate_start = time.time()
+        self._pending_activities = deque(registry)
         registry.connect('bundle-added', self.__activity_added_cb)
         registry.connect('bundle-changed', self.__activity_changed_cb)
         registry.connect('bundle-removed', self.__activity_removed_cb)
+        self._populate_sid = GLib.idle_add(self.__populate_cb)
+
+    def populate_now(self):
+        """Add the activities not added yet without waiting"""
+        self.populate()
+        while self._pending_activities:
+            self._add_activity(self._pending_activities.popleft())
+        self._populated()
+
+    def __populate_cb(self):
+        for i in range(_POPULATE_SLICE):
+            if not self._pending_activities:
+                self._populated()
+                return False
+            self._add_activity(self._pending_activities.popleft())
+        return True
+
+    def _populated(self):
+        if self._populate_sid is None:
+            return
+        GLib.source_remove(self._populate_sid)
+        self._populate_sid = None
+        logging.debug('STARTUP: Activities list populated with %d '
+                      'activities in %.3f s', len(self._activity_keys),
+                      time.time() - self._populate_start)
+
+    def get_icon(self, bundle_id):
+        if bundle_id not in self._icons:
+            bundle = bundleregistry.get_registry().get_bundle(bundle_id)
+            if bundle is None:
+                return None
+            self._icons[bundle_id] = bundle.get_icon()
+        return self._icons[bundle_id]
 
     def __activity_added_cb(self, activity_registry, activity_info):
         self._add_activity(activity_info)
@@ -361,6 +427,7 @@ class ListModel(Gtk.TreeModelSort):
     def __activity_changed_cb(self, activity_registry, activity_info):
         bundle_id = activity_info.get_bundle_id()
         version = activity_info.get_activity_version()
+        self._icons.pop(bundle_id, None)
         favorites = []
         for i in range(desktop.get_number_of_views()):
             favorites.append(
@@ -375,6 +442,12 @@ class ListModel(Gtk.TreeModelSort):
     def __activity_removed_cb(self, activity_registry, activity_info):
         bundle_id = activity_info.get_bundle_id()
         version = activity_info.get_activity_version()
+        self._icons.pop(bundle_id, None)
+        if activity_info in self._pending_activities:
+            self._pending_activities.remove(activity_info)
+        if (bundle_id, version) not in self._activity_keys:
+            return
+        self._activity_keys.remove((bundle_id, version))
         for row in self._model:
             if row[self.column_bundle_id] == bundle_id and \
                     row[self.column_version] == version:
@@ -391,6 +464,12 @@ class ListModel(Gtk.TreeModelSort):
         timestamp = activity_info.get_installation_time()
         version = activity_info.get_activity_version()
 
+        # Bundles added while the model is being populated
+        key = (activity_info.get_bundle_id(), version)
+        if key in self._activity_keys:
+            return
+        self._activity_keys.add(key)
+
         registry = bundleregistry.get_registry()
         favorites = []
         for i in range(desktop.get_number_of_views()):
@@ -411,12 +490,10 @@ class ListModel(Gtk.TreeModelSort):
         model_list = [activity_info.get_bundle_id()]
         for i in range(desktop.get_number_of_views()):
             model_list.append(favorites[i])
-        model_list.append(activity_info.get_icon())
         model_list.append(title)
         model_list.append(version)
         model_list.append(_('Version %s') % version)
         model_list.append(int(timestamp))
-        model_list.append(util.timestamp_to_elapsed_string(timestamp))
         model_list.append(activity_info.get_name())
         self._model.append(model_list)
 
@@ -549,7 +626,8 @@ class ActivitiesList(Gtk.VBox):
 
     def set_filter(self, query):
         matches = self._tree_view.set_filter(query)
-        if matches == 0:
+        # Without a query the list may still be populating
+        if matches == 0 and query:
             self._show_clear_message()
         else:
             self._hide_clear_message()
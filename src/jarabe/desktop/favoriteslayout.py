@@ -17,6 +17,7 @@
 import logging
 import math
 import hashlib
+from collections import OrderedDict
 from gettext import gettext as _
 
 from gi.repository import Gdk
@@ -295,6 +296,7 @@ _RADIUS_GROWTH_FACTOR = 1.25
 _MIMIMUM_RADIUS_PADDING_FACTOR = 0.85
 _MAXIMUM_RADIUS_PADDING_FACTOR = 1.25
 _INITIAL_ANGLE = math.pi
+_POSITIONS_CACHE_SIZE = 8
 
 
 class RingLayout(ViewLayout):
@@ -312,6 +314,14 @@ class RingLayout(ViewLayout):
     def __init__(self):
         ViewLayout.__init__(self)
         self._spiral_mode = False
+        # (children count, width, height, screen height) to the icon size
+        # and the positions of the icons, most recently used last
+        self._positions = OrderedDict()
+        # child to the icon size it was given and its preferred size
+        self._child_sizes = {}
+
+    def remove(self, child):
+        self._child_sizes.pop(child, None)
 
     def _calculate_radius_and_icon_size(self, children_count):
         """ Adjust the ring or spiral radius and icon size as needed. """
@@ -375,8 +385,8 @@ class RingLayout(ViewLayout):
             style.DEFAULT_SPACING
         return r - (icon_size * _MAXIMUM_RADIUS_PADDING_FACTOR)
 
-    def _calculate_angle_and_radius(self, icon_count, icon_size):
-        """ Based on icon_count and icon_size, calculate radius and angle. """
+    def _iterate_angles_and_radii(self, icon_size):
+        """ Yield the angle and radius of each icon, starting at the first. """
         if self._spiral_mode:
             _icon_spacing_factor = _SPIRAL_SPACING_FACTOR
         else:
@@ -390,26 +400,59 @@ class RingLayout(ViewLayout):
         angle = _INITIAL_ANGLE
         radius = _MINIMUM_RADIUS + (icon_spacing *
                                     _MIMIMUM_RADIUS_PADDING_FACTOR)
-        for i_ in range(icon_count):
+        while True:
+            yield angle, radius
             circumference = radius * 2 * math.pi
             n = circumference / icon_spacing
             angle += (2 * math.pi / n)
             radius += (float(icon_spacing) * _RADIUS_GROWTH_FACTOR / n)
-        return angle, radius
+
+    def _calculate_angle_and_radius(self, icon_count, icon_size):
+        """ Based on icon_count and icon_size, calculate radius and angle. """
+        for i, (angle, radius) in enumerate(
+                self._iterate_angles_and_radii(icon_size)):
+            if i == icon_count:
+                return angle, radius
+
+    def _calculate_positions(self, children_count, width, height):
+        """ Calculate the icon size and the position of every icon. """
+        radius, icon_size = self._calculate_radius_and_icon_size(
+            children_count)
+        if self._spiral_mode:
+            # Walk the spiral once rather than once per icon
+            positions = []
+            for i_, (angle, radius) in zip(
+                    range(children_count),
+                    self._iterate_angles_and_radii(icon_size)):
+                x, y = self._convert_from_polar_to_cartesian(
+                    angle, radius, icon_size, width, height)
+                positions.append((int(x), int(y)))
+        else:
+            positions = [self._calculate_position(radius, icon_size, n,
+                                                  children_count, width,
+                                                  height)
+                         for n in range(children_count)]
+        return icon_size, positions
+
+    def _get_positions(self, children_count, width, height):
+        key = (children_count, width, height, Gdk.Screen.height())
+        positions = self._positions.pop(key, None)
+        if positions is None:
+            positions = self._calculate_positions(children_count, width,
+                                                  height)
+        self._positions[key] = positions
+        if len(self._positions) > _POSITIONS_CACHE_SIZE:
+            self._positions.popitem(last=False)
+        return positions
 
     def allocate_children(self, allocation, children):
-        radius, icon_size = self._calculate_radius_and_icon_size(len(children))
+        height = allocation.height + allocation.y
+        icon_size, positions = self._get_positions(len(children),
+                                                   allocation.width, height)
 
         children.sort(key=lambda x: (
             x.get_activity_name().lower(), x.get_activity_name()))
-        height = allocation.height + allocation.y
-        for n in range(len(children)):
-            child = children[n]
-
-            x, y = self._calculate_position(radius, icon_size, n,
-                                            len(children), allocation.width,
-                                            height)
-
+        for child, (x, y) in zip(children, positions):
             # This container may be offset from the top by a certain amount
             # (e.g. for an alert). Adjust the center-point for that
             y -= allocation.y
@@ -418,9 +461,15 @@ class RingLayout(ViewLayout):
             # coordinate for the top of the icon.
             y += icon_size / 2
 
-            child.set_size(icon_size)
-            new_width = child.get_preferred_width()[0]
-            new_height = child.get_preferred_height()[0]
+            previous = self._child_sizes.get(child)
+            if previous is not None and previous[0] == icon_size:
+                new_width, new_height = previous[1:]
+            else:
+                child.set_size(icon_size)
+                new_width = child.get_preferred_width()[0]
+                new_height = child.get_preferred_height()[0]
+                self._child_sizes[child] = (icon_size, new_width, new_height)
+
             child_allocation = Gdk.Rectangle()
             child_allocation.x = allocation.x + x
             child_allocation.y = allocation.y + y
@@ -481,6 +530,12 @@ class SunflowerLayout(RingLayout):
         """Stub out this method; not used in `SunflowerLayout`."""
         return None, style.STANDARD_ICON_SIZE
 
+    def _calculate_positions(self, children_count, width, height):
+        # The indices skipped depend on the size of the allocation
+        self.skipped_indices = []
+        return RingLayout._calculate_positions(self, children_count, width,
+                                               height)
+
     def adjust_index(self, i):
         """Skip floret indices which end up outside the desired bounding box.
         """
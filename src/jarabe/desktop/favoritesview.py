@@ -45,6 +45,7 @@ from jarabe.view.buddyicon import BuddyIcon
 from jarabe.view.buddymenu import BuddyMenu
 from jarabe.model.buddy import get_owner_instance
 from jarabe.model import shell
+from jarabe.model import activitysearch
 from jarabe.model import bundleregistry
 from jarabe.model import desktop
 from jarabe.journal import misc
@@ -53,7 +54,6 @@ from jarabe.desktop import schoolserver
 from jarabe.desktop.schoolserver import RegisterError
 from jarabe.desktop import favoriteslayout
 from jarabe.desktop.viewcontainer import ViewContainer
-from jarabe.util.normalize import normalize_string
 
 _logger = logging.getLogger('FavoritesView')
 
@@ -354,30 +354,31 @@ class FavoritesView(ViewContainer):
                                        self._box.favorite_view):
             self._add_activity(activity_info)
 
-    def set_filter(self, query):
+    def _get_scores(self, query):
         query = query.strip()
+        if not query:
+            return None
+        return activitysearch.get_index().get_scores(query)
+
+    def set_filter(self, query):
+        scores = self._get_scores(query)
         for icon in self.get_children():
             if icon not in [self._owner_icon, self._activity_icon]:
-                activity_name = icon.get_activity_name()
-                if isinstance(activity_name, bytes):
-                    activity_name = activity_name.decode()
-                normalized_name = normalize_string(activity_name)
-                if normalized_name.find(query) > -1:
+                if scores is None or icon.bundle_id in scores:
                     icon.alpha = 1.0
                 else:
                     icon.alpha = 0.33
 
     def _get_selected(self, query):
-        query = query.strip()
+        scores = self._get_scores(query)
         selected = []
         for icon in self.get_children():
             if icon not in [self._owner_icon, self._activity_icon]:
-                activity_name = icon.get_activity_name()
-                if isinstance(activity_name, bytes):
-                    activity_name = activity_name.decode()
-                normalized_name = normalize_string(activity_name)
-                if normalized_name.find(query) > -1:
+                if scores is None or icon.bundle_id in scores:
                     selected.append(icon)
+        if scores:
+            # Best matches first
+            selected.sort(key=lambda icon: -scores[icon.bundle_id])
         return selected
 
     def __register_activate_cb(self, icon):
@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import random
+from collections import OrderedDict
 
 from gi.repository import GObject
 from gi.repository import Gdk
@@ -27,6 +28,67 @@ _PLACE_TRIALS = 20
 _MAX_WEIGHT = 255
 _REFRESH_RATE = 200
 _MAX_COLLISIONS_PER_REFRESH = 20
+# Furthest a colliding child is moved at once, in cells
+_MAX_SHIFT = 64
+# Side of the buckets of the spatial index, in cells
+_BUCKET_SIZE = 16
+# The placement of new children is the same at every start
+_RANDOM_SEED = 0
+
+# Right, left, bottom, top and then the diagonals
+_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1),
+               (1, 1), (-1, 1), (1, -1), (-1, -1)]
+
+
+def _intersects(rect, other):
+    return rect.x < other.x + other.width and \
+        other.x < rect.x + rect.width and \
+        rect.y < other.y + other.height and \
+        other.y < rect.y + rect.height
+
+
+class _SpatialIndex(object):
+    """Finds the children whose rectangles intersect a rectangle
+
+    The grid is divided in square buckets holding the children whose
+    rectangle overlaps them, so only the children close to a rectangle
+    are checked.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+
+    def _get_buckets(self, rect):
+        first_x = int(rect.x) // _BUCKET_SIZE
+        first_y = int(rect.y) // _BUCKET_SIZE
+        last_x = int(rect.x + rect.width) // _BUCKET_SIZE
+        last_y = int(rect.y + rect.height) // _BUCKET_SIZE
+        for x in range(first_x, last_x + 1):
+            for y in range(first_y, last_y + 1):
+                yield (x, y)
+
+    def add(self, child, rect):
+        for bucket in self._get_buckets(rect):
+            self._buckets.setdefault(bucket, set()).add(child)
+
+    def remove(self, child, rect):
+        for bucket in self._get_buckets(rect):
+            children = self._buckets.get(bucket)
+            if children is not None:
+                children.discard(child)
+                if not children:
+                    del self._buckets[bucket]
+
+    def get_intersecting(self, rect, rects):
+        """Return the children intersecting rect, rects maps them to
+        their rectangle
+        """
+        found = set()
+        for bucket in self._get_buckets(rect):
+            for child in self._buckets.get(bucket, ()):
+                if child not in found and _intersects(rect, rects[child]):
+                    found.add(child)
+        return found
 
 
 class Grid(SugarExt.Grid):
@@ -40,9 +102,15 @@ class Grid(SugarExt.Grid):
 
         self._children = []
         self._child_rects = {}
+        # Order in which the children were added
+        self._child_serials = {}
+        self._next_serial = 0
+        self._index = _SpatialIndex()
         self._locked_children = set()
-        self._collisions = []
+        # Children to move, in order, the values are not used
+        self._collisions = OrderedDict()
         self._collisions_sid = 0
+        self._random = random.Random(_RANDOM_SEED)
 
         self.setup(width, height)
 
@@ -59,8 +127,8 @@ class Grid(SugarExt.Grid):
             weight = _MAX_WEIGHT
             while trials > 0 and weight:
                 rect = Gdk.Rectangle()
-                rect.x = int(random.random() * (self.width - width))
-                rect.y = int(random.random() * (self.height - height))
+                rect.x = int(self._random.random() * (self.width - width))
+                rect.y = int(self._random.random() * (self.height - height))
                 rect.width = width
                 rect.height = height
                 new_weight = self.compute_weight(rect)
@@ -71,6 +139,9 @@ class Grid(SugarExt.Grid):
 
         self._child_rects[child] = rect
         self._children.append(child)
+        self._child_serials[child] = self._next_serial
+        self._next_serial += 1
+        self._index.add(child, rect)
         self.add_weight(self._child_rects[child])
         if locked:
             self._locked_children.add(child)
@@ -79,19 +150,21 @@ class Grid(SugarExt.Grid):
             self._detect_collisions(child)
 
     def is_in_grid(self, child):
-        return child in self._children
+        return child in self._child_rects
 
     def remove(self, child):
         self._children.remove(child)
         self.remove_weight(self._child_rects[child])
+        self._index.remove(child, self._child_rects[child])
         self._locked_children.discard(child)
         del self._child_rects[child]
+        del self._child_serials[child]
 
-        if child in self._collisions:
-            self._collisions.remove(child)
+        self._collisions.pop(child, None)
 
     def move(self, child, x, y, locked=False):
         self.remove_weight(self._child_rects[child])
+        self._index.remove(child, self._child_rects[child])
 
         rect = self._child_rects[child]
         rect.x = x
@@ -99,6 +172,7 @@ class Grid(SugarExt.Grid):
 
         weight = self.compute_weight(rect)
         self.add_weight(self._child_rects[child])
+        self._index.add(child, rect)
 
         if locked:
             self._locked_children.add(child)
@@ -109,69 +183,48 @@ class Grid(SugarExt.Grid):
             self._detect_collisions(child)
 
     def _shift_child(self, child, weight):
-        rect = self._child_rects[child]
-
-        new_rects = []
-
-        def _create_rectangle(x, y, width, height):
-            rect = Gdk.Rectangle()
-            rect.x, rect.y = x, y
-            rect.width, rect.height = width, height
-            return rect
-
-        # Get rects right, left, bottom and top
-        if (rect.x + rect.width < self.width - 1):
-            new_rects.append(_create_rectangle(rect.x + 1, rect.y,
-                                               rect.width, rect.height))
-
-        if (rect.x - 1 > 0):
-            new_rects.append(_create_rectangle(rect.x - 1, rect.y,
-                                               rect.width, rect.height))
-
-        if (rect.y + rect.height < self.height - 1):
-            new_rects.append(_create_rectangle(rect.x, rect.y + 1,
-                                               rect.width, rect.height))
-
-        if (rect.y - 1 > 0):
-            new_rects.append(_create_rectangle(rect.x, rect.y - 1,
-                                               rect.width, rect.height))
-
-        # Get diagonal rects
-        if rect.x + rect.width < self.width - 1 and \
-                rect.y + rect.height < self.height - 1:
-            new_rects.append(_create_rectangle(rect.x + 1, rect.y + 1,
-                                               rect.width, rect.height))
-
-        if rect.x - 1 > 0 and rect.y + rect.height < self.height - 1:
-            new_rects.append(_create_rectangle(rect.x - 1, rect.y + 1,
-                                               rect.width, rect.height))
-
-        if rect.x + rect.width < self.width - 1 and rect.y - 1 > 0:
-            new_rects.append(_create_rectangle(rect.x + 1, rect.y - 1,
-                                               rect.width, rect.height))
+        """Look for a position with less weight around the child
 
-        if rect.x - 1 > 0 and rect.y - 1 > 0:
-            new_rects.append(_create_rectangle(rect.x - 1, rect.y - 1,
-                                               rect.width, rect.height))
-
-        random.shuffle(new_rects)
+        Positions further and further away are tried in a fixed order, up
+        to _MAX_SHIFT cells, and the search stops at the first free one.
+        """
+        rect = self._child_rects[child]
+        max_x = self.width - 1 - rect.width
+        max_y = self.height - 1 - rect.height
 
         best_rect = None
-        for new_rect in new_rects:
-            new_weight = self.compute_weight(new_rect)
-            if new_weight < weight:
-                best_rect = new_rect
-                weight = new_weight
+        for distance in range(1, _MAX_SHIFT + 1):
+            for dx, dy in _DIRECTIONS:
+                x = rect.x + dx * distance
+                y = rect.y + dy * distance
+                if not (0 < x <= max_x and 0 < y <= max_y):
+                    continue
+
+                new_rect = Gdk.Rectangle()
+                new_rect.x, new_rect.y = x, y
+                new_rect.width, new_rect.height = rect.width, rect.height
+                new_weight = self.compute_weight(new_rect)
+                if new_weight < weight:
+                    best_rect = new_rect
+                    weight = new_weight
+                    if weight == 0:
+                        break
+            if weight == 0:
+                break
 
         if best_rect:
             self._child_rects[child] = best_rect
-            weight = self._shift_child(child, weight)
 
         return weight
 
-    def __solve_collisions_cb(self):
-        for i_ in range(_MAX_COLLISIONS_PER_REFRESH):
-            collision = self._collisions.pop(0)
+    def _solve_collisions(self, max_collisions):
+        """Move up to max_collisions colliding children, return True if
+        there are collisions left
+        """
+        for i_ in range(max_collisions):
+            if not self._collisions:
+                return False
+            collision, value_ = self._collisions.popitem(last=False)
 
             old_rect = self._child_rects[collision]
             self.remove_weight(old_rect)
@@ -179,35 +232,34 @@ class Grid(SugarExt.Grid):
             weight = self._shift_child(collision, weight)
             self.add_weight(self._child_rects[collision])
 
-            # TODO: we shouldn't give up the first time we failed to find a
-            # better position.
-            if old_rect != self._child_rects[collision]:
+            if old_rect is not self._child_rects[collision]:
+                self._index.remove(collision, old_rect)
+                self._index.add(collision, self._child_rects[collision])
                 self._detect_collisions(collision)
                 self.emit('child-changed', collision)
                 if weight > 0:
-                    self._collisions.append(collision)
+                    self._collisions[collision] = None
 
-            if not self._collisions:
-                self._collisions_sid = 0
-                return False
+        return bool(self._collisions)
 
-        return True
+    def __solve_collisions_cb(self):
+        if self._solve_collisions(_MAX_COLLISIONS_PER_REFRESH):
+            return True
+
+        self._collisions_sid = 0
+        return False
 
     def _detect_collisions(self, child):
-        collision_found = False
         child_rect = self._child_rects[child]
-        for c in self._children:
-            intersects_, intersection = Gdk.rectangle_intersect(
-                child_rect, self._child_rects[c])
-            if c != child and intersection.width > 0:
-                collision_found = True
-                if (c not in self._locked_children and
-                        c not in self._collisions):
-                    self._collisions.append(c)
-
-        if collision_found:
-            if child not in self._collisions:
-                self._collisions.append(child)
+        colliding = self._index.get_intersecting(child_rect,
+                                                 self._child_rects)
+        colliding.discard(child)
+        for c in sorted(colliding, key=self._child_serials.get):
+            if c not in self._locked_children:
+                self._collisions[c] = None
+
+        if colliding:
+            self._collisions[child] = None
 
         if self._collisions and not self._collisions_sid:
             self._collisions_sid = \
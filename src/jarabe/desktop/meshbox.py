@@ -21,6 +21,7 @@ import logging
 
 import dbus
 from gi.repository import GObject
+from gi.repository import GLib
 from gi.repository import Gio
 
 from sugar3.graphics.icon import Icon
@@ -49,6 +50,10 @@ from jarabe.journal import misc
 
 _FILTERED_ALPHA = 0.33
 
+# Milliseconds the changes of the neighborhood are collected for, before
+# they are shown together
+_UPDATE_INTERVAL = 100
+
 
 class _ActivityIcon(CanvasIcon):
 
@@ -198,17 +203,22 @@ class DeviceObserver(GObject.GObject):
                                       path=device.object_path,
                                       dbus_interface=network.NM_WIRELESS_IFACE)
 
+    def _get_access_point(self, access_point_o):
+        # Bind the proxy to the unique name the device already resolved,
+        # which needs no call to the bus
+        return self._bus.get_object(self.device.bus_name, access_point_o,
+                                    introspect=False)
+
     def _get_access_points_reply_cb(self, access_points_o):
         for ap_o in access_points_o:
-            ap = self._bus.get_object(network.NM_SERVICE, ap_o)
-            self.emit('access-point-added', ap)
+            self.emit('access-point-added', self._get_access_point(ap_o))
 
     def _get_access_points_error_cb(self, err):
         logging.error('Failed to get access points: %s', err)
 
     def __access_point_added_cb(self, access_point_o):
-        ap = self._bus.get_object(network.NM_SERVICE, access_point_o)
-        self.emit('access-point-added', ap)
+        self.emit('access-point-added',
+                  self._get_access_point(access_point_o))
 
     def __access_point_removed_cb(self, access_point_o):
         self.emit('access-point-removed', access_point_o)
@@ -246,6 +256,8 @@ class NetworkManagerObserver(object):
         try:
             self._bus = dbus.SystemBus()
             self._netmgr = network.get_manager()
+            # Start loading the saved connections
+            network.get_connections()
         except dbus.DBusException:
             logging.debug('NetworkManager not available')
             return
@@ -376,6 +388,7 @@ class MeshBox(ViewContainer):
         self._adhoc_networks = []
 
         self._model = neighborhood.get_model()
+        # key or activity id to the model and the icon shown for it
         self._buddies = {}
         self._activities = {}
         self._mesh = []
@@ -383,6 +396,12 @@ class MeshBox(ViewContainer):
         self._suspended = True
         self._query = ''
 
+        # key or activity id to the model and whether it is still in the
+        # neighborhood, for the changes not shown yet
+        self._pending_buddies = {}
+        self._pending_activities = {}
+        self._update_sid = None
+
         toolbar.connect('query-changed', self._toolbar_query_changed_cb)
         toolbar.search_entry.connect('icon-press',
                                      self.__clear_icon_pressed_cb)
@@ -417,48 +436,85 @@ class MeshBox(ViewContainer):
     def _add_buddy(self, buddy_model):
         buddy_model.connect('notify::current-activity',
                             self.__buddy_notify_current_activity_cb)
-        if buddy_model.props.current_activity is not None:
-            return
-        if buddy_model.is_owner():
-            return
-        icon = BuddyIcon(buddy_model)
-        self.add(icon)
-        icon.show()
-
-        if hasattr(icon, 'set_filter'):
-            icon.set_filter(self._query)
-
-        self._buddies[buddy_model.props.key] = icon
+        self._queue_update(self._pending_buddies, buddy_model.props.key,
+                           buddy_model, True)
 
     def _remove_buddy(self, buddy_model):
-        logging.debug('MeshBox._remove_buddy')
-        icon = self._buddies[buddy_model.props.key]
-        self.remove(icon)
-        del self._buddies[buddy_model.props.key]
+        buddy_model.disconnect_by_func(
+            self.__buddy_notify_current_activity_cb)
+        self._queue_update(self._pending_buddies, buddy_model.props.key,
+                           buddy_model, False)
 
     def __buddy_notify_current_activity_cb(self, buddy_model, pspec):
         logging.debug('MeshBox.__buddy_notify_current_activity_cb %s',
                       buddy_model.props.current_activity)
-        if buddy_model.props.current_activity is None:
-            if buddy_model.props.key not in self._buddies:
-                self._add_buddy(buddy_model)
-        elif buddy_model.props.key in self._buddies:
-            self._remove_buddy(buddy_model)
+        self._queue_update(self._pending_buddies, buddy_model.props.key,
+                           buddy_model, True)
 
     def _add_activity(self, activity_model):
-        icon = ActivityView(activity_model)
-        self.add(icon)
-        icon.show()
+        self._queue_update(self._pending_activities,
+                           activity_model.activity_id, activity_model, True)
 
-        if hasattr(icon, 'set_filter'):
-            icon.set_filter(self._query)
+    def _remove_activity(self, activity_model):
+        self._queue_update(self._pending_activities,
+                           activity_model.activity_id, activity_model, False)
+
+    def _queue_update(self, pending, key, model, in_neighborhood):
+        # Only the last change of each buddy or activity matters
+        pending[key] = (model, in_neighborhood)
+        if self._update_sid is None and not self._suspended:
+            self._update_sid = GLib.timeout_add(_UPDATE_INTERVAL,
+                                                self.__update_cb)
+
+    def __update_cb(self):
+        self._update_sid = None
+        self._apply_updates()
+        return False
+
+    def _apply_updates(self):
+        """Show the changes of the neighborhood since the last update"""
+        if self._update_sid is not None:
+            GLib.source_remove(self._update_sid)
+            self._update_sid = None
+
+        pending_buddies = self._pending_buddies
+        pending_activities = self._pending_activities
+        self._pending_buddies = {}
+        self._pending_activities = {}
+
+        for key, (buddy_model, in_neighborhood) in pending_buddies.items():
+            shown = in_neighborhood and \
+                buddy_model.props.current_activity is None and \
+                not buddy_model.is_owner()
+            self._update_icon(self._buddies, key, buddy_model, shown,
+                              BuddyIcon)
+
+        for activity_id, (activity_model, in_neighborhood) in \
+                pending_activities.items():
+            self._update_icon(self._activities, activity_id, activity_model,
+                              in_neighborhood, ActivityView)
+
+        if pending_buddies or pending_activities:
+            logging.debug('MeshBox updated %d buddies and %d activities',
+                          len(pending_buddies), len(pending_activities))
+
+    def _update_icon(self, icons, key, model, shown, icon_class):
+        if key in icons:
+            shown_model, icon = icons[key]
+            if shown and shown_model is model:
+                return
+            self.remove(icon)
+            del icons[key]
 
-        self._activities[activity_model.activity_id] = icon
+        if shown:
+            icon = icon_class(model)
+            self.add(icon)
+            icon.show()
 
-    def _remove_activity(self, activity_model):
-        icon = self._activities[activity_model.activity_id]
-        self.remove(icon)
-        del self._activities[activity_model.activity_id]
+            if hasattr(icon, 'set_filter'):
+                icon.set_filter(self._query)
+
+            icons[key] = (model, icon)
 
     # add AP to its corresponding network icon on the desktop,
     # creating one if it doesn't already exist
@@ -601,12 +657,17 @@ class MeshBox(ViewContainer):
     def suspend(self):
         if not self._suspended:
             self._suspended = True
+            if self._update_sid is not None:
+                GLib.source_remove(self._update_sid)
+                self._update_sid = None
             for net in list(self.wireless_networks.values()) + self._mesh:
                 net.props.paused = True
 
     def resume(self):
         if self._suspended:
             self._suspended = False
+            # Show what changed while the view was hidden
+            self._apply_updates()
             for net in list(self.wireless_networks.values()) + self._mesh:
                 net.props.paused = False
 
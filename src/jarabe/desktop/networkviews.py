@@ -73,6 +73,7 @@ class WirelessNetworkView(EventPulsingIcon):
         self._device_state = None
         self._color = None
         self._removed_hid = None
+        self._connect_pending = False
 
         if self._mode == network.NM_802_11_MODE_ADHOC and \
                 network.is_sugar_adhoc_network(self._ssid):
@@ -98,6 +99,11 @@ class WirelessNetworkView(EventPulsingIcon):
         self._palette_icon.props.xo_color = self._color
         self._update_badge()
 
+        # The saved connections may still be loading
+        self._connections = network.get_connections()
+        self._connection_added_hid = self._connections.connect(
+            'connection-added', self.__connection_added_cb)
+
         interface_props = dbus.Interface(self._device, dbus.PROPERTIES_IFACE)
         interface_props.Get(network.NM_WIRELESS_IFACE, 'WirelessCapabilities',
                             reply_handler=self.__get_device_caps_reply_cb,
@@ -259,6 +265,10 @@ class WirelessNetworkView(EventPulsingIcon):
         self._update_badge()
         self._disconnect_removed(connection)
 
+    def __connection_added_cb(self, connections, connection):
+        if connection.get_ssid() == self._ssid:
+            self._update_badge()
+
     def _update_state(self):
         if self._active_ap is not None:
             state = self._device_state
@@ -370,6 +380,14 @@ class WirelessNetworkView(EventPulsingIcon):
         self._connect()
 
     def _connect(self):
+        if not self._connections.is_ready():
+            # Wait to know if there is a connection for this network
+            if not self._connect_pending:
+                self._connect_pending = True
+                self._connections.call_when_ready(
+                    self.__connections_ready_cb)
+            return
+
         # Activate existing connection, if there is one
         connection = network.find_connection_by_ssid(self._ssid)
         if connection:
@@ -404,6 +422,11 @@ class WirelessNetworkView(EventPulsingIcon):
         network.add_and_activate_connection(self._device, settings,
                                             self.get_first_ap().model)
 
+    def __connections_ready_cb(self):
+        if self._connect_pending:
+            self._connect_pending = False
+            self._connect()
+
     def set_filter(self, query):
         normalized_name = normalize_string(self._display_name)
         self._filtered = normalized_name.find(query) == -1
@@ -474,6 +497,8 @@ class WirelessNetworkView(EventPulsingIcon):
             signal_name='PropertiesChanged',
             path=self._device.object_path,
             dbus_interface=network.NM_WIRELESS_IFACE)
+        self._connections.disconnect(self._connection_added_hid)
+        self._connect_pending = False
 
     def get_positioning_data(self):
         return str(self.get_first_ap().network_hash())
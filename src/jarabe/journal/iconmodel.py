@@ -31,6 +31,7 @@ class IconModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
     __gsignals__ = {
         'ready': (GObject.SignalFlags.RUN_FIRST, None, ([])),
         'progress': (GObject.SignalFlags.RUN_FIRST, None, ([])),
+        'changed': (GObject.SignalFlags.RUN_FIRST, None, ([])),
     }
 
     COLUMN_UID = 0
@@ -52,6 +53,7 @@ class IconModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
         self._cached_row = None
         self._result_set = model.find(query, IconModel._PAGE_SIZE)
         self._temp_drag_file_path = None
+        self._is_ready = False
 
         # HACK: The view will tell us that it is resizing so the model can
         # avoid hitting D-Bus and disk.
@@ -59,12 +61,24 @@ class IconModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
 
         self._result_set.ready.connect(self.__result_set_ready_cb)
         self._result_set.progress.connect(self.__result_set_progress_cb)
+        self._result_set.changed.connect(self.__result_set_changed_cb)
 
     def __result_set_ready_cb(self, **kwargs):
+        self._is_ready = True
         self.emit('ready')
 
     def __result_set_progress_cb(self, **kwargs):
-        self.emit('progress')
+        # The view is already showing the first results
+        if not self._is_ready:
+            self.emit('progress')
+
+    def __result_set_changed_cb(self, positions, **kwargs):
+        self._last_requested_index = None
+        # In ascending order, the rows before each position are in place
+        for index in positions:
+            path = Gtk.TreePath((index,))
+            self.row_inserted(path, self.get_iter(path))
+        self.emit('changed')
 
     def setup(self):
         self._result_set.setup()
@@ -189,6 +189,7 @@ class IconView(Gtk.Bin):
         self._model = IconModel(self._query)
         self._model.connect('ready', self.__model_ready_cb)
         self._model.connect('progress', self.__model_progress_cb)
+        self._model.connect('changed', self.__model_changed_cb)
         self._model.setup()
 
     def __model_ready_cb(self, tree_model):
@@ -221,6 +222,10 @@ class IconView(Gtk.Bin):
         else:
             self._clear_message()
 
+    def __model_changed_cb(self, tree_model):
+        # entries found after the first page was shown, redraw the icons
+        self.icon_view.queue_draw()
+
     def __map_cb(self, widget):
         logging.debug('IconView.__map_cb %r', self._scroll_position)
         self.icon_view.props.vadjustment.props.value = self._scroll_position
@@ -318,6 +318,7 @@ class MainToolbox(ToolbarBox):
     def _search_entry_activated_cb(self, search_entry):
         if self._autosearch_timer:
             GLib.source_remove(self._autosearch_timer)
+            self._autosearch_timer = None
         self._update_if_needed()
 
     def _search_entry_changed_cb(self, search_entry):
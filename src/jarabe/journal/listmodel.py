@@ -15,6 +15,7 @@
 
 import logging
 import time
+from collections import OrderedDict
 
 import json
 from gi.repository import GObject
@@ -33,6 +34,9 @@ DS_DBUS_SERVICE = 'org.laptop.sugar.DataStore'
 DS_DBUS_INTERFACE = 'org.laptop.sugar.DataStore'
 DS_DBUS_PATH = '/org/laptop/sugar/DataStore'
 
+# Rows kept ready to be drawn, a few screens of the list view
+ROW_CACHE_SIZE = 200
+
 
 class ListModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
     __gtype_name__ = 'JournalListModel'
@@ -40,6 +44,7 @@ class ListModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
     __gsignals__ = {
         'ready': (GObject.SignalFlags.RUN_FIRST, None, ([])),
         'progress': (GObject.SignalFlags.RUN_FIRST, None, ([])),
+        'changed': (GObject.SignalFlags.RUN_FIRST, None, ([])),
     }
 
     COLUMN_UID = 0
@@ -80,8 +85,11 @@ class ListModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
         self._last_requested_index = None
         self._temp_drag_file_uid = None
         self._cached_row = None
+        self._row_cache = OrderedDict()
+        self._dates_serial = 0
         self._query = query
         self._all_ids = []
+        self._is_ready = False
         t = time.time()
         self._result_set = model.find(query, ListModel._PAGE_SIZE)
         logging.debug('init resultset: %r', time.time() - t)
@@ -98,6 +106,8 @@ class ListModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
 
         self._result_set.ready.connect(self.__result_set_ready_cb)
         self._result_set.progress.connect(self.__result_set_progress_cb)
+        self._result_set.changed.connect(self.__result_set_changed_cb)
+        model.updated.connect(self.__model_updated_cb)
 
     def get_all_ids(self):
         return self._all_ids
@@ -106,10 +116,22 @@ class ListModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
         t = time.time()
         self._all_ids = self._result_set.find_ids(self._query)
         logging.debug('get all ids: %r', time.time() - t)
+        self._is_ready = True
         self.emit('ready')
 
     def __result_set_progress_cb(self, **kwargs):
-        self.emit('progress')
+        # The view is already showing the first results
+        if not self._is_ready:
+            self.emit('progress')
+
+    def __result_set_changed_cb(self, positions, **kwargs):
+        self._all_ids = self._result_set.find_ids(self._query)
+        self._last_requested_index = None
+        # In ascending order, the rows before each position are in place
+        for index in positions:
+            path = Gtk.TreePath((index,))
+            self.row_inserted(path, self.get_iter(path))
+        self.emit('changed')
 
     def setup(self, updated_callback=None):
         self._result_set.setup()
@@ -117,6 +139,20 @@ class ListModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
 
     def stop(self):
         self._result_set.stop()
+        model.updated.disconnect(self.__model_updated_cb)
+
+    def __model_updated_cb(self, sender, signal, object_id):
+        self._invalidate_row(object_id)
+
+    def _invalidate_row(self, uid):
+        self._row_cache.pop(uid, None)
+        if self._cached_row is not None and self._cached_row[0] == uid:
+            self._last_requested_index = None
+
+    def update_dates(self):
+        """Compute again the elapsed times when the rows are drawn"""
+        self._dates_serial += 1
+        self._last_requested_index = None
 
     def get_metadata(self, path):
         return model.get(self[path][ListModel.COLUMN_UID])
@@ -142,11 +178,34 @@ class ListModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
         if column == ListModel.COLUMN_TITLE:
             metadata['title'] = value
         self._updated_entries[metadata['uid']] = metadata
+        self._invalidate_row(metadata['uid'])
         if self._updated_callback is not None:
             model.updated.disconnect(self._updated_callback)
         model.write(metadata, update_mtime=False,
                     ready_callback=self.__reconnect_updates_cb)
 
+    def update_entry(self, object_id):
+        """Reload the metadata of an entry without rebuilding the model
+
+        Returns False when the entry is not loaded or the change could move
+        it in the results.
+        """
+        try:
+            metadata = model.get(object_id)
+        except Exception:
+            logging.debug('Could not reload entry %r', object_id)
+            return False
+
+        index = self._result_set.update_entry(metadata)
+        if index == -1:
+            return False
+
+        self._updated_entries.pop(object_id, None)
+        self._invalidate_row(object_id)
+        path = Gtk.TreePath((index,))
+        self.row_changed(path, self.get_iter(path))
+        return True
+
     def __reconnect_updates_cb(self, metadata, filepath, uid):
         if self._updated_callback is not None:
             model.updated.connect(self._updated_callback)
@@ -166,50 +225,70 @@ class ListModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
         metadata = self._result_set.read()
         metadata.update(self._updated_entries.get(metadata['uid'], {}))
 
+        # The timestamp changes whenever the entry is saved again
+        version = metadata.get('timestamp')
+        cached = self._row_cache.get(metadata['uid'])
+        if cached is not None and cached[0] == version:
+            self._row_cache.move_to_end(metadata['uid'])
+            row = cached[1]
+            if cached[2] != self._dates_serial:
+                self._update_row_dates(row, metadata)
+                cached[2] = self._dates_serial
+        else:
+            row = self._build_row(metadata)
+            self._row_cache[metadata['uid']] = [version, row,
+                                                self._dates_serial]
+            if len(self._row_cache) > ROW_CACHE_SIZE:
+                self._row_cache.popitem(last=False)
+
         self._last_requested_index = index
-        self._cached_row = []
-        self._cached_row.append(metadata['uid'])
-        self._cached_row.append(metadata.get('keep', '0') == '1')
-        self._cached_row.append(misc.get_icon_name(metadata))
+        self._cached_row = row
+        return row[column]
+
+    def _update_row_dates(self, row, metadata):
+        row[ListModel.COLUMN_TIMESTAMP] = self._get_elapsed_string(
+            metadata.get('timestamp', 0))
+        row[ListModel.COLUMN_CREATION_TIME] = self._get_elapsed_string(
+            metadata.get('creation_time'))
+
+    def _get_elapsed_string(self, timestamp):
+        try:
+            timestamp = float(timestamp)
+        except (TypeError, ValueError):
+            return _('Unknown')
+        return util.timestamp_to_elapsed_string(timestamp)
+
+    def _build_row(self, metadata):
+        row = []
+        row.append(metadata['uid'])
+        row.append(metadata.get('keep', '0') == '1')
+        row.append(misc.get_icon_name(metadata))
 
         if misc.is_activity_bundle(metadata):
             xo_color = XoColor('%s,%s' % (style.COLOR_BUTTON_GREY.get_svg(),
                                           style.COLOR_TRANSPARENT.get_svg()))
         else:
             xo_color = misc.get_icon_color(metadata)
-        self._cached_row.append(xo_color)
+        row.append(xo_color)
 
         title = GObject.markup_escape_text(metadata.get('title',
                                                         _('Untitled')))
-        self._cached_row.append('<b>%s</b>' % (title, ))
+        row.append('<b>%s</b>' % (title, ))
 
-        try:
-            timestamp = float(metadata.get('timestamp', 0))
-        except (TypeError, ValueError):
-            timestamp_content = _('Unknown')
-        else:
-            timestamp_content = util.timestamp_to_elapsed_string(timestamp)
-        self._cached_row.append(timestamp_content)
-
-        try:
-            creation_time = float(metadata.get('creation_time'))
-        except (TypeError, ValueError):
-            self._cached_row.append(_('Unknown'))
-        else:
-            self._cached_row.append(
-                util.timestamp_to_elapsed_string(float(creation_time)))
+        row.append(self._get_elapsed_string(metadata.get('timestamp', 0)))
+        row.append(self._get_elapsed_string(metadata.get('creation_time')))
 
         try:
             size = int(metadata.get('filesize'))
         except (TypeError, ValueError):
             size = None
-        self._cached_row.append(util.format_size(size))
+        row.append(util.format_size(size))
 
         try:
             progress = int(float(metadata.get('progress', 100)))
         except (TypeError, ValueError):
             progress = 100
-        self._cached_row.append(progress)
+        row.append(progress)
 
         buddies = []
         if metadata.get('buddies'):
@@ -232,12 +311,12 @@ class ListModel(GObject.GObject, Gtk.TreeModel, Gtk.TreeDragSource):
                     logging.warning('Malformed buddies for %r: %s',
                                     metadata['uid'], exception)
                 else:
-                    self._cached_row.append([nick, XoColor(color)])
+                    row.append([nick, XoColor(color)])
                     continue
 
-            self._cached_row.append(None)
+            row.append(None)
 
-        return self._cached_row[column]
+        return row
 
     def do_iter_nth_child(self, parent_iter, n):
         return (False, None)
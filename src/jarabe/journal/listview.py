@@ -32,6 +32,7 @@ from sugar3 import profile
 from sugar3.graphics.palettewindow import TreeViewInvoker
 
 from jarabe.journal.listmodel import ListModel
+from jarabe.journal.queryscheduler import QueryScheduler
 from jarabe.journal.palettes import ObjectPalette, BuddyPalette
 from jarabe.journal import model
 from jarabe.journal import misc
@@ -202,7 +203,9 @@ class BaseListView(Gtk.Bin):
         self._fully_obscured = True
         self._updates_disabled = False
         self._dirty = False
-        self._refresh_idle_handler = None
+        self._scheduler = QueryScheduler(self._do_refresh,
+                                         self.__update_entry_cb,
+                                         self._set_dirty)
         self._update_dates_timer = None
         self._backup_selected = None
 
@@ -223,15 +226,20 @@ class BaseListView(Gtk.Bin):
 
     def __model_created_cb(self, sender, signal, object_id):
         if self._is_new_item_visible(object_id):
-            self._set_dirty()
+            self._scheduler.entry_changed(object_id)
 
     def __model_updated_cb(self, sender, signal, object_id):
         if self._is_new_item_visible(object_id):
-            self._set_dirty()
+            self._scheduler.entry_changed(object_id, updated=True)
 
     def __model_deleted_cb(self, sender, signal, object_id):
         if self._is_new_item_visible(object_id):
-            self._set_dirty()
+            self._scheduler.entry_changed(object_id)
+
+    def __update_entry_cb(self, object_id):
+        if self._model is None:
+            return False
+        return self._model.update_entry(object_id)
 
     def _is_new_item_visible(self, object_id):
         """Check if the created item is part of the currently selected view"""
@@ -366,6 +374,7 @@ class BaseListView(Gtk.Bin):
             self.get_child().size_request()
 
     def __destroy_cb(self, widget):
+        self._scheduler.stop()
         if self._model is not None:
             self._model.stop()
 
@@ -456,7 +465,7 @@ class BaseListView(Gtk.Bin):
         if window is not None:
             window.set_cursor(Gdk.Cursor.new(Gdk.CursorType.WATCH))
             Gdk.flush()
-        GLib.idle_add(self._do_refresh, new_query)
+        self._scheduler.schedule_refresh(new_query)
 
     def _do_refresh(self, new_query=False):
         if self._model is not None:
@@ -470,6 +479,7 @@ class BaseListView(Gtk.Bin):
         self._model = ListModel(self._query)
         self._model.connect('ready', self.__model_ready_cb)
         self._model.connect('progress', self.__model_progress_cb)
+        self._model.connect('changed', self.__model_changed_cb)
         self._model.setup(self.__model_updated_cb)
         window = self.get_toplevel().get_window()
         if window is not None:
@@ -528,6 +538,10 @@ class BaseListView(Gtk.Bin):
         else:
             self._clear_message()
 
+    def __model_changed_cb(self, tree_model):
+        # entries found after the first page was shown, redraw the rows
+        self.tree_view.queue_draw()
+
     def _can_clear_query(self):
         return True
 
@@ -640,6 +654,7 @@ class BaseListView(Gtk.Bin):
 
         path, end_path = visible_range
         tree_model = self.tree_view.get_model()
+        tree_model.update_dates()
 
         while True:
             cel_rect = self.tree_view.get_cell_area(path,
@@ -20,10 +20,11 @@ import subprocess
 from datetime import datetime
 import time
 import tempfile
-from stat import S_IFLNK, S_IFMT, S_IFDIR, S_IFREG
-import re
+from stat import S_IFMT, S_IFDIR, S_IFREG
 from operator import itemgetter
 import json
+import collections
+from threading import Thread, Lock, RLock
 from gettext import gettext as _
 
 import dbus
@@ -36,6 +37,8 @@ from sugar3 import dispatch
 from sugar3 import mime
 from sugar3 import util
 
+from jarabe.journal.querymatcher import QueryMatcher
+
 
 DS_DBUS_SERVICE = 'org.laptop.sugar.DataStore'
 DS_DBUS_INTERFACE = 'org.laptop.sugar.DataStore'
@@ -48,9 +51,37 @@ PROPERTIES = ['activity', 'activity_id', 'buddies', 'bundle_id',
               'preview']
 
 MIN_PAGES_TO_CACHE = 3
-MAX_PAGES_TO_CACHE = 5
+MAX_PAGES_TO_CACHE = 20
+
+# Seconds of scrolling the result sets read ahead, and the seconds over
+# which they measure the scrolling speed.
+READ_AHEAD_TIME = 1
+VELOCITY_INTERVAL = 0.1
+
+# Seconds of work InplaceResultSet does per main loop iteration while
+# scanning, and minimum seconds between two progress signals.
+SCAN_TIME_SLICE = 0.008
+PROGRESS_INTERVAL = 0.1
 
 JOURNAL_METADATA_DIR = '.Sugar-Metadata'
+# Kept in its own directory, so rewriting the index does not change the
+# mtime of the metadata directory of the mount point root.
+JOURNAL_INDEX_FILE = os.path.join('.index', 'index.json')
+
+# Bump when the layout of the on-disk index changes.
+_INDEX_VERSION = 1
+
+# Metadata properties kept in the index so queries on a mount point can
+# be answered without reading the .metadata files again.
+_INDEXED_PROPERTIES = ['title', 'description', 'tags', 'fulltext', 'keep',
+                       'activity']
+
+# Properties of an index entry whose metadata was not read yet; None
+# stands for files without metadata.
+_NOT_LOADED = False
+
+# Coarsest timestamp resolution we expect from removable media (FAT).
+_MTIME_GRANULARITY = 2
 
 _datastore = None
 created = dispatch.Signal()
@@ -79,12 +110,213 @@ class _Cache(object):
     def __getitem__(self, key):
         return self._array[key]
 
+    def __setitem__(self, key, value):
+        self._array[key] = value
+
     def __delitem__(self, key):
         del self._array[key]
 
 
+class _IndexEntry(collections.namedtuple(
+        '_IndexEntry', ['st_ino', 'st_mtime', 'st_size', 'mime_type',
+                        'properties'])):
+    """A file as recorded in a mount point index
+
+    It carries the same st_mtime and st_size attributes as the result of
+    os.stat(), so it can be passed to _get_file_metadata().
+    """
+
+
+class _IndexedDirectory(object):
+
+    def __init__(self, key, files=None, subdirs=None):
+        self.key = key
+        self.files = files or {}
+        self.subdirs = subdirs or []
+        self.pending = 0
+        self.scan_time = time.time()
+
+
+class _MountPointIndex(object):
+    """Persistent index of the files found on a mount point
+
+    The index is stored in the metadata directory of the mount point and
+    keeps, per directory, the stat information, mime type and, once a
+    query needed them, the searchable metadata properties of its files. A
+    directory is only listed again when its mtime, or the mtime of its
+    metadata directory, changed.
+
+    Scans update the index from their threads while the main loop may
+    reload it, all the changes happen with the lock held.
+    """
+
+    def __init__(self, mount_point):
+        self._mount_point = mount_point
+        self._path = os.path.join(mount_point, JOURNAL_METADATA_DIR,
+                                  JOURNAL_INDEX_FILE)
+        self._directories = {}
+        self._file_stamp = None
+        self._dirty = False
+        self._lock = RLock()
+
+    def _get_file_stamp(self):
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def is_stale(self):
+        with self._lock:
+            return self._get_file_stamp() != self._file_stamp
+
+    def load(self):
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        self._directories = {}
+        self._file_stamp = self._get_file_stamp()
+        self._dirty = False
+        if self._file_stamp is None:
+            return
+
+        try:
+            with open(self._path) as index_file:
+                data = json.load(index_file)
+        except (ValueError, EnvironmentError):
+            logging.error('Could not read the Journal index of %r',
+                          self._mount_point)
+            return
+
+        if data.get('version') != _INDEX_VERSION:
+            logging.debug('Discarding outdated Journal index of %r',
+                          self._mount_point)
+            return
+
+        for rel_path, directory in data['directories'].items():
+            files = {}
+            for name, entry in directory['files'].items():
+                files[name] = _IndexEntry(*entry)
+            self._directories[rel_path] = _IndexedDirectory(
+                directory['key'], files, directory['subdirs'])
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        if not self._dirty:
+            return
+
+        directories = {}
+        for rel_path, directory in self._directories.items():
+            directories[rel_path] = {'key': directory.key,
+                                     'files': directory.files,
+                                     'subdirs': directory.subdirs}
+
+        metadata_dir_path = os.path.join(self._mount_point,
+                                         JOURNAL_METADATA_DIR)
+        index_dir_path = os.path.dirname(self._path)
+        fn = None
+        try:
+            if not os.path.exists(metadata_dir_path):
+                os.makedirs(metadata_dir_path)
+                # but don't set it in ~/Documents
+                if not self._mount_point == get_documents_path():
+                    if not SugarExt.fat_set_hidden_attrib(metadata_dir_path):
+                        logging.error('Could not set hidden attribute on %s',
+                                      metadata_dir_path)
+            if not os.path.exists(index_dir_path):
+                os.mkdir(index_dir_path)
+            (fh, fn) = tempfile.mkstemp(dir=index_dir_path)
+            os.write(fh, json.dumps({'version': _INDEX_VERSION,
+                                     'directories': directories}).encode())
+            os.close(fh)
+            os.rename(fn, self._path)
+        except EnvironmentError:
+            # read-only devices are expected here
+            logging.debug('Could not write the Journal index of %r',
+                          self._mount_point)
+            if fn is not None and os.path.exists(fn):
+                os.unlink(fn)
+            return
+
+        self._file_stamp = self._get_file_stamp()
+        self._dirty = False
+
+    def end_scan(self, visited):
+        """Forget the directories a complete scan did not visit
+
+        Each scan keeps its own visited set, as a stopped scan may still
+        be running in its thread while a new one starts.
+        """
+        with self._lock:
+            for rel_path in set(self._directories) - visited:
+                del self._directories[rel_path]
+                self._dirty = True
+            self._save()
+
+    def _get_rel_path(self, dir_path):
+        return os.path.relpath(dir_path, self._mount_point)
+
+    def get_directory_key(self, dir_path, stat):
+        metadata_dir_path = os.path.join(self._mount_point,
+                                         JOURNAL_METADATA_DIR,
+                                         self._get_rel_path(dir_path))
+        try:
+            metadata_mtime = os.stat(metadata_dir_path).st_mtime
+        except OSError:
+            metadata_mtime = 0
+        return [stat.st_mtime, metadata_mtime]
+
+    def get_directory(self, dir_path, key, visited):
+        """Return the indexed directory if it is still up to date"""
+        rel_path = self._get_rel_path(dir_path)
+        visited.add(rel_path)
+        with self._lock:
+            directory = self._directories.get(rel_path)
+        if directory is not None and directory.key == key:
+            return directory
+        return None
+
+    def update_entry(self, directory, name, entry):
+        with self._lock:
+            directory.files[name] = entry
+            self._dirty = True
+
+    def add_directory(self, dir_path, directory):
+        # Changes done in the same timestamp tick than the scan would go
+        # unnoticed, don't trust those directories until the next scan.
+        if max(directory.key) > directory.scan_time - _MTIME_GRANULARITY:
+            return
+        with self._lock:
+            self._directories[self._get_rel_path(dir_path)] = directory
+            self._dirty = True
+
+
+_indexes = {}
+
+
+def _get_mount_point_index(mount_point):
+    index = _indexes.get(mount_point)
+    if index is None:
+        index = _MountPointIndex(mount_point)
+        index.load()
+        _indexes[mount_point] = index
+    elif index.is_stale():
+        # the device was replaced or the index rewritten by someone else
+        index.load()
+    return index
+
+
 class BaseResultSet(object):
     """Encapsulates the result of a query
+
+    Entries are read a page at a time into a cache around the current
+    position. The direction and speed of the reads are tracked so the
+    pages the view is about to need are fetched from the main loop before
+    it asks for them, and the size of the cache follows the speed.
     """
 
     def __init__(self, query, page_size):
@@ -95,15 +327,44 @@ class BaseResultSet(object):
 
         self._offset = 0
         self._cache = _Cache()
+        self._cache_generation = 0
+
+        self._direction = 1
+        self._velocity = 0
+        self._velocity_position = -1
+        self._velocity_time = 0
+        self._read_ahead_sid = None
+        # offset and limit of the read ahead waiting for its entries
+        self._pending_fetch = None
+
+        self._hits = 0
+        self._misses = 0
+        self._read_aheads = 0
+        self._stopped = False
 
         self.ready = dispatch.Signal()
         self.progress = dispatch.Signal()
+        # Sent when results are added after ready was sent, with the
+        # ascending positions of the new results
+        self.changed = dispatch.Signal()
 
     def setup(self):
         self.ready.send(self)
 
     def stop(self):
-        pass
+        self._stopped = True
+        if self._read_ahead_sid is not None:
+            GLib.source_remove(self._read_ahead_sid)
+            self._read_ahead_sid = None
+        logging.debug('%s cache statistics: %r', self.__class__.__name__,
+                      self.get_cache_statistics())
+
+    def get_cache_statistics(self):
+        return {'hits': self._hits,
+                'misses': self._misses,
+                'read_aheads': self._read_aheads,
+                'cached_pages': self._get_pages_to_cache(),
+                'velocity': self._velocity}
 
     def get_length(self):
         if self._total_count == -1:
@@ -119,8 +380,112 @@ class BaseResultSet(object):
     def find(self, query):
         raise NotImplementedError()
 
+    def find_async(self, query, reply_handler, error_handler):
+        """Run find and pass the entries and the total count to
+        reply_handler, subclasses can do it without blocking
+        """
+        try:
+            entries, total_count = self.find(query)
+        except Exception as e:
+            error_handler(e)
+        else:
+            reply_handler(entries, total_count)
+
+    def update_entry(self, metadata):
+        """Replace the cached entry with the same uid
+
+        Returns the position of the entry, or -1 when it is not cached or
+        the change could move it in or out of the results or to another
+        position.
+        """
+        if self._query.get('query'):
+            # the full text is not cached, no way to tell
+            return -1
+
+        for index, entry in enumerate(self._cache):
+            if entry['uid'] == metadata['uid']:
+                break
+        else:
+            return -1
+
+        order_by = self._query.get('order_by', ['+timestamp'])[0]
+        sort_property = order_by[1:]
+        properties = [sort_property]
+        for key in self._query:
+            if key not in ['order_by', 'limit', 'offset', 'mountpoints']:
+                properties.append(key)
+
+        for key in properties:
+            if str(entry.get(key)) == str(metadata.get(key)):
+                continue
+            if key == sort_property and order_by[0] == '+' and \
+                    self._offset + index == 0 and key not in self._query:
+                # The first entry stays first if it only grew, like the
+                # timestamp of an entry saved again
+                try:
+                    if float(metadata[key]) >= float(entry[key]):
+                        continue
+                except (KeyError, TypeError, ValueError):
+                    pass
+            return -1
+
+        new_entry = {'mountpoint': entry.get('mountpoint')}
+        for key in PROPERTIES:
+            if key in metadata:
+                new_entry[key] = metadata[key]
+        self._cache[index] = new_entry
+        return self._offset + index
+
+    def _reset_cache(self):
+        del self._cache[:]
+        self._offset = 0
+        self._cache_generation += 1
+        self._pending_fetch = None
+
     def seek(self, position):
+        if position != self._position:
+            if position > self._position:
+                self._direction = 1
+            else:
+                self._direction = -1
         self._position = position
+        self._update_velocity()
+
+    def _update_velocity(self):
+        # The view reads all the visible rows on each redraw, so only the
+        # drift of the position over a longer period tells the scrolling
+        # speed, in entries per second
+        now = time.time()
+        elapsed = now - self._velocity_time
+        if elapsed < VELOCITY_INTERVAL:
+            return
+        if self._velocity_position != -1 and \
+                elapsed < VELOCITY_INTERVAL * 10:
+            speed = abs(self._position - self._velocity_position) / elapsed
+            self._velocity = (self._velocity + speed) / 2.
+        else:
+            self._velocity = 0
+        self._velocity_position = self._position
+        self._velocity_time = now
+
+    def _get_pages_ahead(self):
+        pages = 1 + int(self._velocity * READ_AHEAD_TIME / self._page_size)
+        # leave room in the cache for the pages around the position
+        return min(pages, (MAX_PAGES_TO_CACHE - MIN_PAGES_TO_CACHE) // 2)
+
+    def _get_pages_to_cache(self):
+        return MIN_PAGES_TO_CACHE + 2 * self._get_pages_ahead()
+
+    def _apply_cache_limit(self, keep_end):
+        cache_limit = self._page_size * self._get_pages_to_cache()
+        objects_excess = len(self._cache) - cache_limit
+        if objects_excess <= 0:
+            return
+        if keep_end:
+            self._offset += objects_excess
+            del self._cache[:objects_excess]
+        else:
+            del self._cache[-objects_excess:]
 
     def read(self):
         if self._position == -1:
@@ -139,6 +504,11 @@ class BaseResultSet(object):
 
         last_cached_entry = self._offset + len(self._cache)
 
+        if remaining_forward_entries > 0 and remaining_backwards_entries >= 0:
+            self._hits += 1
+        else:
+            self._misses += 1
+
         if remaining_forward_entries <= 0 and remaining_backwards_entries <= 0:
 
             # Total cache miss: remake it
@@ -151,7 +521,7 @@ class BaseResultSet(object):
             query['offset'] = offset
             entries, self._total_count = self.find(query)
 
-            del self._cache[:]
+            self._reset_cache()
             self._cache.append_all(entries)
             self._offset = offset
 
@@ -168,13 +538,7 @@ class BaseResultSet(object):
 
             # update cache
             self._cache.append_all(entries)
-
-            # apply the cache limit
-            cache_limit = self._page_size * MAX_PAGES_TO_CACHE
-            objects_excess = len(self._cache) - cache_limit
-            if objects_excess > 0:
-                self._offset += objects_excess
-                del self._cache[:objects_excess]
+            self._apply_cache_limit(keep_end=True)
 
         elif remaining_forward_entries > 0 and \
                 remaining_backwards_entries <= 0 and self._offset > 0:
@@ -192,14 +556,90 @@ class BaseResultSet(object):
 
             # update cache
             self._cache.prepend_all(entries)
+            self._apply_cache_limit(keep_end=False)
+
+        entry = self._cache[self._position - self._offset]
+        self._schedule_read_ahead()
+        return entry
+
+    def _schedule_read_ahead(self):
+        if self._read_ahead_sid is not None or \
+                self._pending_fetch is not None:
+            return
+
+        read_ahead_entries = self._get_pages_ahead() * self._page_size
+        if self._direction > 0:
+            last_cached_entry = self._offset + len(self._cache)
+            if last_cached_entry >= self._total_count or \
+                    last_cached_entry - self._position > read_ahead_entries:
+                return
+        else:
+            if self._offset == 0 or \
+                    self._position - self._offset > read_ahead_entries:
+                return
+
+        self._read_ahead_sid = GLib.idle_add(self.__read_ahead_cb)
+
+    def __read_ahead_cb(self):
+        self._read_ahead_sid = None
+
+        limit = self._get_pages_ahead() * self._page_size
+        if self._direction > 0:
+            offset = self._offset + len(self._cache)
+            limit = min(limit, self._total_count - offset)
+        else:
+            offset = max(0, self._offset - limit)
+            limit = self._offset - offset
+        if limit <= 0:
+            return False
 
-            # apply the cache limit
-            cache_limit = self._page_size * MAX_PAGES_TO_CACHE
-            objects_excess = len(self._cache) - cache_limit
-            if objects_excess > 0:
-                del self._cache[-objects_excess:]
+        logging.debug('reading ahead, offset: %r limit: %r', offset, limit)
+        self._fetch_async(offset, limit, read_ahead=True)
+        return False
 
-        return self._cache[self._position - self._offset]
+    def _fetch_async(self, offset, limit, ready_cb=None, read_ahead=False):
+        """Add the entries at offset to the cache if they are still next
+        to it when they arrive, and call ready_cb
+
+        No other read ahead is scheduled while a read_ahead fetch waits
+        for its entries.
+        """
+        query = self._query.copy()
+        query['limit'] = limit
+        query['offset'] = offset
+        generation = self._cache_generation
+        fetch = (offset, limit)
+        if read_ahead:
+            self._pending_fetch = fetch
+
+        def finish_fetch():
+            if self._pending_fetch is fetch:
+                self._pending_fetch = None
+
+        def reply_handler(entries, total_count):
+            finish_fetch()
+            if self._stopped or generation != self._cache_generation:
+                return
+            self._total_count = total_count
+            if offset == self._offset + len(self._cache):
+                self._cache.append_all(entries)
+                self._apply_cache_limit(keep_end=True)
+                self._read_aheads += 1
+            elif offset + len(entries) == self._offset:
+                self._cache.prepend_all(entries)
+                self._offset = offset
+                self._apply_cache_limit(keep_end=False)
+                self._read_aheads += 1
+            if ready_cb is not None:
+                ready_cb()
+
+        def error_handler(error):
+            finish_fetch()
+            logging.error('Could not read entries from %r: %s', offset, error)
+            if not self._stopped and ready_cb is not None:
+                ready_cb()
+
+        self.find_async(query, reply_handler, error_handler)
 
 
 class DatastoreResultSet(BaseResultSet):
@@ -221,6 +661,18 @@ class DatastoreResultSet(BaseResultSet):
 
         BaseResultSet.__init__(self, query, page_size)
 
+    def setup(self):
+        # Only wait for the first page, the next ones come later
+        self._total_count = 0
+        self._fetch_async(0, self._page_size, self.__first_page_cb)
+
+    def __first_page_cb(self):
+        self.ready.send(self)
+        # Read ahead of the view, so it does not ask for these pages again
+        self._fetch_async(self._page_size,
+                          self._page_size * (MIN_PAGES_TO_CACHE - 1),
+                          read_ahead=True)
+
     def find(self, query):
         entries, total_count = _get_datastore().find(query, PROPERTIES,
                                                      byte_arrays=True)
@@ -230,6 +682,16 @@ class DatastoreResultSet(BaseResultSet):
 
         return entries, total_count
 
+    def find_async(self, query, reply_handler, error_handler):
+        def find_reply_handler(entries, total_count):
+            for entry in entries:
+                entry['mountpoint'] = '/'
+            reply_handler(entries, total_count)
+
+        _get_datastore().find(query, PROPERTIES, byte_arrays=True,
+                              reply_handler=find_reply_handler,
+                              error_handler=error_handler)
+
     def find_ids(self, query):
         copy = query.copy()
         copy.pop('mountpoints', '/')
@@ -240,25 +702,27 @@ class InplaceResultSet(BaseResultSet):
     """Encapsulates the result of a query on a mount point
     """
 
-    def __init__(self, query, page_size, mount_point):
+    def __init__(self, query, page_size, mount_point,
+                 time_slice=SCAN_TIME_SLICE, threaded=False):
         BaseResultSet.__init__(self, query, page_size)
         self._mount_point = mount_point
+        self._time_slice = time_slice
+        self._threaded = threaded
+        self._last_progress = 0
+        self._found = []
+        self._found_lock = Lock()
+        self._ready_sent = False
         self._file_list = None
-        self._pending_directories = []
-        self._visited_directories = []
-        self._pending_files = []
-        self._stopped = False
+        self._pending_directories = collections.deque()
+        self._visited_directories = set()
+        self._pending_files = collections.deque()
+        self._index = None
+        # relative paths of the directories looked up in the index
+        self._index_visited = set()
 
-        query_text = query.get('query', '')
-        if query_text.startswith('"') and query_text.endswith('"'):
-            self._regex = re.compile('*%s*' % query_text.strip(['"']))
-        elif query_text:
-            expression = ''
-            for word in query_text.split(' '):
-                expression += '(?=.*%s.*)' % word
-            self._regex = re.compile(expression, re.IGNORECASE)
-        else:
-            self._regex = None
+        self._matcher = QueryMatcher(query.get('query', ''))
+        if self._matcher.is_empty():
+            self._matcher = None
 
         if query.get('timestamp', ''):
             self._date_start = int(query['timestamp']['start'])
@@ -277,23 +741,88 @@ class InplaceResultSet(BaseResultSet):
 
     def setup(self):
         self._file_list = []
-        self._pending_directories = [self._mount_point]
-        self._visited_directories = []
-        self._pending_files = []
-        GLib.idle_add(self._scan)
-
-    def stop(self):
-        self._stopped = True
+        self._pending_directories = collections.deque([self._mount_point])
+        self._visited_directories = set()
+        self._pending_files = collections.deque()
+        self._index = _get_mount_point_index(self._mount_point)
+        self._index_visited = set()
+        if self._threaded:
+            thread = Thread(target=self._crawl)
+            thread.daemon = True
+            thread.start()
+        else:
+            GLib.idle_add(self._scan)
 
     def setup_ready(self):
+        self._sort_file_list()
+        self._ready_sent = True
+        self.ready.send(self)
+
+    def _sort_file_list(self):
         if self._sort[1:] == 'filesize':
             keygetter = itemgetter(3)
         else:
             # timestamp
             keygetter = itemgetter(2)
+        # the list is mostly sorted already, this is a merge of the new files
         self._file_list.sort(key=keygetter,
                              reverse=not self._sort[0] == '-')
-        self.ready.send(self)
+
+    def _flush_found(self):
+        """Move the files found so far to the results
+
+        Runs in the main loop. The first page is made available as soon as
+        it is complete, later files are merged into the sorted results.
+        """
+        if self._stopped:
+            return False
+
+        with self._found_lock:
+            found, self._found = self._found, []
+
+        self.progress.send(self)
+
+        if not found:
+            return False
+
+        self._file_list.extend(found)
+        if self._ready_sent:
+            self._sort_file_list()
+            self._total_count = len(self._file_list)
+            self._reset_cache()
+            found_paths = set(file_info[0] for file_info in found)
+            positions = [index for index, file_info
+                         in enumerate(self._file_list)
+                         if file_info[0] in found_paths]
+            self.changed.send(self, positions=positions)
+        elif len(self._file_list) >= self._page_size:
+            self.setup_ready()
+        return False
+
+    def _scan_finished(self):
+        self._flush_found()
+        self._visited_directories = set()
+        if not self._stopped and not self._ready_sent:
+            self.setup_ready()
+        return False
+
+    def _crawl(self):
+        # Runs in a thread, the results go back to the main loop
+        last_flush = time.time()
+        while not self._stopped:
+            if self._pending_files:
+                self._scan_a_file()
+            elif self._pending_directories:
+                self._scan_a_directory()
+            else:
+                self._index.end_scan(self._index_visited)
+                GLib.idle_add(self._scan_finished)
+                return
+
+            now = time.time()
+            if now - last_flush >= PROGRESS_INTERVAL:
+                last_flush = now
+                GLib.idle_add(self._flush_found)
 
     def find(self, query):
         if self._file_list is None:
@@ -313,7 +842,8 @@ class InplaceResultSet(BaseResultSet):
         entries = []
         for file_path, stat, mtime_, size_, metadata in files:
             if metadata is None:
-                metadata = _get_file_metadata(file_path, stat)
+                metadata = _get_file_metadata(file_path, stat,
+                                              mount_point=self._mount_point)
             metadata['mountpoint'] = self._mount_point
             entries.append(metadata)
 
@@ -321,6 +851,10 @@ class InplaceResultSet(BaseResultSet):
 
         return entries, total_count
 
+    def update_entry(self, metadata):
+        # the order and the filters depend on the files themselves
+        return -1
+
     def find_ids(self, query):
         if self._file_list is None:
             raise ValueError('Need to call setup() first')
@@ -337,33 +871,43 @@ class InplaceResultSet(BaseResultSet):
         if self._stopped:
             return False
 
-        self.progress.send(self)
-
-        if self._pending_files:
-            self._scan_a_file()
-            return True
+        now = time.time()
+        if now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self._flush_found()
+
+        # Handle as many files and directories as fit in the time slice,
+        # but at least one, before giving control back to the main loop.
+        deadline = now + self._time_slice
+        while True:
+            if self._pending_files:
+                self._scan_a_file()
+            elif self._pending_directories:
+                self._scan_a_directory()
+            else:
+                break
 
-        if self._pending_directories:
-            self._scan_a_directory()
-            return True
+            if time.time() >= deadline:
+                return True
 
-        self.setup_ready()
-        self._visited_directories = []
+        self._index.end_scan(self._index_visited)
+        self._scan_finished()
         return False
 
     def _scan_a_file(self):
-        full_path = self._pending_files.pop(0)
-        metadata = None
-
+        dir_entry, directory = self._pending_files.popleft()
         try:
-            stat = os.lstat(full_path)
-        except OSError as e:
-            if e.errno != errno.ENOENT:
-                logging.exception(
-                    'Error reading metadata of file %r', full_path)
-            return
+            self._index_a_file(dir_entry, directory)
+        finally:
+            directory.pending -= 1
+            if directory.pending == 0:
+                self._index.add_directory(os.path.dirname(dir_entry.path),
+                                          directory)
+
+    def _index_a_file(self, dir_entry, directory):
+        full_path = dir_entry.path
 
-        if S_IFMT(stat.st_mode) == S_IFLNK:
+        if dir_entry.is_symlink():
             try:
                 link = os.readlink(full_path)
             except OSError as e:
@@ -383,95 +927,191 @@ class InplaceResultSet(BaseResultSet):
                         'Error reading metadata of linked file %r', full_path)
                 return
 
+        elif dir_entry.is_dir(follow_symlinks=False):
+            directory.subdirs.append(dir_entry.name)
+            self._pending_directories.append(full_path)
+            return
+
+        else:
+            # DirEntry caches the result, no extra system call later on
+            try:
+                stat = dir_entry.stat(follow_symlinks=False)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    logging.exception(
+                        'Error reading metadata of file %r', full_path)
+                return
+
         if S_IFMT(stat.st_mode) == S_IFDIR:
-            id_tuple = stat.st_ino, stat.st_dev
-            if id_tuple not in self._visited_directories:
-                self._visited_directories.append(id_tuple)
-                self._pending_directories.append(full_path)
+            directory.subdirs.append(dir_entry.name)
+            self._pending_directories.append(full_path)
             return
 
         if S_IFMT(stat.st_mode) != S_IFREG:
             return
 
-        if self._regex is not None and \
-                not self._regex.match(full_path):
-            metadata = _get_file_metadata(full_path, stat,
-                                          fetch_preview=False)
-            if not metadata:
-                return
-            add_to_list = False
-            for f in ['fulltext', 'title',
-                      'description', 'tags']:
-                if f in metadata and \
-                        self._regex.match(metadata[f]):
-                    add_to_list = True
-                    break
-            if not add_to_list:
-                return
+        entry = self._new_entry(full_path, stat)
+        directory.files[dir_entry.name] = entry
+        self._add_file(full_path, entry, directory)
 
-        if self._only_favorites:
-            if not metadata:
-                metadata = _get_file_metadata(full_path, stat,
-                                              fetch_preview=False)
-            if 'keep' not in metadata:
-                return
-            try:
-                if int(metadata['keep']) == 0:
-                    return
-            except ValueError:
-                return
+    def _new_entry(self, full_path, stat):
+        mime_type, uncertain_result_ = \
+            Gio.content_type_guess(filename=full_path, data=None)
 
-        if self._filter_by_activity:
-            if not metadata:
-                metadata = _get_file_metadata(full_path, stat,
-                                              fetch_preview=False)
-            if 'activity' not in metadata or \
-                    metadata['activity'] != self._filter_by_activity:
-                return
+        # The metadata is only read once a query needs it
+        return _IndexEntry(stat.st_ino, stat.st_mtime, stat.st_size,
+                           mime_type, _NOT_LOADED)
 
-        if self._date_start is not None and stat.st_mtime < self._date_start:
-            return
+    def _check_entry(self, full_path, entry, directory):
+        """Return the indexed entry, or a new one if the file changed
+
+        Files modified in place do not change the mtime of their directory.
+        The mtime alone could miss a change made in the same timestamp
+        tick than the indexing, so the size is compared as well.
+        """
+        try:
+            stat = os.stat(full_path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                logging.exception('Error reading metadata of file %r',
+                                  full_path)
+            return None
+
+        if (stat.st_ino, stat.st_mtime, stat.st_size) == \
+                (entry.st_ino, entry.st_mtime, entry.st_size):
+            return entry
+
+        entry = self._new_entry(full_path, stat)
+        self._index.update_entry(directory, os.path.basename(full_path),
+                                 entry)
+        return entry
+
+    def _get_properties(self, full_path, entry, directory):
+        if entry.properties is not _NOT_LOADED:
+            return entry.properties
+
+        metadata = _get_file_metadata_from_json(
+            full_path, fetch_preview=False, mount_point=self._mount_point)
+        if metadata is None:
+            properties = None
+        else:
+            properties = {}
+            for key in _INDEXED_PROPERTIES:
+                if key in metadata:
+                    properties[key] = metadata[key]
+
+        self._index.update_entry(directory, os.path.basename(full_path),
+                                 entry._replace(properties=properties))
+        return properties
 
-        if self._date_end is not None and stat.st_mtime > self._date_end:
+    def _add_file(self, full_path, entry, directory):
+        if not self._matches(full_path, entry, directory):
             return
 
-        if self._mime_types:
-            mime_type, uncertain_result_ = \
-                Gio.content_type_guess(filename=full_path, data=None)
-            if mime_type not in self._mime_types:
-                return
+        file_info = (full_path, entry, int(entry.st_mtime), entry.st_size,
+                     None)
+        with self._found_lock:
+            self._found.append(file_info)
 
-        file_info = (full_path, stat, int(stat.st_mtime), stat.st_size,
-                     metadata)
-        self._file_list.append(file_info)
+    def _matches(self, full_path, entry, directory):
+        # Filters that don't need the metadata go first
+        if self._date_start is not None and \
+                entry.st_mtime < self._date_start:
+            return False
 
-        return
+        if self._date_end is not None and entry.st_mtime > self._date_end:
+            return False
+
+        if self._mime_types and entry.mime_type not in self._mime_types:
+            return False
+
+        # entry keeps _NOT_LOADED, the metadata is only read once here
+        loaded = []
+
+        def get_properties():
+            if not loaded:
+                loaded.append(self._get_properties(full_path, entry,
+                                                   directory))
+            return loaded[0]
+
+        if self._matcher is not None and \
+                not self._matcher.match(full_path, get_properties):
+            return False
+
+        if self._only_favorites:
+            properties = get_properties() or {}
+            if 'keep' not in properties:
+                return False
+            try:
+                if int(properties['keep']) == 0:
+                    return False
+            except ValueError:
+                return False
+
+        if self._filter_by_activity:
+            properties = get_properties() or {}
+            if 'activity' not in properties or \
+                    properties['activity'] != self._filter_by_activity:
+                return False
+
+        return True
 
     def _scan_a_directory(self):
-        dir_path = self._pending_directories.pop(0)
+        dir_path = self._pending_directories.popleft()
+
+        try:
+            stat = os.stat(dir_path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                logging.exception('Error reading directory %r', dir_path)
+            return
+
+        id_tuple = stat.st_ino, stat.st_dev
+        if id_tuple in self._visited_directories:
+            return
+        self._visited_directories.add(id_tuple)
+
+        key = self._index.get_directory_key(dir_path, stat)
+        directory = self._index.get_directory(dir_path, key,
+                                              self._index_visited)
+        if directory is not None:
+            for name in directory.subdirs:
+                self._pending_directories.append(dir_path + '/' + name)
+            for name, entry in list(directory.files.items()):
+                full_path = dir_path + '/' + name
+                entry = self._check_entry(full_path, entry, directory)
+                if entry is not None:
+                    self._add_file(full_path, entry, directory)
+            return
 
         try:
-            entries = os.listdir(dir_path)
+            with os.scandir(dir_path) as iterator:
+                entries = list(iterator)
         except OSError as e:
             if e.errno != errno.EACCES:
                 logging.exception('Error reading directory %r', dir_path)
             return
 
+        directory = _IndexedDirectory(key)
         for entry in entries:
-            if entry.startswith('.'):
+            if entry.name.startswith('.'):
                 continue
-            self._pending_files.append(dir_path + '/' + entry)
+            directory.pending += 1
+            self._pending_files.append((entry, directory))
+
+        if directory.pending == 0:
+            self._index.add_directory(dir_path, directory)
         return
 
 
-def _get_file_metadata(path, stat, fetch_preview=True):
+def _get_file_metadata(path, stat, fetch_preview=True, mount_point=None):
     """Return the metadata from the corresponding file.
 
     Reads the metadata stored in the json file or create the
     metadata based on the file properties.
 
     """
-    metadata = _get_file_metadata_from_json(path, fetch_preview)
+    metadata = _get_file_metadata_from_json(path, fetch_preview, mount_point)
     if metadata:
         if 'filesize' not in metadata:
             metadata['filesize'] = stat.st_size
@@ -490,7 +1130,7 @@ def _get_file_metadata(path, stat, fetch_preview=True):
             'description': path}
 
 
-def _get_file_metadata_from_json(path, fetch_preview):
+def _get_file_metadata_from_json(path, fetch_preview, mount_point=None):
     """Read the metadata from the json file and the preview
     stored on the external device.
 
@@ -501,7 +1141,8 @@ def _get_file_metadata_from_json(path, fetch_preview):
     dir_path = os.path.dirname(path)
 
     metadata = None
-    mount_point = _get_mount_point(path)
+    if mount_point is None:
+        mount_point = _get_mount_point(path)
     subdir = ''
     # check if the file is a subdirectory
     if mount_point != dir_path:
@@ -580,7 +1221,10 @@ def find(query_, page_size):
     if mount_points[0] == '/':
         return DatastoreResultSet(query, page_size)
     else:
-        return InplaceResultSet(query, page_size, mount_points[0])
+        settings = Gio.Settings.new('org.sugarlabs.journal')
+        return InplaceResultSet(query, page_size, mount_points[0],
+                                threaded=settings.get_boolean(
+                                    'background-scan'))
 
 
 def _get_mount_point(path):
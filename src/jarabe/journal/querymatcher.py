@@ -0,0 +1,72 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Metadata properties searched, cheapest first
+SEARCHED_PROPERTIES = ['title', 'tags', 'description', 'fulltext']
+
+
+class QueryMatcher(object):
+    """Matches the text of a Journal search on entries of a mount point
+
+    The query is split in words, and a text matches when it contains all
+    of them, ignoring case. A query in double quotes is searched as a
+    single phrase.
+
+    >>> QueryMatcher('sugar paint').match_text('Paint with Sugar')
+    True
+
+    >>> QueryMatcher('"sugar paint"').match_text('Paint with Sugar')
+    False
+
+    """
+
+    def __init__(self, query_text):
+        query_text = query_text.strip()
+        if len(query_text) > 1 and query_text.startswith('"') and \
+                query_text.endswith('"'):
+            terms = [query_text[1:-1]]
+        else:
+            terms = query_text.split(' ')
+        self._terms = [term.casefold() for term in terms if term]
+
+    def is_empty(self):
+        return not self._terms
+
+    def match_text(self, text):
+        if not isinstance(text, str):
+            return False
+        text = text.casefold()
+        for term in self._terms:
+            if term not in text:
+                return False
+        return True
+
+    def match(self, path, get_properties):
+        """Check the path of a file and then its metadata
+
+        get_properties is only called when the path does not match, and
+        returns the metadata properties of the file, or None.
+        """
+        if self.match_text(path):
+            return True
+
+        properties = get_properties()
+        if not properties:
+            return False
+
+        for key in SEARCHED_PROPERTIES:
+            if self.match_text(properties.get(key)):
+                return True
+        return False
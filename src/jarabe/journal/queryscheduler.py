@@ -0,0 +1,130 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from gi.repository import GLib
+
+
+# Milliseconds to wait for more changes after a datastore signal, and the
+# longest a change waits while the signals keep coming.
+CHANGE_DELAY = 300
+MAX_CHANGE_DELAY = 2000
+
+
+class QueryScheduler(object):
+    """Decides when a Journal view needs to query its entries again
+
+    Refresh requests made before the view could run the previous one are
+    merged and bursts of created, updated and deleted signals are handled
+    together. Updated entries are patched in place when the change cannot
+    move them in the results, the other changes mark the view dirty.
+
+    refresh_cb(new_query) rebuilds the model, update_cb(object_id) returns
+    True if it could patch the entry in place and dirty_cb() asks the view
+    for a refresh.
+    """
+
+    def __init__(self, refresh_cb, update_cb, dirty_cb):
+        self._refresh_cb = refresh_cb
+        self._update_cb = update_cb
+        self._dirty_cb = dirty_cb
+
+        self._refresh_sid = None
+        self._new_query = False
+
+        self._changes_sid = None
+        self._first_change_time = None
+        self._updated_ids = set()
+        self._needs_refresh = False
+
+        self._refreshes = 0
+        self._coalesced_refreshes = 0
+        self._patched_entries = 0
+
+    def schedule_refresh(self, new_query=False):
+        self._new_query = self._new_query or new_query
+        if self._refresh_sid is not None:
+            self._coalesced_refreshes += 1
+            return
+        self._refresh_sid = GLib.idle_add(self.__refresh_cb)
+
+    def __refresh_cb(self):
+        self._refresh_sid = None
+        new_query = self._new_query
+        self._new_query = False
+
+        # The new model will include any pending change
+        self._cancel_changes()
+
+        self._refreshes += 1
+        logging.debug('QueryScheduler: %r', self.get_statistics())
+        self._refresh_cb(new_query)
+        return False
+
+    def entry_changed(self, object_id, updated=False):
+        if updated:
+            self._updated_ids.add(object_id)
+        else:
+            self._needs_refresh = True
+
+        now = GLib.get_monotonic_time() // 1000
+        if self._changes_sid is None:
+            self._first_change_time = now
+        else:
+            GLib.source_remove(self._changes_sid)
+
+        waited = now - self._first_change_time
+        delay = max(0, min(CHANGE_DELAY, MAX_CHANGE_DELAY - waited))
+        self._changes_sid = GLib.timeout_add(delay, self.__changes_cb)
+
+    def __changes_cb(self):
+        self._changes_sid = None
+        updated_ids = self._updated_ids
+        needs_refresh = self._needs_refresh
+        self._updated_ids = set()
+        self._needs_refresh = False
+
+        if not needs_refresh:
+            for object_id in updated_ids:
+                if not self._update_cb(object_id):
+                    needs_refresh = True
+                    break
+                self._patched_entries += 1
+
+        if needs_refresh:
+            self._dirty_cb()
+        return False
+
+    def _cancel_changes(self):
+        if self._changes_sid is not None:
+            GLib.source_remove(self._changes_sid)
+            self._changes_sid = None
+        self._updated_ids = set()
+        self._needs_refresh = False
+
+    def stop(self):
+        if self._refresh_sid is not None:
+            GLib.source_remove(self._refresh_sid)
+            self._refresh_sid = None
+        self._cancel_changes()
+
+    def get_statistics(self):
+        """Return the refreshes run and the queries they spared"""
+        return {'refreshes': self._refreshes,
+                'coalesced_refreshes': self._coalesced_refreshes,
+                'patched_entries': self._patched_entries,
+                'saved_queries': self._coalesced_refreshes +
+                self._patched_entries}
@@ -83,6 +83,8 @@ from jarabe.view.service import UIService
 from jarabe import apisocket
 from jarabe import testrunner
 from jarabe.model import brightness
+from jarabe.model import bundleregistry
+from jarabe.model import launchtimes
 
 
 _metacity_process = None
@@ -223,12 +225,18 @@ def _begin_desktop_startup():
 
     session_manager = get_session_manager()
     session_manager.start()
+    session_manager.shutdown_signal.connect(__session_shutdown_cb)
 
     # open homewindow before window_manager to let desktop appear fast
     home_window = homewindow.get_instance()
     home_window.show()
 
 
+def __session_shutdown_cb(session_manager):
+    bundleregistry.get_registry().flush_favorites()
+    launchtimes.get_instance().flush()
+
+
 def __intro_window_done_cb(window):
     _begin_desktop_startup()
 
@@ -374,6 +382,8 @@ def main():
     except KeyboardInterrupt:
         print('Ctrl+C pressed, exiting...')
 
+    bundleregistry.get_registry().flush_favorites()
+    launchtimes.get_instance().flush()
     _stop_window_manager()
 
 
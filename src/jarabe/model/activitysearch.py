@@ -0,0 +1,188 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Search of the installed activities, shared by the views filtering them:
+the favorites views, the activities list and the activity chooser of the
+frame.
+
+The names, tags, bundle ids and summaries of the activities are normalized
+once, when the bundle registry adds or changes a bundle, and their words
+kept in a sorted list, so a query is answered with a few binary searches.
+"""
+
+import re
+import bisect
+import logging
+
+from jarabe.model import bundleregistry
+from jarabe.util.normalize import normalize_string
+
+# Score of a query word matching the start of a word in each field
+NAME_SCORE = 8
+TAG_SCORE = 4
+BUNDLE_ID_SCORE = 2
+SUMMARY_SCORE = 1
+# Query words can match anywhere in the name, like 'paint' in MusicPainter
+NAME_SUBSTRING_SCORE = 3
+EXACT_NAME_SCORE = 100
+
+_WORD_SEPARATORS = re.compile(r'[\s.,;:!?()\[\]{}"\'/_-]+')
+
+_instance = None
+
+
+def _split_words(text):
+    return [word for word in _WORD_SEPARATORS.split(text) if word]
+
+
+class _IndexedActivity(object):
+
+    def __init__(self, bundle):
+        self.bundle_id = bundle.get_bundle_id()
+        self.name = normalize_string(bundle.get_name() or '')
+
+        self.words = {}
+        fields = [(self.name, NAME_SCORE)]
+        for tag in getattr(bundle, 'get_tags', lambda: None)() or []:
+            fields.append((normalize_string(tag), TAG_SCORE))
+        fields.append((normalize_string(self.bundle_id), BUNDLE_ID_SCORE))
+        summary = getattr(bundle, 'get_summary', lambda: None)()
+        if summary:
+            fields.append((normalize_string(summary), SUMMARY_SCORE))
+
+        for text, score in fields:
+            for word in _split_words(text):
+                self.words[word] = max(score, self.words.get(word, 0))
+
+
+class ActivitySearchIndex(object):
+    """Finds the activities matching a query, best matches first
+
+    Every word of the query must match the start of a word of the name,
+    tags, bundle id or summary of an activity, or a part of its name.
+    """
+
+    def __init__(self):
+        self._activities = {}
+        self._words = None
+        self._last_query = None
+        self._last_scores = None
+
+    def add_bundle(self, bundle):
+        if bundle.get_bundle_id() is None:
+            return
+        self._activities[bundle.get_bundle_id()] = _IndexedActivity(bundle)
+        self._invalidate()
+
+    def remove_bundle(self, bundle_id):
+        if self._activities.pop(bundle_id, None) is not None:
+            self._invalidate()
+
+    def _invalidate(self):
+        # The sorted words are built again on the next query
+        self._words = None
+        self._last_query = None
+        self._last_scores = None
+
+    def _get_words(self):
+        if self._words is None:
+            self._words = sorted(
+                (word, activity.bundle_id, score)
+                for activity in self._activities.values()
+                for word, score in activity.words.items())
+        return self._words
+
+    def _match_word(self, query_word, candidates):
+        words = self._get_words()
+        scores = {}
+        index = bisect.bisect_left(words, (query_word, ))
+        while index < len(words) and words[index][0].startswith(query_word):
+            word_, bundle_id, score = words[index]
+            if candidates is None or bundle_id in candidates:
+                scores[bundle_id] = max(score, scores.get(bundle_id, 0))
+            index += 1
+
+        if candidates is None:
+            candidates = self._activities
+        for bundle_id in candidates:
+            if query_word in self._activities[bundle_id].name:
+                scores[bundle_id] = max(NAME_SUBSTRING_SCORE,
+                                        scores.get(bundle_id, 0))
+        return scores
+
+    def get_scores(self, query):
+        """Return a dictionary of the matching bundle ids to their score"""
+        query = normalize_string(query).strip()
+        if query == self._last_query:
+            return self._last_scores
+
+        scores = None
+        candidates = None
+        # Typing one more character can only remove matches
+        if self._last_query and query.startswith(self._last_query) and \
+                len(_split_words(query)) == \
+                len(_split_words(self._last_query)):
+            candidates = self._last_scores
+
+        for query_word in _split_words(query):
+            word_scores = self._match_word(query_word, candidates)
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = dict((bundle_id, score + word_scores[bundle_id])
+                              for bundle_id, score in scores.items()
+                              if bundle_id in word_scores)
+            candidates = scores
+
+        if scores is None:
+            scores = dict.fromkeys(self._activities, 0)
+
+        for bundle_id in scores:
+            if self._activities[bundle_id].name == query:
+                scores[bundle_id] += EXACT_NAME_SCORE
+
+        self._last_query = query
+        self._last_scores = scores
+        return scores
+
+    def search(self, query):
+        """Return the matching bundle ids, best matches first"""
+        scores = self.get_scores(query)
+        return sorted(scores, key=lambda bundle_id: (
+            -scores[bundle_id], self._activities[bundle_id].name))
+
+
+def get_index():
+    """Return the index of the activities of the bundle registry"""
+    global _instance
+    if _instance is None:
+        _instance = ActivitySearchIndex()
+        registry = bundleregistry.get_registry()
+        for bundle in registry:
+            _instance.add_bundle(bundle)
+        registry.connect('bundle-added', _bundle_added_cb)
+        registry.connect('bundle-changed', _bundle_added_cb)
+        registry.connect('bundle-removed', _bundle_removed_cb)
+        logging.debug('Indexed %d activities for searching', len(registry))
+    return _instance
+
+
+def _bundle_added_cb(registry, bundle):
+    _instance.add_bundle(bundle)
+
+
+def _bundle_removed_cb(registry, bundle):
+    _instance.remove_bundle(bundle.get_bundle_id())
@@ -71,9 +71,7 @@ class AdHocManager(GObject.GObject):
                           self._CHANNEL_6: None,
                           self._CHANNEL_11: None}
 
-        for channel in (self._CHANNEL_1, self._CHANNEL_6, self._CHANNEL_11):
-            if not self._find_connection(channel):
-                self._add_connection(channel)
+        network.get_connections().call_when_ready(self._ensure_connections)
 
         settings = Gio.Settings.new('org.sugarlabs.network')
         self._autoconnect_enabled = settings.get_boolean('adhoc-autoconnect')
@@ -181,6 +179,11 @@ class AdHocManager(GObject.GObject):
         channel -- Channel to connect to (should be 1, 6, 11)
 
         """
+        connections = network.get_connections()
+        if not connections.is_ready():
+            connections.call_when_ready(self.activate_channel, channel)
+            return
+
         connection = self._find_connection(channel)
         if connection:
             connection.activate(self._device.object_path)
@@ -205,6 +208,11 @@ class AdHocManager(GObject.GObject):
         settings.ip4_config.method = 'link-local'
         network.add_connection(settings)
 
+    def _ensure_connections(self):
+        for channel in (self._CHANNEL_1, self._CHANNEL_6, self._CHANNEL_11):
+            if not self._find_connection(channel):
+                self._add_connection(channel)
+
     def _find_connection(self, channel):
         connection_id = self._get_connection_id(channel)
         return network.find_connection_by_id(connection_id)
@@ -0,0 +1,263 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import logging
+import tempfile
+from threading import Lock
+
+from sugar3.bundle import activitybundle
+from sugar3.bundle.activitybundle import ActivityBundle
+from sugar3.bundle.contentbundle import ContentBundle
+
+_VERSION = 2
+
+# The getters the shell calls on every bundle while it starts
+_FIELDS = ['get_bundle_id', 'get_activity_version', 'get_path', 'get_name',
+           'get_icon', 'get_tags', 'get_show_launcher',
+           'get_installation_time', 'is_user_activity']
+_ACTIVITY_FIELDS = _FIELDS + ['get_mime_types', 'get_single_instance']
+_CONTENT_FIELDS = _FIELDS + ['get_start_uri']
+
+
+class _CachedBundle(object):
+    """A bundle whose startup getters are answered from the cache
+
+    The other methods and attributes are those of the bundle parsed by
+    load_bundle the first time one of them is used.
+    """
+
+    def __init__(self, fields, load_bundle):
+        """Build the bundle from the getter values in the fields dict"""
+        # Named apart from the attributes of the toolkit bundles
+        self._cached_fields = fields
+        self._cached_load_bundle = load_bundle
+        self._cached_bundle = None
+
+    def _get_cached_bundle(self):
+        if self._cached_bundle is None:
+            self._cached_bundle = self._cached_load_bundle(
+                self._cached_fields['get_path'])
+        return self._cached_bundle
+
+    def __getattr__(self, name):
+        # Only called for the attributes this object does not have
+        if name.startswith('__') or name.startswith('_cached_'):
+            raise AttributeError(name)
+        return getattr(self._get_cached_bundle(), name)
+
+
+def _cached_getter(name):
+    def getter(self):
+        if name in self._cached_fields:
+            return self._cached_fields[name]
+        return getattr(self._get_cached_bundle(), name)()
+    getter.__name__ = name
+    return getter
+
+
+def _delegate(name):
+    def method(self, *args, **kwargs):
+        return getattr(self._get_cached_bundle(), name)(*args, **kwargs)
+    method.__name__ = name
+    return method
+
+
+def _setup_cached_class(cached_class, bundle_class, fields):
+    # The methods of the toolkit never run on the cached bundle itself
+    for name in dir(bundle_class):
+        if not name.startswith('_') and \
+                callable(getattr(bundle_class, name)):
+            setattr(cached_class, name, _delegate(name))
+    for name in fields:
+        setattr(cached_class, name, _cached_getter(name))
+
+
+class _CachedActivityBundle(_CachedBundle, ActivityBundle):
+    pass
+
+
+class _CachedContentBundle(_CachedBundle, ContentBundle):
+    pass
+
+
+_setup_cached_class(_CachedActivityBundle, ActivityBundle, _ACTIVITY_FIELDS)
+_setup_cached_class(_CachedContentBundle, ContentBundle, _CONTENT_FIELDS)
+
+# class name to the class of the cached bundles and the fields they keep
+_BUNDLE_CLASSES = {
+    'ActivityBundle': (ActivityBundle, _CachedActivityBundle,
+                       _ACTIVITY_FIELDS),
+    'ContentBundle': (ContentBundle, _CachedContentBundle, _CONTENT_FIELDS),
+}
+
+
+def _get_languages():
+    """Return the language directories a bundle takes its linfo from"""
+    languages = []
+    for variable in ['LANGUAGE', 'LANG']:
+        for language in os.environ.get(variable, '').split(':'):
+            language = language.split('.')[0].split('@')[0]
+            for name in [language, language.split('_')[0]]:
+                if name and name not in languages:
+                    languages.append(name)
+    return languages
+
+
+class BundleCache(object):
+    """Keeps the parsed bundles between sessions
+
+    Each bundle is stored with the mtime of its directory, of its
+    activity/activity.info file and of the activity.linfo files of the
+    current language, and parsed again only when one of them changes.
+    Only the values of the getters the shell calls while it starts are
+    kept. The whole cache is discarded when the language or the toolkit
+    changes, as both change what a parsed bundle holds.
+
+    get_bundle can be called from several threads.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = Lock()
+        self._entries = {}
+        self._used = set()
+        self._dirty = False
+        self._languages = _get_languages()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_environment(self):
+        return {'version': _VERSION,
+                'toolkit': os.stat(activitybundle.__file__).st_mtime,
+                'language': [os.environ.get('LANG'),
+                             os.environ.get('LANGUAGE')]}
+
+    def load(self):
+        try:
+            with open(self._path) as f:
+                data = json.load(f)
+        except (IOError, ValueError):
+            logging.debug('No bundle cache in %s', self._path)
+            return
+
+        if not isinstance(data, dict) or \
+                data.get('environment') != self._get_environment():
+            logging.debug('Discarding the bundle cache, the environment '
+                          'changed')
+            self._dirty = True
+            return
+
+        self._entries = data.get('bundles', {})
+
+    def save(self):
+        # Forget the bundles that were not installed anymore
+        for bundle_path in set(self._entries) - self._used:
+            del self._entries[bundle_path]
+            self._dirty = True
+
+        if not self._dirty:
+            return
+
+        data = {'environment': self._get_environment(),
+                'bundles': self._entries}
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self._path))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.rename(temp_path, self._path)
+        except (IOError, OSError):
+            logging.exception('Cannot write the bundle cache %s', self._path)
+            if temp_path is not None and os.path.exists(temp_path):
+                os.unlink(temp_path)
+        else:
+            self._dirty = False
+
+    def _get_key(self, bundle_path):
+        key = []
+        paths = [bundle_path,
+                 os.path.join(bundle_path, 'activity', 'activity.info')]
+        for language in self._languages:
+            paths.append(os.path.join(bundle_path, 'locale', language,
+                                      'activity.linfo'))
+        for path in paths:
+            try:
+                key.append(os.stat(path).st_mtime)
+            except OSError:
+                key.append(None)
+        return key
+
+    def get_bundle(self, bundle_path, load_bundle):
+        """Return the bundle in bundle_path
+
+        load_bundle(bundle_path) parses the bundle when it is not cached
+        or it changed.
+        """
+        key = self._get_key(bundle_path)
+        with self._lock:
+            self._used.add(bundle_path)
+            entry = self._entries.get(bundle_path)
+
+        if entry is not None and entry['key'] == key:
+            bundle = self._restore(entry, load_bundle)
+            if bundle is not None:
+                with self._lock:
+                    self.hits += 1
+                return bundle
+
+        bundle = load_bundle(bundle_path)
+
+        entry = None
+        if bundle is not None:
+            entry = self._store(bundle, key)
+        with self._lock:
+            self.misses += 1
+            if entry is not None:
+                self._entries[bundle_path] = entry
+            else:
+                self._entries.pop(bundle_path, None)
+            self._dirty = True
+        return bundle
+
+    def _store(self, bundle, key):
+        class_name = type(bundle).__name__
+        classes = _BUNDLE_CLASSES.get(class_name)
+        if classes is None or classes[0] is not type(bundle):
+            return None
+
+        fields = {}
+        for name in classes[2]:
+            if hasattr(bundle, name):
+                fields[name] = getattr(bundle, name)()
+        try:
+            # Only keep bundles that come back exactly as they were
+            if json.loads(json.dumps(fields)) != fields:
+                return None
+        except (TypeError, ValueError):
+            return None
+
+        return {'key': key, 'class': class_name, 'fields': fields}
+
+    def _restore(self, entry, load_bundle):
+        classes = _BUNDLE_CLASSES.get(entry.get('class'))
+        fields = entry.get('fields')
+        if classes is None or not isinstance(fields, dict) or \
+                'get_path' not in fields:
+            return None
+
+        return classes[1](fields, load_bundle)
@@ -16,6 +16,9 @@
 
 import os
 import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from threading import Thread, Lock
 
 from gi.repository import GObject
@@ -33,6 +36,7 @@ from sugar3 import env
 
 from jarabe.model import desktop
 from jarabe.model import mimeregistry
+from jarabe.model.bundlecache import BundleCache
 
 """
 The bundle registry is a database of sorts of the trackable bundles available
@@ -57,6 +61,14 @@ immediately by the shell.
 _DEFAULT_VIEW = 0
 _instance = None
 
+# Threads parsing the installed bundles at startup, most of the time is
+# spent waiting for the disk
+_SCAN_WORKERS = 8
+# Slowest bundles reported in the startup log
+_SLOWEST_BUNDLES = 5
+# Seconds to wait for more changes before writing the favorites
+_FAVORITES_WRITE_DELAY = 2
+
 
 class BundleRegistry(GObject.GObject):
     """Tracks the available activity bundles"""
@@ -84,6 +96,12 @@ class BundleRegistry(GObject.GObject):
         self._lock = Lock()
         self._bundles = []
 
+        # Indexes of _bundles, updated along with it
+        self._bundles_by_id = {}
+        self._bundles_by_version = {}
+        self._bundles_by_path = {}
+        self._bundles_by_mime_type = {}
+
         # hold a reference to the monitors so they don't get disposed
         self._gio_monitors = []
 
@@ -92,8 +110,9 @@ class BundleRegistry(GObject.GObject):
         for data_dir in GLib.get_system_data_dirs():
             dirs.append(os.path.join(data_dir, "sugar", "activities"))
 
+        self._scan_directories(dirs)
+
         for activity_dir in dirs:
-            self._scan_directory(activity_dir)
             directory = Gio.File.new_for_path(activity_dir)
             monitor = directory.monitor_directory(
                 flags=Gio.FileMonitorFlags.NONE, cancellable=None)
@@ -103,6 +122,7 @@ class BundleRegistry(GObject.GObject):
         self._favorite_bundles = []
         for i in range(desktop.get_number_of_views()):
             self._favorite_bundles.append({})
+        self._favorites_writer = _FavoritesWriter(self)
 
         settings = Gio.Settings.new('org.sugarlabs')
         self._protected_activities = settings.get_strv('protected-activities')
@@ -181,14 +201,20 @@ class BundleRegistry(GObject.GObject):
             raise ValueError('bundle_id cannot contain spaces')
         return '%s %s' % (bundle_id, version)
 
+    def get_favorites_path(self, favorite_view):
+        # Special-case 0 for backward compatibility
+        if favorite_view == 0:
+            return env.get_profile_path('favorite_activities')
+        else:
+            return env.get_profile_path(
+                'favorite_activities_%d' % (favorite_view))
+
+    def get_favorites_data(self, favorite_view):
+        return {'favorites': self._favorite_bundles[favorite_view]}
+
     def _load_favorites(self):
         for i in range(desktop.get_number_of_views()):
-            # Special-case 0 for backward compatibility
-            if i == 0:
-                favorites_path = env.get_profile_path('favorite_activities')
-            else:
-                favorites_path = env.get_profile_path(
-                    'favorite_activities_%d' % (i))
+            favorites_path = self.get_favorites_path(i)
             if os.path.exists(favorites_path):
                 favorites_data = json.load(open(favorites_path))
 
@@ -244,10 +270,7 @@ class BundleRegistry(GObject.GObject):
     def get_bundle(self, bundle_id):
         """Returns an bundle given his service name"""
         with self._lock:
-            for bundle in self._bundles:
-                if bundle.get_bundle_id() == bundle_id:
-                    return bundle
-        return None
+            return self._bundles_by_id.get(bundle_id)
 
     def __iter__(self):
         with self._lock:
@@ -258,9 +281,9 @@ class BundleRegistry(GObject.GObject):
         with self._lock:
             return len(self._bundles)
 
-    def _scan_directory(self, path):
+    def _list_bundle_dirs(self, path):
         if not os.path.isdir(path):
-            return
+            return []
 
         # Sort by mtime to ensure a stable activity order
         bundles = {}
@@ -275,14 +298,74 @@ class BundleRegistry(GObject.GObject):
 
         bundle_dirs = list(bundles.keys())
         bundle_dirs.sort(key=lambda x: bundles[x])
-        for folder in bundle_dirs:
+        return bundle_dirs
+
+    def _scan_directories(self, paths):
+        """Add the bundles installed in the directories
+
+        The bundles are parsed in parallel, and added in the same order as
+        if each directory was scanned in turn. Bundles that did not change
+        since the last session come from the bundle cache.
+        """
+        start = time.time()
+        bundle_dirs = []
+        for path in paths:
+            bundle_dirs.extend(self._list_bundle_dirs(path))
+
+        cache = BundleCache(env.get_profile_path('bundle_cache'))
+        cache.load()
+
+        def load_bundle(bundle_path):
+            return self._timed_load_bundle(bundle_path, cache)
+
+        with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as executor:
+            results = list(executor.map(load_bundle, bundle_dirs))
+        cache.save()
+
+        for folder, (bundle, elapsed_) in zip(bundle_dirs, results):
+            if bundle is None:
+                continue
             try:
-                self.add_bundle(folder, emit_signals=False)
+                self._add_loaded_bundle(bundle, emit_signals=False)
             except:
                 # pylint: disable=W0702
                 logging.exception('Error while processing installed activity'
                                   ' bundle %s:', folder)
 
+        slowest = sorted(zip(bundle_dirs, results),
+                         key=lambda item: item[1][1], reverse=True)
+        logging.debug('STARTUP: Scanned %d bundles in %.3f s, slowest %s',
+                      len(bundle_dirs), time.time() - start,
+                      ', '.join('%s %.3f s' % (os.path.basename(folder),
+                                               elapsed)
+                                for folder, (bundle_, elapsed)
+                                in slowest[:_SLOWEST_BUNDLES]))
+        logging.debug('STARTUP: Bundle cache %d hits, %d misses',
+                      cache.hits, cache.misses)
+
+    def _timed_load_bundle(self, bundle_path, cache):
+        # Runs in the scan threads
+        start = time.time()
+        try:
+            bundle = cache.get_bundle(bundle_path, self._load_bundle)
+        except Exception:
+            logging.exception('Error while processing installed activity'
+                              ' bundle %s:', bundle_path)
+            bundle = None
+        return bundle, time.time() - start
+
+    def _load_bundle(self, bundle_path):
+        try:
+            bundle = bundle_from_dir(bundle_path)
+        except MalformedBundleException:
+            logging.exception('Error loading bundle %r', bundle_path)
+            return None
+
+        # None is a valid return value from bundle_from_dir helper.
+        if bundle is None:
+            logging.error('No bundle in %r', bundle_path)
+        return bundle
+
     def add_bundle(self, bundle_path, set_favorite=False, emit_signals=True,
                    force_downgrade=False):
         """
@@ -292,17 +375,15 @@ class BundleRegistry(GObject.GObject):
         Otherwise, the newly added bundle is returned on success, or None on
         failure.
         """
-        try:
-            bundle = bundle_from_dir(bundle_path)
-        except MalformedBundleException:
-            logging.exception('Error loading bundle %r', bundle_path)
-            return None
-
-        # None is a valid return value from bundle_from_dir helper.
+        bundle = self._load_bundle(bundle_path)
         if bundle is None:
-            logging.error('No bundle in %r', bundle_path)
             return None
 
+        return self._add_loaded_bundle(bundle, set_favorite, emit_signals,
+                                       force_downgrade)
+
+    def _add_loaded_bundle(self, bundle, set_favorite=False,
+                           emit_signals=True, force_downgrade=False):
         bundle_id = bundle.get_bundle_id()
         logging.debug('STARTUP: Adding bundle %s', bundle_id)
         installed = self.get_bundle(bundle_id)
@@ -330,19 +411,63 @@ class BundleRegistry(GObject.GObject):
 
         with self._lock:
             self._bundles.append(bundle)
+            self._index_bundle(bundle)
         if emit_signals:
             self.emit('bundle-added', bundle)
         return bundle
 
+    def _get_mime_types(self, bundle):
+        if not isinstance(bundle, ActivityBundle):
+            return []
+        return bundle.get_mime_types() or []
+
+    def _index_bundle(self, bundle):
+        # Called with the lock held
+        bundle_id = bundle.get_bundle_id()
+        if bundle_id not in self._bundles_by_id:
+            self._bundles_by_id[bundle_id] = bundle
+        key = (bundle_id, bundle.get_activity_version())
+        if key not in self._bundles_by_version:
+            self._bundles_by_version[key] = bundle
+        self._bundles_by_path[bundle.get_path()] = bundle
+        for mime_type in self._get_mime_types(bundle):
+            self._bundles_by_mime_type.setdefault(mime_type, []).append(bundle)
+
+    def _unindex_bundle(self, bundle):
+        # Called with the lock held, after the bundle left _bundles
+        bundle_id = bundle.get_bundle_id()
+        if self._bundles_by_id.get(bundle_id) is bundle:
+            del self._bundles_by_id[bundle_id]
+            for other in self._bundles:
+                if other.get_bundle_id() == bundle_id:
+                    self._bundles_by_id[bundle_id] = other
+                    break
+
+        key = (bundle_id, bundle.get_activity_version())
+        if self._bundles_by_version.get(key) is bundle:
+            del self._bundles_by_version[key]
+            for other in self._bundles:
+                if (other.get_bundle_id(),
+                        other.get_activity_version()) == key:
+                    self._bundles_by_version[key] = other
+                    break
+
+        if self._bundles_by_path.get(bundle.get_path()) is bundle:
+            del self._bundles_by_path[bundle.get_path()]
+
+        for mime_type in self._get_mime_types(bundle):
+            bundles = self._bundles_by_mime_type.get(mime_type, [])
+            if bundle in bundles:
+                bundles.remove(bundle)
+            if not bundles:
+                self._bundles_by_mime_type.pop(mime_type, None)
+
     def remove_bundle(self, bundle_path, emit_signals=True):
-        removed = None
-        self._lock.acquire()
-        for bundle in self._bundles:
-            if bundle.get_path() == bundle_path:
-                self._bundles.remove(bundle)
-                removed = bundle
-                break
-        self._lock.release()
+        with self._lock:
+            removed = self._bundles_by_path.get(bundle_path)
+            if removed is not None:
+                self._bundles.remove(removed)
+                self._unindex_bundle(removed)
 
         if emit_signals and removed is not None:
             self.emit('bundle-removed', removed)
@@ -354,18 +479,18 @@ class BundleRegistry(GObject.GObject):
         mime = mimeregistry.get_registry()
         default_bundle_id = mime.get_default_activity(mime_type)
         default_bundle = None
+        system_default_id = self.get_default_for_type(mime_type)
 
-        for bundle in self:
-            if not isinstance(bundle, ActivityBundle):
-                continue
-            if mime_type in (bundle.get_mime_types() or []):
-                if bundle.get_bundle_id() == default_bundle_id:
-                    default_bundle = bundle
-                elif self.get_default_for_type(mime_type) == \
-                        bundle.get_bundle_id():
-                    result.insert(0, bundle)
-                else:
-                    result.append(bundle)
+        with self._lock:
+            bundles = list(self._bundles_by_mime_type.get(mime_type, []))
+
+        for bundle in bundles:
+            if bundle.get_bundle_id() == default_bundle_id:
+                default_bundle = bundle
+            elif system_default_id == bundle.get_bundle_id():
+                result.insert(0, bundle)
+            else:
+                result.append(bundle)
 
         if default_bundle is not None:
             result.insert(0, default_bundle)
@@ -377,10 +502,9 @@ class BundleRegistry(GObject.GObject):
 
     def _find_bundle(self, bundle_id, version):
         with self._lock:
-            for bundle in self._bundles:
-                if bundle.get_bundle_id() == bundle_id and \
-                        bundle.get_activity_version() == version:
-                    return bundle
+            bundle = self._bundles_by_version.get((bundle_id, version))
+        if bundle is not None:
+            return bundle
         raise ValueError('No bundle %r with version %r exists.' %
                          (bundle_id, version))
 
@@ -451,22 +575,19 @@ class BundleRegistry(GObject.GObject):
                 tuple(self._favorite_bundles[favorite_view][key]['position'])
 
     def _write_favorites_file(self, favorite_view):
-        if favorite_view == 0:
-            path = env.get_profile_path('favorite_activities')
-        else:
-            path = env.get_profile_path('favorite_activities_%d' %
-                                        (favorite_view))
-        favorites_data = {
-            'favorites': self._favorite_bundles[favorite_view]}
-        json.dump(favorites_data, open(path, 'w'), indent=1)
+        self._favorites_writer.queue_write(favorite_view)
+
+    def flush_favorites(self):
+        """Write the pending changes of the favorites now"""
+        self._favorites_writer.flush()
 
     def is_installed(self, bundle):
-        for installed_bundle in self:
-            if bundle.get_bundle_id() == installed_bundle.get_bundle_id() and \
-                    NormalizedVersion(bundle.get_activity_version()) == \
-                    NormalizedVersion(installed_bundle.get_activity_version()):
-                return True
-        return False
+        # add_bundle keeps a single version of each bundle id
+        installed_bundle = self.get_bundle(bundle.get_bundle_id())
+        if installed_bundle is None:
+            return False
+        return NormalizedVersion(bundle.get_activity_version()) == \
+            NormalizedVersion(installed_bundle.get_activity_version())
 
     def install(self, bundle, force_downgrade=False):
         """
@@ -611,6 +732,72 @@ class BundleRegistry(GObject.GObject):
         return bundles
 
 
+class _FavoritesWriter(object):
+    """
+    Writes the favorites files of the registry a moment after they change,
+    so a burst of changes, like dragging icons around the favorites ring,
+    results in a single write of each file. Files are replaced atomically
+    and not written at all when their content did not change. Only for
+    internal bundleregistry use.
+    """
+
+    def __init__(self, registry):
+        self._registry = registry
+        self._pending = set()
+        self._written = {}
+        self._timeout_sid = None
+
+    def queue_write(self, favorite_view):
+        self._pending.add(favorite_view)
+        if self._timeout_sid is None:
+            self._timeout_sid = GLib.timeout_add_seconds(
+                _FAVORITES_WRITE_DELAY, self.__timeout_cb)
+
+    def __timeout_cb(self):
+        self._timeout_sid = None
+        self.flush()
+        return False
+
+    def flush(self):
+        if self._timeout_sid is not None:
+            GLib.source_remove(self._timeout_sid)
+            self._timeout_sid = None
+
+        pending = self._pending
+        self._pending = set()
+        for favorite_view in sorted(pending):
+            self._write(favorite_view)
+
+    def _write(self, favorite_view):
+        path = self._registry.get_favorites_path(favorite_view)
+        content = json.dumps(self._registry.get_favorites_data(favorite_view),
+                             indent=1)
+
+        if path not in self._written:
+            try:
+                with open(path) as f:
+                    self._written[path] = f.read()
+            except IOError:
+                pass
+        if self._written.get(path) == content:
+            return
+
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.rename(temp_path, path)
+        except (IOError, OSError):
+            logging.exception('Error while writing %s', path)
+            if temp_path is not None and os.path.exists(temp_path):
+                os.unlink(temp_path)
+            return
+        self._written[path] = content
+
+
 class _InstallQueue(object):
     """
     A class to represent a queue of bundles to be installed, and to handle
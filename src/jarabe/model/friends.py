@@ -40,19 +40,11 @@ class FriendBuddyModel(BuddyModel):
         BuddyModel.__init__(self, nick=nick, key=key, account=account,
                             contact_id=contact_id)
 
-        neighborhood_model = neighborhood.get_model()
-        neighborhood_model.connect('buddy-added', self.__buddy_added_cb)
-        neighborhood_model.connect('buddy-removed', self.__buddy_removed_cb)
-
-        buddy = neighborhood_model.get_buddy_by_key(key)
+        # Friends tells the friend when its buddy comes and goes
+        buddy = neighborhood.get_model().get_buddy_by_key(key)
         if buddy is not None:
             self._set_online_buddy(buddy)
 
-    def __buddy_added_cb(self, model_, buddy):
-        if buddy.key != self.key:
-            return
-        self._set_online_buddy(buddy)
-
     def _set_online_buddy(self, buddy):
         self._online_buddy = buddy
         self._online_buddy.connect('notify::color', self.__notify_color_cb)
@@ -66,9 +58,7 @@ class FriendBuddyModel(BuddyModel):
         if buddy.account != self.account:
             self.account = buddy.account
 
-    def __buddy_removed_cb(self, model_, buddy):
-        if buddy.key != self.key:
-            return
+    def _set_offline(self):
         self._online_buddy = None
         self.notify('color')
         self.notify('present')
@@ -112,8 +102,22 @@ class Friends(GObject.GObject):
         self._friends = {}
         self._path = os.path.join(env.get_profile_path(), 'friends')
 
+        neighborhood_model = neighborhood.get_model()
+        neighborhood_model.connect('buddy-added', self.__buddy_added_cb)
+        neighborhood_model.connect('buddy-removed', self.__buddy_removed_cb)
+
         self.load()
 
+    def __buddy_added_cb(self, model_, buddy):
+        friend = self._friends.get(buddy.key)
+        if friend is not None:
+            friend._set_online_buddy(buddy)
+
+    def __buddy_removed_cb(self, model_, buddy):
+        friend = self._friends.get(buddy.key)
+        if friend is not None:
+            friend._set_offline()
+
     def has_buddy(self, buddy):
         return buddy.get_key() in self._friends
 
@@ -0,0 +1,213 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Timing of the activity launches.
+
+The shell model marks the phases of each launch, counted from the moment
+it is notified of the launch. The durations of the last launches of each
+bundle are kept in the launch_times file of the profile, and their
+percentiles can be printed with sugar-control-panel -g launch_times.
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import tempfile
+
+from gi.repository import GLib
+
+from sugar3 import env
+
+_VERSION = 1
+
+LAUNCHER_SHOWN = 'launcher'
+SERVICE_STARTED = 'service'
+FIRST_WINDOW = 'first-window'
+MAIN_WINDOW = 'main-window'
+PHASES = [LAUNCHER_SHOWN, SERVICE_STARTED, FIRST_WINDOW, MAIN_WINDOW]
+
+# Durations kept for each phase of a bundle, the oldest are dropped
+_SAMPLES = 50
+# Seconds after a launch before the log is written
+_SAVE_DELAY = 5
+
+_instance = None
+
+
+def _percentile(samples, percent):
+    """Return the nearest-rank percentile of the sorted samples"""
+    index = int(math.ceil(percent / 100. * len(samples))) - 1
+    return samples[max(0, index)]
+
+
+class _Launch(object):
+
+    def __init__(self, bundle_id, start_time):
+        self.bundle_id = bundle_id
+        self.start_time = start_time
+        self.phases = {}
+
+
+class LaunchTimes(object):
+    """Records how long the phases of the activity launches take
+
+    start is called when a launch begins, mark when it reaches one of
+    the PHASES, and finish or fail when it ends. Only the first time
+    a phase is reached is recorded.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._bundles = {}
+        self._launches = {}
+        self._save_sid = None
+
+    def load(self):
+        try:
+            with open(self._path) as f:
+                data = json.load(f)
+        except (IOError, ValueError):
+            logging.debug('No launch times in %s', self._path)
+            return
+
+        if not isinstance(data, dict) or data.get('version') != _VERSION:
+            logging.debug('Discarding the launch times, the version changed')
+            return
+
+        self._bundles = data.get('bundles', {})
+
+    def save(self):
+        if self._save_sid is not None:
+            GLib.source_remove(self._save_sid)
+            self._save_sid = None
+
+        data = {'version': _VERSION, 'bundles': self._bundles}
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self._path))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.rename(temp_path, self._path)
+        except (IOError, OSError):
+            logging.exception('Cannot write the launch times %s', self._path)
+            if temp_path is not None and os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def flush(self):
+        """Write the launches waiting for the save delay now"""
+        if self._save_sid is not None:
+            self.save()
+
+    def _queue_save(self):
+        if self._save_sid is None:
+            self._save_sid = GLib.timeout_add_seconds(_SAVE_DELAY,
+                                                      self.__save_cb)
+
+    def __save_cb(self):
+        self._save_sid = None
+        self.save()
+        return False
+
+    def _get_bundle(self, bundle_id):
+        if bundle_id not in self._bundles:
+            self._bundles[bundle_id] = {'launches': 0, 'failures': 0,
+                                        'phases': {}}
+        return self._bundles[bundle_id]
+
+    def start(self, activity_id, bundle_id, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        self._launches[activity_id] = _Launch(bundle_id, timestamp)
+
+    def mark(self, activity_id, phase, timestamp=None):
+        launch = self._launches.get(activity_id)
+        if launch is None or phase in launch.phases:
+            return
+        if timestamp is None:
+            timestamp = time.time()
+        launch.phases[phase] = timestamp - launch.start_time
+
+    def finish(self, activity_id):
+        launch = self._launches.pop(activity_id, None)
+        if launch is None:
+            return
+
+        bundle = self._get_bundle(launch.bundle_id)
+        bundle['launches'] += 1
+        for phase, elapsed in launch.phases.items():
+            samples = bundle['phases'].setdefault(phase, [])
+            samples.append(int(elapsed * 1000))
+            del samples[:-_SAMPLES]
+
+        logging.debug('%s launched in %s', launch.bundle_id,
+                      ', '.join('%s %.3f s' % (phase, launch.phases[phase])
+                                for phase in PHASES
+                                if phase in launch.phases))
+        self._queue_save()
+
+    def fail(self, activity_id):
+        launch = self._launches.pop(activity_id, None)
+        if launch is None:
+            return
+
+        self._get_bundle(launch.bundle_id)['failures'] += 1
+        self._queue_save()
+
+    def get_statistics(self):
+        """Return the launches, failures and the percentiles of the
+        durations in milliseconds of each phase, by bundle id
+        """
+        statistics = {}
+        for bundle_id, bundle in self._bundles.items():
+            phases = {}
+            for phase, samples in bundle['phases'].items():
+                samples = sorted(samples)
+                phases[phase] = {'count': len(samples),
+                                 'median': _percentile(samples, 50),
+                                 'p90': _percentile(samples, 90),
+                                 'max': samples[-1]}
+            statistics[bundle_id] = {'launches': bundle['launches'],
+                                     'failures': bundle['failures'],
+                                     'phases': phases}
+        return statistics
+
+    def format_statistics(self):
+        """Return the statistics as a table, one line per phase"""
+        lines = ['%-32s %-12s %6s %8s %8s %8s' % (
+            'bundle', 'phase', 'count', 'median', 'p90', 'max')]
+        for bundle_id, bundle in sorted(self.get_statistics().items()):
+            lines.append('%s: %d launches, %d failures' % (
+                bundle_id, bundle['launches'], bundle['failures']))
+            for phase in PHASES:
+                if phase not in bundle['phases']:
+                    continue
+                phase_statistics = bundle['phases'][phase]
+                lines.append('%-32s %-12s %6d %8d %8d %8d' % (
+                    '', phase, phase_statistics['count'],
+                    phase_statistics['median'], phase_statistics['p90'],
+                    phase_statistics['max']))
+        return '\n'.join(lines)
+
+
+def get_instance():
+    global _instance
+    if _instance is None:
+        _instance = LaunchTimes(env.get_profile_path('launch_times'))
+        _instance.load()
+    return _instance
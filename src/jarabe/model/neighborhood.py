@@ -52,6 +52,7 @@ from sugar3.profile import get_profile
 from jarabe.model.buddy import BuddyModel, get_owner_instance
 from jarabe.model import bundleregistry
 from jarabe.model import shell
+from jarabe.model.querybatcher import QueryBatcher
 
 
 ACCOUNT_MANAGER_SERVICE = 'org.freedesktop.Telepathy.AccountManager'
@@ -202,10 +203,14 @@ class _Account(GObject.GObject):
 
         self._home_changed_hid = None
 
+        # The queries about the contacts and their activities
+        self._queries = QueryBatcher()
+
         self._start_listening()
 
     def _close_connection(self):
         self._connection = None
+        self._queries.cancel()
         if self._home_changed_hid is not None:
             model = shell.get_model()
             model.disconnect(self._home_changed_hid)
@@ -519,6 +524,11 @@ class _Account(GObject.GObject):
             self.emit('current-activity-updated', contact_id, activity_id)
 
     def __buddy_activities_changed_cb(self, buddy_handle, activities):
+        if buddy_handle not in self._buddy_handles:
+            # The activities are asked for once the buddy is added
+            logging.debug('_Account.__buddy_activities_changed_cb unknown '
+                          'buddy %r', buddy_handle)
+            return
         self._update_buddy_activities(buddy_handle, activities)
 
     def _update_buddy_activities(self, buddy_handle, activities):
@@ -547,8 +557,9 @@ class _Account(GObject.GObject):
 
                 connection = self._connection[
                     CONNECTION_INTERFACE_ACTIVITY_PROPERTIES]
-                connection.GetProperties(
-                    room_handle,
+                self._queries.call(
+                    'ActivityProperties.GetProperties',
+                    connection.GetProperties, [room_handle],
                     reply_handler=partial(self.__get_properties_cb,
                                           room_handle),
                     error_handler=partial(self.__error_handler_cb,
@@ -560,12 +571,14 @@ class _Account(GObject.GObject):
                     # case, request again the current activity for this buddy.
                     connection = self._connection[
                         CONNECTION_INTERFACE_BUDDY_INFO]
-                    connection.GetCurrentActivity(
-                        buddy_handle,
+                    self._queries.call(
+                        'BuddyInfo.GetCurrentActivity',
+                        connection.GetCurrentActivity, [buddy_handle],
                         reply_handler=partial(self.__get_current_activity_cb,
                                               buddy_handle),
                         error_handler=partial(self.__error_handler_cb,
-                                              'BuddyInfo.GetCurrentActivity'))
+                                              'BuddyInfo.GetCurrentActivity'),
+                        refresh=True)
 
             if activity_id not in self._buddies_per_activity:
                 self._buddies_per_activity[activity_id] = set()
@@ -628,8 +641,9 @@ class _Account(GObject.GObject):
             if CONNECTION_INTERFACE_BUDDY_INFO in self._connection:
                 handle = self._self_handle
                 connection = self._connection[CONNECTION_INTERFACE_BUDDY_INFO]
-                connection.GetActivities(
-                    handle,
+                self._queries.call(
+                    'BuddyInfo.GetActivities',
+                    connection.GetActivities, [handle],
                     reply_handler=partial(self.__got_activities_cb, handle),
                     error_handler=partial(self.__error_handler_cb,
                                           'BuddyInfo.Getactivities'))
@@ -648,8 +662,11 @@ class _Account(GObject.GObject):
     def _add_buddy_handles(self, handles):
         logging.debug('_Account._add_buddy_handles %r', handles)
         interfaces = [CONNECTION, CONNECTION_INTERFACE_ALIASING]
-        self._connection[CONNECTION_INTERFACE_CONTACTS].GetContactAttributes(
-            handles, interfaces, False,
+        connection = self._connection[CONNECTION_INTERFACE_CONTACTS]
+        # The contacts added within a batch are asked about in one call
+        self._queries.call_bulk(
+            'Contacts.GetContactAttributes',
+            connection.GetContactAttributes, handles, [interfaces, False],
             reply_handler=self.__get_contact_attributes_cb,
             error_handler=partial(self.__error_handler_cb,
                                   'Contacts.GetContactAttributes'))
@@ -687,8 +704,9 @@ class _Account(GObject.GObject):
                     connection = \
                         self._connection[CONNECTION_INTERFACE_BUDDY_INFO]
 
-                    connection.GetProperties(
-                        handle,
+                    self._queries.call(
+                        'BuddyInfo.GetProperties',
+                        connection.GetProperties, [handle],
                         reply_handler=partial(self.__got_buddy_info_cb, handle,
                                               nick),
                         error_handler=partial(self.__error_handler_cb,
@@ -696,16 +714,18 @@ class _Account(GObject.GObject):
                         byte_arrays=True,
                         timeout=_QUERY_DBUS_TIMEOUT)
 
-                    connection.GetActivities(
-                        handle,
+                    self._queries.call(
+                        'BuddyInfo.GetActivities',
+                        connection.GetActivities, [handle],
                         reply_handler=partial(self.__got_activities_cb,
                                               handle),
                         error_handler=partial(self.__error_handler_cb,
                                               'BuddyInfo.GetActivities'),
                         timeout=_QUERY_DBUS_TIMEOUT)
 
-                    connection.GetCurrentActivity(
-                        handle,
+                    self._queries.call(
+                        'BuddyInfo.GetCurrentActivity',
+                        connection.GetCurrentActivity, [handle],
                         reply_handler=partial(self.__get_current_activity_cb,
                                               handle),
                         error_handler=partial(self.__error_handler_cb,
@@ -741,6 +761,19 @@ class _Account(GObject.GObject):
         logging.debug('_Account.__set_enabled_cb success')
 
 
+def _add_to_index(index, key, value):
+    if key is not None:
+        index.setdefault(key, []).append(value)
+
+
+def _remove_from_index(index, key, value):
+    values = index.get(key)
+    if values and value in values:
+        values.remove(value)
+        if not values:
+            del index[key]
+
+
 class Neighborhood(GObject.GObject):
     __gsignals__ = {
         'activity-added': (GObject.SignalFlags.RUN_FIRST, None,
@@ -758,6 +791,11 @@ class Neighborhood(GObject.GObject):
 
         self._buddies = {None: get_owner_instance()}
         self._activities = {}
+        # Several buddies can share a key or a handle when they are seen
+        # through more than one account, the first one found is returned
+        self._buddies_by_key = {}
+        self._buddies_by_handle = {}
+        self._activities_by_room = {}
         self._link_local_account = None
         self._server_account = None
         self._shell_model = shell.get_model()
@@ -972,6 +1010,7 @@ class Neighborhood(GObject.GObject):
             contact_id=contact_id,
             handle=handle)
         self._buddies[contact_id] = buddy
+        _add_to_index(self._buddies_by_handle, handle, buddy)
 
     def __buddy_updated_cb(self, account, contact_id, properties):
         logging.debug('__buddy_updated_cb %r', contact_id)
@@ -993,7 +1032,9 @@ class Neighborhood(GObject.GObject):
             buddy.props.color = XoColor(str(properties['color']))
 
         if 'key' in properties:
+            _remove_from_index(self._buddies_by_key, buddy.props.key, buddy)
             buddy.props.key = properties['key']
+            _add_to_index(self._buddies_by_key, buddy.props.key, buddy)
 
         nick_key = CONNECTION_INTERFACE_ALIASING + '/alias'
         if nick_key in properties:
@@ -1011,6 +1052,8 @@ class Neighborhood(GObject.GObject):
 
         buddy = self._buddies[contact_id]
         del self._buddies[contact_id]
+        _remove_from_index(self._buddies_by_key, buddy.props.key, buddy)
+        _remove_from_index(self._buddies_by_handle, buddy.props.handle, buddy)
 
         if buddy.props.key is not None:
             self.emit('buddy-removed', buddy)
@@ -1023,6 +1066,7 @@ class Neighborhood(GObject.GObject):
 
         activity = ActivityModel(activity_id, room_handle)
         self._activities[activity_id] = activity
+        _add_to_index(self._activities_by_room, room_handle, activity)
 
     def __activity_updated_cb(self, account, activity_id, properties):
         logging.debug('__activity_updated_cb %r %r', activity_id, properties)
@@ -1060,6 +1104,8 @@ class Neighborhood(GObject.GObject):
             return
         activity = self._activities[activity_id]
         del self._activities[activity_id]
+        _remove_from_index(self._activities_by_room, activity.room_handle,
+                           activity)
         self._shell_model.remove_shared_activity(activity_id)
 
         if activity.props.bundle is not None:
@@ -1120,25 +1166,23 @@ class Neighborhood(GObject.GObject):
         return list(self._buddies.values())
 
     def get_buddy_by_key(self, key):
-        for buddy in list(self._buddies.values()):
-            if buddy.key == key:
-                return buddy
-        return None
+        # The key of the owner changes type once it is published
+        owner = get_owner_instance()
+        if owner.key == key:
+            return owner
+        buddies = self._buddies_by_key.get(key)
+        return buddies[0] if buddies else None
 
     def get_buddy_by_handle(self, contact_handle):
-        for buddy in list(self._buddies.values()):
-            if not buddy.is_owner() and buddy.handle == contact_handle:
-                return buddy
-        return None
+        buddies = self._buddies_by_handle.get(contact_handle)
+        return buddies[0] if buddies else None
 
     def get_activity(self, activity_id):
         return self._activities.get(activity_id, None)
 
     def get_activity_by_room(self, room_handle):
-        for activity in list(self._activities.values()):
-            if activity.room_handle == room_handle:
-                return activity
-        return None
+        activities = self._activities_by_room.get(room_handle)
+        return activities[0] if activities else None
 
     def get_activities(self):
         return list(self._activities.values())
@@ -20,11 +20,13 @@
 from gettext import gettext as _
 import logging
 import os
+import time
 import uuid
 
 import dbus
 import dbus.service
 from gi.repository import GObject
+from gi.repository import GLib
 import configparser
 from gi.repository import Gio
 import ctypes
@@ -174,7 +176,10 @@ NM_SETTINGS_PATH = '/org/freedesktop/NetworkManager/Settings'
 NM_SETTINGS_IFACE = 'org.freedesktop.NetworkManager.Settings'
 NM_CONNECTION_IFACE = 'org.freedesktop.NetworkManager.Settings.Connection'
 NM_ACCESSPOINT_IFACE = 'org.freedesktop.NetworkManager.AccessPoint'
+NM_ACCESSPOINT_PATH = '/org/freedesktop/NetworkManager/AccessPoint/'
 NM_ACTIVE_CONN_IFACE = 'org.freedesktop.NetworkManager.Connection.Active'
+NM_OBJECT_MANAGER_PATH = '/org/freedesktop'
+DBUS_OBJECT_MANAGER_IFACE = 'org.freedesktop.DBus.ObjectManager'
 
 NM_SECRET_AGENT_IFACE = 'org.freedesktop.NetworkManager.SecretAgent'
 NM_SECRET_AGENT_PATH = '/org/freedesktop/NetworkManager/SecretAgent'
@@ -203,6 +208,12 @@ _nm_settings = None
 _secret_agent = None
 _connections = None
 _interfaces = None
+_access_point_watcher = None
+
+# Seconds a change of the signal strength of an access point waits for
+# the following ones, before the access point tells it changed
+_STRENGTH_UPDATE_DELAY = 2
+_STRENGTH_PROPERTIES = set(['Strength', 'LastSeen'])
 
 _nm_device_state_reason_description = None
 
@@ -645,7 +656,6 @@ class AccessPoint(GObject.GObject):
         self.model = model
 
         self._initialized = False
-        self._bus = dbus.SystemBus()
 
         self.ssid = ''
         self.strength = 0
@@ -656,16 +666,10 @@ class AccessPoint(GObject.GObject):
         self.channel = 0
 
     def initialize(self):
-        model_props = dbus.Interface(self.model, dbus.PROPERTIES_IFACE)
-        model_props.GetAll(NM_ACCESSPOINT_IFACE, byte_arrays=True,
-                           reply_handler=self._ap_properties_changed_cb,
-                           error_handler=self._get_all_props_error_cb)
+        _get_access_point_watcher().add(self)
 
-        self._bus.add_signal_receiver(self._ap_properties_changed_cb,
-                                      signal_name='PropertiesChanged',
-                                      path=self.model.object_path,
-                                      dbus_interface=NM_ACCESSPOINT_IFACE,
-                                      byte_arrays=True)
+    def is_initialized(self):
+        return self._initialized
 
     def network_hash(self):
         """
@@ -735,10 +739,143 @@ class AccessPoint(GObject.GObject):
         self._update_properties(properties)
 
     def disconnect(self):
-        self._bus.remove_signal_receiver(self._ap_properties_changed_cb,
-                                         signal_name='PropertiesChanged',
-                                         path=self.model.object_path,
-                                         dbus_interface=NM_ACCESSPOINT_IFACE)
+        _get_access_point_watcher().remove(self)
+
+
+class _AccessPointWatcher(object):
+    """Follows the properties of the access points of every AccessPoint
+
+    A single match rule on the system bus receives the PropertiesChanged
+    signals of every access point, and passes the ones sent from the
+    AccessPoint path namespace to the AccessPoint of their object path.
+    The initial properties of the access points added together are
+    fetched with a single call, and the changes that only touch the
+    signal strength are delivered together every _STRENGTH_UPDATE_DELAY
+    seconds.
+    """
+
+    def __init__(self):
+        self._bus = dbus.SystemBus()
+        self._access_points = {}
+        self._signal_match = None
+        self._uninitialized = []
+        self._fetch_sid = None
+        self._object_manager_supported = True
+        self._pending_strengths = {}
+        self._strength_sid = None
+
+    def add(self, access_point):
+        if self._signal_match is None:
+            self._signal_match = self._bus.add_signal_receiver(
+                self.__properties_changed_cb,
+                signal_name='PropertiesChanged',
+                dbus_interface=NM_ACCESSPOINT_IFACE,
+                path_keyword='path',
+                byte_arrays=True)
+
+        self._access_points[access_point.model.object_path] = access_point
+        self._uninitialized.append(access_point)
+        if self._fetch_sid is None:
+            self._fetch_sid = GLib.idle_add(self.__fetch_properties_cb)
+
+    def remove(self, access_point):
+        path = access_point.model.object_path
+        if self._access_points.get(path) is not access_point:
+            return
+        del self._access_points[path]
+        self._pending_strengths.pop(path, None)
+        if access_point in self._uninitialized:
+            self._uninitialized.remove(access_point)
+
+        if not self._access_points:
+            self._signal_match.remove()
+            self._signal_match = None
+
+    def __fetch_properties_cb(self):
+        self._fetch_sid = None
+        access_points = self._uninitialized
+        self._uninitialized = []
+
+        if len(access_points) > 1 and self._object_manager_supported:
+            obj = self._bus.get_object(access_points[0].model.bus_name,
+                                       NM_OBJECT_MANAGER_PATH,
+                                       introspect=False)
+            object_manager = dbus.Interface(obj, DBUS_OBJECT_MANAGER_IFACE)
+            object_manager.GetManagedObjects(
+                byte_arrays=True,
+                reply_handler=lambda objects: self._managed_objects_cb(
+                    access_points, objects),
+                error_handler=lambda err: self._managed_objects_error_cb(
+                    access_points, err))
+        else:
+            for access_point in access_points:
+                self._get_all(access_point)
+        return False
+
+    def _managed_objects_cb(self, access_points, objects):
+        for access_point in access_points:
+            path = access_point.model.object_path
+            if self._access_points.get(path) is not access_point:
+                continue
+            interfaces = objects.get(path, {})
+            if NM_ACCESSPOINT_IFACE in interfaces:
+                access_point._update_properties(
+                    interfaces[NM_ACCESSPOINT_IFACE])
+            else:
+                self._get_all(access_point)
+
+    def _managed_objects_error_cb(self, access_points, err):
+        logging.debug('Cannot get the access points in one call: %s', err)
+        self._object_manager_supported = False
+        for access_point in access_points:
+            if self._access_points.get(access_point.model.object_path) is \
+                    access_point:
+                self._get_all(access_point)
+
+    def _get_all(self, access_point):
+        model_props = dbus.Interface(access_point.model,
+                                     dbus.PROPERTIES_IFACE)
+        model_props.GetAll(
+            NM_ACCESSPOINT_IFACE, byte_arrays=True,
+            reply_handler=access_point._ap_properties_changed_cb,
+            error_handler=access_point._get_all_props_error_cb)
+
+    def __properties_changed_cb(self, properties, path=None):
+        if path is None or not path.startswith(NM_ACCESSPOINT_PATH):
+            return
+
+        access_point = self._access_points.get(path)
+        if access_point is None:
+            return
+
+        changes = self._pending_strengths.pop(path, {})
+        changes.update(properties)
+        if access_point.is_initialized() and \
+                set(changes.keys()) <= _STRENGTH_PROPERTIES:
+            self._pending_strengths[path] = changes
+            if self._strength_sid is None:
+                self._strength_sid = GLib.timeout_add_seconds(
+                    _STRENGTH_UPDATE_DELAY, self.__update_strengths_cb)
+            return
+
+        access_point._ap_properties_changed_cb(changes)
+
+    def __update_strengths_cb(self):
+        self._strength_sid = None
+        pending_strengths = self._pending_strengths
+        self._pending_strengths = {}
+        for path, changes in pending_strengths.items():
+            access_point = self._access_points.get(path)
+            if access_point is not None:
+                access_point._ap_properties_changed_cb(changes)
+        return False
+
+
+def _get_access_point_watcher():
+    global _access_point_watcher
+    if _access_point_watcher is None:
+        _access_point_watcher = _AccessPointWatcher()
+    return _access_point_watcher
 
 
 def get_manager():
@@ -755,7 +892,6 @@ def _get_settings():
         obj = dbus.SystemBus().get_object(NM_SERVICE, NM_SETTINGS_PATH)
         _nm_settings = dbus.Interface(obj, NM_SETTINGS_IFACE)
         _migrate_old_wifi_connections()
-        _migrate_old_gsm_connection()
     return _nm_settings
 
 
@@ -787,23 +923,13 @@ class Connection(GObject.GObject):
         'removed': (GObject.SignalFlags.RUN_LAST, None, ()),
     }
 
-    def __init__(self, bus, path):
+    def __init__(self, obj, settings):
         GObject.GObject.__init__(self)
-        obj = bus.get_object(NM_SERVICE, path)
         self._connection = dbus.Interface(obj, NM_CONNECTION_IFACE)
-        self._removed_handle = self._connection.connect_to_signal(
-            'Removed', self._removed_cb)
-        self._updated_handle = self._connection.connect_to_signal(
-            'Updated', self._updated_cb)
-        self._settings = self._connection.GetSettings(byte_arrays=True)
-
-    def _updated_cb(self):
-        self._settings = self._connection.GetSettings(byte_arrays=True)
+        self._settings = settings
 
-    def _removed_cb(self):
-        self._updated_handle.remove()
-        self._removed_handle.remove()
-        self.emit('removed')
+    def _set_settings(self, settings):
+        self._settings = settings
 
     def get_settings(self, stype=None):
         if not stype:
@@ -844,32 +970,211 @@ class Connection(GObject.GObject):
         return self._connection.object_path
 
 
-class Connections(object):
+class Connections(GObject.GObject):
+    """The connections saved by NetworkManager
+
+    The connections and their settings are loaded without blocking, and
+    kept up to date from the NewConnection, Updated and Removed signals.
+    The lookups only know the connections loaded so far; code that must
+    not miss one, e.g. before adding a connection, uses call_when_ready,
+    or wait_until_ready when it cannot wait for a callback.
+    """
+
+    __gsignals__ = {
+        'connection-added': (GObject.SignalFlags.RUN_FIRST, None,
+                             ([GObject.TYPE_PYOBJECT])),
+    }
 
     def __init__(self):
+        GObject.GObject.__init__(self)
         self._bus = dbus.SystemBus()
-        self._connections = []
+        self._connections = {}
+        self._by_ssid = {}
+        self._by_id = {}
+        # Connection path to the serial of its latest settings request,
+        # the replies to the older requests are dropped
+        self._loading = {}
+        self._load_serial = 0
+        self._listed = False
+        self._loaded = False
+        self._ready_callbacks = []
+        self._start_time = time.time()
+
+        self._settings = _get_settings()
+        self._settings.connect_to_signal('NewConnection',
+                                         self._new_connection_cb)
+        # One receiver for all the connections, rather than two each
+        self._bus.add_signal_receiver(self.__updated_cb,
+                                      signal_name='Updated',
+                                      dbus_interface=NM_CONNECTION_IFACE,
+                                      path_keyword='path')
+        self._bus.add_signal_receiver(self.__removed_cb,
+                                      signal_name='Removed',
+                                      dbus_interface=NM_CONNECTION_IFACE,
+                                      path_keyword='path')
+
+        self._settings.ListConnections(
+            reply_handler=self.__list_connections_cb,
+            error_handler=self.__list_connections_error_cb)
+
+    def is_ready(self):
+        """Whether all the connections known to NetworkManager are loaded"""
+        return self._listed and not self._loading
+
+    def call_when_ready(self, callback, *args):
+        if self.is_ready():
+            callback(*args)
+        else:
+            self._ready_callbacks.append((callback, args))
 
-        settings = _get_settings()
-        settings.connect_to_signal('NewConnection', self._new_connection_cb)
+    def wait_until_ready(self):
+        """Load the connections not loaded yet with blocking calls"""
+        if self.is_ready():
+            return
 
-        for connection_o in settings.ListConnections():
-            self._monitor_connection(connection_o)
+        if not self._listed:
+            self._listed = True
+            try:
+                connections_o = self._settings.ListConnections()
+            except dbus.DBusException as err:
+                logging.error('Failed to list the connections: %s', err)
+                connections_o = []
+            for connection_o in connections_o:
+                if connection_o not in self._connections and \
+                        connection_o not in self._loading:
+                    self._start_loading(connection_o)
+
+        # The replies to the calls already sent are dropped when they come
+        for connection_o, serial in list(self._loading.items()):
+            obj = self._bus.get_object(self._settings.bus_name, connection_o,
+                                       introspect=False)
+            try:
+                settings = dbus.Interface(obj, NM_CONNECTION_IFACE) \
+                    .GetSettings(byte_arrays=True)
+            except dbus.DBusException as err:
+                self._settings_error_cb(connection_o, serial, err)
+            else:
+                self._settings_cb(obj, serial, settings)
+        self._check_ready()
 
     def get_list(self):
-        return self._connections
+        return list(self._connections.values())
+
+    def find_by_ssid(self, ssid):
+        connections = self._by_ssid.get(ssid)
+        return connections[0] if connections else None
+
+    def find_by_id(self, connection_id):
+        connections = self._by_id.get(connection_id)
+        return connections[0] if connections else None
+
+    def _load_settings(self, connection_o):
+        obj = self._bus.get_object(self._settings.bus_name, connection_o,
+                                   introspect=False)
+        serial = self._start_loading(connection_o)
+        dbus.Interface(obj, NM_CONNECTION_IFACE).GetSettings(
+            byte_arrays=True,
+            reply_handler=lambda settings: self._settings_cb(obj, serial,
+                                                             settings),
+            error_handler=lambda err: self._settings_error_cb(connection_o,
+                                                              serial, err))
+
+    def _start_loading(self, connection_o):
+        self._load_serial += 1
+        self._loading[connection_o] = self._load_serial
+        return self._load_serial
+
+    def _settings_cb(self, obj, serial, settings):
+        connection_o = obj.object_path
+        if self._loading.get(connection_o) != serial:
+            # Removed, or updated again, while its settings were on their way
+            return
+        del self._loading[connection_o]
+
+        connection = self._connections.get(connection_o)
+        if connection is None:
+            connection = Connection(obj, settings)
+            self._connections[connection_o] = connection
+            self._index(connection)
+            self.emit('connection-added', connection)
+        else:
+            self._unindex(connection)
+            connection._set_settings(settings)
+            self._index(connection)
+        self._check_ready()
+
+    def _settings_error_cb(self, connection_o, serial, err):
+        logging.error('Failed to get the settings of %s: %s', connection_o,
+                      err)
+        if self._loading.get(connection_o) != serial:
+            return
+        del self._loading[connection_o]
+        self._check_ready()
 
-    def _monitor_connection(self, connection_o):
-        connection = Connection(self._bus, connection_o)
-        connection.connect('removed', self._connection_removed_cb)
-        self._connections.append(connection)
+    def _check_ready(self):
+        if not self.is_ready():
+            return
+        if not self._loaded:
+            self._loaded = True
+            logging.debug('Loaded %d connections in %f s',
+                          len(self._connections),
+                          time.time() - self._start_time)
+
+        callbacks = self._ready_callbacks
+        self._ready_callbacks = []
+        for callback, args in callbacks:
+            callback(*args)
+
+    def _get_keys(self, connection):
+        connection_settings = connection.get_settings('connection') or {}
+        return [(self._by_ssid, connection.get_ssid()),
+                (self._by_id, connection_settings.get('id'))]
+
+    def _index(self, connection):
+        for index, key in self._get_keys(connection):
+            if key is not None:
+                index.setdefault(key, []).append(connection)
+
+    def _unindex(self, connection):
+        # Called before the settings of the connection change
+        for index, key in self._get_keys(connection):
+            connections = index.get(key, [])
+            if connection in connections:
+                connections.remove(connection)
+                if not connections:
+                    del index[key]
+
+    def __list_connections_cb(self, connections_o):
+        if self._listed:
+            # Already listed by wait_until_ready
+            return
+        for connection_o in connections_o:
+            self._load_settings(connection_o)
+        self._listed = True
+        self._check_ready()
+
+    def __list_connections_error_cb(self, err):
+        if self._listed:
+            return
+        logging.error('Failed to list the connections: %s', err)
+        self._listed = True
+        self._check_ready()
 
     def _new_connection_cb(self, connection_o):
-        self._monitor_connection(connection_o)
+        self._load_settings(connection_o)
+
+    def __updated_cb(self, path=None):
+        if path in self._connections:
+            self._load_settings(path)
 
-    def _connection_removed_cb(self, connection):
-        connection.disconnect_by_func(self._connection_removed_cb)
-        self._connections.remove(connection)
+    def __removed_cb(self, path=None):
+        if path in self._loading:
+            del self._loading[path]
+            self._check_ready()
+        connection = self._connections.pop(path, None)
+        if connection is not None:
+            self._unindex(connection)
+            connection.emit('removed')
 
 
 def get_wireless_interfaces():
@@ -894,6 +1199,7 @@ def get_connections():
     global _connections
     if _connections is None:
         _connections = Connections()
+        _connections.call_when_ready(_migrate_old_gsm_connection)
     return _connections
 
 
@@ -901,17 +1207,11 @@ def find_connection_by_ssid(ssid):
     # FIXME: this check should be more extensive.
     # it should look at mode (infra/adhoc), band, security, and really
     # anything that is stored in the settings.
-    for connection in get_connections().get_list():
-        if connection.get_ssid() == ssid:
-            return connection
-    return None
+    return get_connections().find_by_ssid(ssid)
 
 
 def find_connection_by_id(connection_id):
-    for connection in get_connections().get_list():
-        if connection.get_id() == connection_id:
-            return connection
-    return None
+    return get_connections().find_by_id(connection_id)
 
 
 def _add_connection_reply_cb(connection):
@@ -1058,6 +1358,7 @@ def _migrate_old_gsm_connection():
 
 
 def find_gsm_connection():
+    get_connections().wait_until_ready()
     return find_connection_by_id(GSM_CONNECTION_ID)
 
 
@@ -1086,6 +1387,7 @@ def disconnect_access_points(ap_paths):
 
 
 def forget_wireless_network(ssid):
+    get_connections().wait_until_ready()
     connection = find_connection_by_ssid(ssid)
     if connection:
         connection.delete()
@@ -1168,6 +1470,7 @@ def clear_wireless_networks():
     except dbus.DBusException:
         logging.debug('NetworkManager not available')
     else:
+        connections.wait_until_ready()
         wireless_connections = \
             (connection for connection in
              connections.get_list() if is_wireless(connection))
@@ -1189,5 +1492,6 @@ def have_wireless_networks():
         logging.debug('NetworkManager not available')
         return False
     else:
+        connections.wait_until_ready()
         return any(is_wireless(connection)
                    for connection in connections.get_list())
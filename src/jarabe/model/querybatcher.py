@@ -0,0 +1,205 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Batching of the asynchronous D-Bus queries sent when many contacts appear
+at once, like when a classroom joins the neighborhood.
+"""
+
+import time
+import logging
+from collections import OrderedDict
+from functools import partial
+
+from gi.repository import GLib
+
+# Milliseconds the queries are collected for before they are sent
+_BATCH_DELAY = 50
+
+
+class _Query(object):
+
+    def __init__(self, method, args, kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.handlers = []
+
+
+class _Statistics(object):
+
+    def __init__(self):
+        self.calls = 0
+        self.deduplicated = 0
+        self.in_flight = 0
+        self.total_time = 0
+        self.max_time = 0
+
+    def as_dict(self):
+        return {'calls': self.calls,
+                'deduplicated': self.deduplicated,
+                'in_flight': self.in_flight,
+                'total_time': self.total_time,
+                'max_time': self.max_time}
+
+
+class QueryBatcher(object):
+    """Sends asynchronous D-Bus queries in batches
+
+    The queries are collected for _BATCH_DELAY milliseconds and sent
+    together. A query with the same name and arguments as one already
+    waiting or waiting for its reply is not sent again; its handlers are
+    called with the reply of the first one. Queries sent with call_bulk
+    are merged into a single call.
+
+    The number of calls, their latency and the number of calls waiting
+    for a reply are kept for each name, and logged when no call is left
+    waiting.
+    """
+
+    def __init__(self, delay=_BATCH_DELAY):
+        self._delay = delay
+        self._queued = OrderedDict()
+        self._in_flight = {}
+        self._bulk = OrderedDict()
+        self._flush_sid = None
+        self._statistics = {}
+        # Replies to the queries sent before the last cancel are dropped
+        self._generation = 0
+
+    def call(self, name, method, args, reply_handler, error_handler,
+             refresh=False, **kwargs):
+        """Call method(*args, **kwargs) in the next batch
+
+        name identifies the method in the statistics and, with args, the
+        queries that are the same. With refresh, a query already waiting
+        for its reply is not reused, as its reply may predate a change.
+        """
+        key = (name, tuple(args))
+        query = self._queued.get(key)
+        if query is None and not refresh:
+            query = self._in_flight.get(key)
+        if query is not None:
+            self._get_statistics(name).deduplicated += 1
+        else:
+            query = _Query(method, tuple(args), kwargs)
+            self._queued[key] = query
+            self._schedule_flush()
+        query.handlers.append((reply_handler, error_handler))
+
+    def call_bulk(self, name, method, items, args, reply_handler,
+                  error_handler, **kwargs):
+        """Call method(items, *args, **kwargs) in the next batch
+
+        The items of all the calls with the same name and args in a batch
+        are sent in a single call. Its reply, for all the items, is passed
+        once to each of the handlers given for them.
+        """
+        key = (name, tuple(tuple(arg) if isinstance(arg, list) else arg
+                           for arg in args))
+        query = self._bulk.get(key)
+        if query is None:
+            query = _Query(method, tuple(args), kwargs)
+            query.items = []
+            self._bulk[key] = query
+            self._schedule_flush()
+        else:
+            self._get_statistics(name).deduplicated += 1
+
+        if (reply_handler, error_handler) not in query.handlers:
+            query.handlers.append((reply_handler, error_handler))
+        for item in items:
+            if item not in query.items:
+                query.items.append(item)
+
+    def cancel(self):
+        """Drop the queries not sent yet and the replies not received yet"""
+        if self._flush_sid is not None:
+            GLib.source_remove(self._flush_sid)
+            self._flush_sid = None
+        self._queued.clear()
+        self._bulk.clear()
+        self._in_flight.clear()
+        self._generation += 1
+
+    def get_statistics(self):
+        """Return the statistics of the queries, by name"""
+        return dict((name, statistics.as_dict())
+                    for name, statistics in self._statistics.items())
+
+    def _get_statistics(self, name):
+        if name not in self._statistics:
+            self._statistics[name] = _Statistics()
+        return self._statistics[name]
+
+    def _schedule_flush(self):
+        if self._flush_sid is None:
+            self._flush_sid = GLib.timeout_add(self._delay, self.__flush_cb)
+
+    def __flush_cb(self):
+        self._flush_sid = None
+
+        queued = self._queued
+        self._queued = OrderedDict()
+        for key, query in queued.items():
+            self._in_flight[key] = query
+            self._send(key[0], query, query.args,
+                       partial(self._finish, key, query, self._generation))
+
+        bulk = self._bulk
+        self._bulk = OrderedDict()
+        for key, query in bulk.items():
+            self._send(key[0], query, (query.items, ) + query.args,
+                       partial(self._finish, None, query, self._generation))
+        return False
+
+    def _send(self, name, query, args, finish):
+        statistics = self._get_statistics(name)
+        statistics.calls += 1
+        statistics.in_flight += 1
+        start = time.time()
+        query.method(*args,
+                     reply_handler=partial(finish, name, start, 0),
+                     error_handler=partial(finish, name, start, 1),
+                     **query.kwargs)
+
+    def _finish(self, key, query, generation, name, start, handler_index,
+                *results):
+        elapsed = time.time() - start
+        statistics = self._get_statistics(name)
+        statistics.in_flight -= 1
+        statistics.total_time += elapsed
+        statistics.max_time = max(statistics.max_time, elapsed)
+
+        if key is not None and self._in_flight.get(key) is query:
+            del self._in_flight[key]
+
+        if generation == self._generation:
+            for handlers in query.handlers:
+                handlers[handler_index](*results)
+
+        if not self._in_flight and not self._queued and not self._bulk and \
+                not any(statistics.in_flight
+                        for statistics in self._statistics.values()):
+            self._log_statistics()
+
+    def _log_statistics(self):
+        for name, statistics in sorted(self._statistics.items()):
+            logging.debug('%s: %d calls, %d deduplicated, %.1f ms average, '
+                          '%.1f ms max', name, statistics.calls,
+                          statistics.deduplicated,
+                          statistics.total_time * 1000 /
+                          max(statistics.calls, 1),
+                          statistics.max_time * 1000)
@@ -31,6 +31,7 @@ from sugar3 import profile
 from gi.repository import SugarExt
 
 from jarabe.model.bundleregistry import get_registry
+from jarabe.model import launchtimes
 
 _SERVICE_NAME = 'org.laptop.Activity'
 _SERVICE_PATH = '/org/laptop/Activity'
@@ -54,6 +55,10 @@ class Activity(GObject.GObject):
         'pause': (GObject.SignalFlags.RUN_FIRST, None, ([])),
         'resume': (GObject.SignalFlags.RUN_FIRST, None, ([])),
         'stop': (GObject.SignalFlags.RUN_LAST, GObject.TYPE_BOOLEAN, ([])),
+        'window-added': (GObject.SignalFlags.RUN_FIRST, None,
+                         ([GObject.TYPE_PYOBJECT])),
+        'window-removed': (GObject.SignalFlags.RUN_FIRST, None,
+                           ([GObject.TYPE_PYOBJECT])),
     }
 
     LAUNCHING = 0
@@ -120,6 +125,8 @@ class Activity(GObject.GObject):
         if is_main_window:
             window.connect('state-changed', self._state_changed_cb)
 
+        self.emit('window-added', window)
+
     def push_shell_window(self, window):
         """Attach a shell run window (eg. view source) to the activity."""
         self._shell_windows.append(window)
@@ -155,6 +162,7 @@ class Activity(GObject.GObject):
         for wnd in self._windows:
             if wnd.get_xid() == xid:
                 self._windows.remove(wnd)
+                self.emit('window-removed', wnd)
                 return True
         return False
 
@@ -275,6 +283,10 @@ class Activity(GObject.GObject):
             return None
         return self._windows[0].get_pid()
 
+    def get_windows(self):
+        """Returns the windows stack of the activity"""
+        return list(self._windows)
+
     def get_bundle_path(self):
         """Returns the activity's bundle directory"""
         if self._activity_info is None:
@@ -325,6 +337,8 @@ class Activity(GObject.GObject):
             elif not old and new:
                 logging.debug('Activity._name_owner_changed_cb: '
                               'activity %s started up', name)
+                launchtimes.get_instance().mark(self._activity_id,
+                                                launchtimes.SERVICE_STARTED)
                 self._retrieve_service()
                 self.set_active(True)
 
@@ -419,6 +433,11 @@ class ShellModel(GObject.GObject):
         self._zoom_level = self.ZOOM_HOME
         self._current_activity = None
         self._activities = []
+        # The activities by the xid of their windows, by activity id and
+        # by bundle id, for the lookups done on every window event
+        self._activities_by_xid = {}
+        self._activities_by_id = {}
+        self._activities_by_bundle_id = {}
         self._shared_activities = {}
         self._active_activity = None
         self._tabbing_activity = None
@@ -438,6 +457,8 @@ class ShellModel(GObject.GObject):
 
     def register_launcher(self, activity_id, launcher):
         self._launchers[activity_id] = launcher
+        launchtimes.get_instance().mark(activity_id,
+                                        launchtimes.LAUNCHER_SHOWN)
 
     def unregister_launcher(self, activity_id):
         if activity_id in self._launchers:
@@ -623,12 +644,17 @@ class ShellModel(GObject.GObject):
                 logging.debug('window registered for %s', activity_id)
                 home_activity.add_window(window, is_main_window(window,
                                                                 home_activity))
+                launchtimes.get_instance().mark(activity_id,
+                                                launchtimes.FIRST_WINDOW)
 
             if is_main_window(window, home_activity):
                 self.emit('launch-completed', home_activity)
                 startup_time = time.time() - home_activity.get_launch_time()
                 logging.debug('%s launched in %f seconds.',
                               activity_id, startup_time)
+                launch_times = launchtimes.get_instance()
+                launch_times.mark(activity_id, launchtimes.MAIN_WINDOW)
+                launch_times.finish(activity_id)
 
             if self._active_activity is None:
                 self._set_active_activity(home_activity)
@@ -647,16 +673,11 @@ class ShellModel(GObject.GObject):
                     self._remove_activity(activity)
 
     def _get_activity_by_xid(self, xid):
-        for home_activity in self._activities:
-            if home_activity.has_xid(xid):
-                return home_activity
-        return None
+        return self._activities_by_xid.get(xid)
 
     def get_activity_by_id(self, activity_id):
-        for home_activity in self._activities:
-            if home_activity.get_activity_id() == activity_id:
-                return home_activity
-        return None
+        activities = self._activities_by_id.get(activity_id)
+        return activities[0] if activities else None
 
     def _active_window_changed_cb(self, screen, previous_window=None):
         window = screen.get_active_window()
@@ -673,18 +694,22 @@ class ShellModel(GObject.GObject):
 
         self._update_zoom_level(window)
 
+    def _get_activities_with_window_by_bundle_id(self, bundle_id):
+        activities = self._activities_by_bundle_id.get(bundle_id, [])
+        return [activity for activity in activities
+                if activity.get_window() is not None]
+
     def get_name_from_bundle_id(self, bundle_id):
-        for activity in self._get_activities_with_window():
-            if activity.get_bundle_id() == bundle_id:
-                return activity.get_activity_name()
+        activities = self._get_activities_with_window_by_bundle_id(bundle_id)
+        if activities:
+            return activities[0].get_activity_name()
         return ''
 
     def can_launch_activity_instance(self, bundle):
         if bundle.get_single_instance():
-            bundle_id = bundle.get_bundle_id()
-            for activity in self._get_activities_with_window():
-                if activity.get_bundle_id() == bundle_id:
-                    return False
+            if self._get_activities_with_window_by_bundle_id(
+                    bundle.get_bundle_id()):
+                return False
         return True
 
     def can_launch_activity(self):
@@ -697,8 +722,41 @@ class ShellModel(GObject.GObject):
 
     def _add_activity(self, home_activity):
         self._activities.append(home_activity)
+
+        self._activities_by_id.setdefault(
+            home_activity.get_activity_id(), []).append(home_activity)
+        self._activities_by_bundle_id.setdefault(
+            home_activity.get_bundle_id(), []).append(home_activity)
+        for window in home_activity.get_windows():
+            self._activities_by_xid[window.get_xid()] = home_activity
+        home_activity.connect('window-added', self.__window_added_cb)
+        home_activity.connect('window-removed', self.__window_removed_cb)
+
         self.emit('activity-added', home_activity)
 
+    def __window_added_cb(self, home_activity, window):
+        self._activities_by_xid[window.get_xid()] = home_activity
+
+    def __window_removed_cb(self, home_activity, window):
+        if self._activities_by_xid.get(window.get_xid()) is home_activity:
+            del self._activities_by_xid[window.get_xid()]
+
+    def _remove_from_indexes(self, home_activity):
+        for index, key in [
+                (self._activities_by_id, home_activity.get_activity_id()),
+                (self._activities_by_bundle_id,
+                 home_activity.get_bundle_id())]:
+            activities = index.get(key, [])
+            if home_activity in activities:
+                activities.remove(home_activity)
+                if not activities:
+                    del index[key]
+
+        for window in home_activity.get_windows():
+            self.__window_removed_cb(home_activity, window)
+        home_activity.disconnect_by_func(self.__window_added_cb)
+        home_activity.disconnect_by_func(self.__window_removed_cb)
+
     def _remove_activity(self, home_activity):
         if home_activity == self._active_activity:
             windows = Wnck.Screen.get_default().get_windows_stacked()
@@ -714,6 +772,7 @@ class ShellModel(GObject.GObject):
 
         self.emit('activity-removed', home_activity)
         self._activities.remove(home_activity)
+        self._remove_from_indexes(home_activity)
 
     def notify_launch(self, activity_id, service_name):
         registry = get_registry()
@@ -724,6 +783,8 @@ class ShellModel(GObject.GObject):
                              % service_name)
         color = self._shared_activities.get(activity_id, None)
         home_activity = Activity(activity_info, activity_id, color)
+        launchtimes.get_instance().start(activity_id, service_name,
+                                         home_activity.get_launch_time())
         self._add_activity(home_activity)
 
         self._set_active_activity(home_activity)
@@ -739,6 +800,7 @@ class ShellModel(GObject.GObject):
         self._launch_timers[activity_id] = timer
 
     def notify_launch_failed(self, activity_id):
+        launchtimes.get_instance().fail(activity_id)
         home_activity = self.get_activity_by_id(activity_id)
         if home_activity:
             logging.debug('Activity %s (%s) launch failed', activity_id,
@@ -754,6 +816,8 @@ class ShellModel(GObject.GObject):
 
     def _check_activity_launched(self, activity_id):
         del self._launch_timers[activity_id]
+        # Launches that did not finish by now are not waited for anymore
+        launchtimes.get_instance().fail(activity_id)
         home_activity = self.get_activity_by_id(activity_id)
 
         if not home_activity:
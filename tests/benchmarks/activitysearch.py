@@ -0,0 +1,87 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure how fast the activities are filtered while typing a search.
+
+Indexes synthetic activities and reports the time to answer each of
+the queries typed one character at a time, the best of a few rounds. It
+should stay under a millisecond with 1000 activities.
+
+    python3 activitysearch.py [number of activities]
+"""
+
+import random
+import sys
+import time
+
+from jarabe.model.activitysearch import ActivitySearchIndex
+
+WORDS = ['paint', 'music', 'write', 'read', 'turtle', 'blocks', 'maze',
+         'memorize', 'physics', 'chat', 'record', 'speak', 'measure',
+         'calculate', 'abacus', 'fractions', 'map', 'words', 'story', 'jam']
+ROUNDS = 5
+TYPED = ['t', 'tu', 'tur', 'turt', 'turtl', 'turtle', 'turtle ',
+         'turtle b', 'turtle bl', 'turtle blo', 'turtle bloc']
+
+
+class _Bundle(object):
+    def __init__(self, n):
+        self._n = n
+        words = random.sample(WORDS, 3)
+        self._name = '%s %s %d' % (words[0].title(), words[1].title(), n)
+        self._tags = [words[2], random.choice(WORDS)]
+
+    def get_bundle_id(self):
+        return 'org.sugarlabs.Activity%d' % self._n
+
+    def get_name(self):
+        return self._name
+
+    def get_tags(self):
+        return self._tags
+
+    def get_summary(self):
+        return 'An activity about %s' % ' and '.join(self._tags)
+
+
+def main():
+    n_activities = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    random.seed(0)
+
+    index = ActivitySearchIndex()
+    start = time.time()
+    for n in range(n_activities):
+        index.add_bundle(_Bundle(n))
+    # Builds the sorted words
+    index.search('_')
+    print('%d activities indexed in %.1f ms' %
+          (n_activities, (time.time() - start) * 1000))
+
+    # Best of a few rounds of typing the queries
+    times = dict((query, []) for query in TYPED)
+    for round_ in range(ROUNDS):
+        for query in TYPED:
+            start = time.time()
+            index.get_scores(query)
+            times[query].append(time.time() - start)
+
+    for query in TYPED:
+        print('%-16r %6d matches %8.3f ms' %
+              (query, len(index.get_scores(query)),
+               min(times[query]) * 1000))
+
+
+if __name__ == '__main__':
+    main()
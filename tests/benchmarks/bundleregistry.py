@@ -0,0 +1,105 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Check that the bundle registry lookups do not depend on its size.
+
+Installs synthetic activities in a temporary activities directory and
+reports the time of the registry lookups on the first and the last
+bundle added, with 50 and then 500 bundles installed.
+
+    python3 bundleregistry.py [number of bundles]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import timeit
+
+from jarabe.model import bundleregistry
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(
+    os.path.dirname(__file__))))
+os.environ.setdefault('SUGAR_MIME_DEFAULTS',
+                      os.path.join(base_dir, 'data', 'mime.defaults'))
+
+
+LOOKUPS = 10000
+
+_ACTIVITY_INFO = """[Activity]
+name = Activity %(n)d
+bundle_id = org.sugarlabs.Benchmark%(n)d
+exec = sugar-activity3 activity.Activity
+icon = activity-icon
+activity_version = 1
+mime_types = text/x-benchmark-%(n)d;text/x-benchmark
+license = GPLv3+
+"""
+
+
+def _create_bundles(activities_path, n_bundles):
+    for n in range(n_bundles):
+        activity_dir = os.path.join(activities_path,
+                                    'Benchmark%d.activity' % n, 'activity')
+        os.makedirs(activity_dir)
+        with open(os.path.join(activity_dir, 'activity.info'), 'w') as f:
+            f.write(_ACTIVITY_INFO % {'n': n})
+
+
+def _measure(n_bundles):
+    temp_dir = tempfile.mkdtemp()
+    os.environ['SUGAR_ACTIVITIES_PATH'] = os.path.join(temp_dir, 'activities')
+    os.environ['SUGAR_LIBRARY_PATH'] = os.path.join(temp_dir, 'library')
+    os.environ['SUGAR_PROFILE'] = 'benchmark'
+    os.environ['SUGAR_HOME'] = temp_dir
+    try:
+        _create_bundles(os.environ['SUGAR_ACTIVITIES_PATH'], n_bundles)
+        bundleregistry._instance = None
+        registry = bundleregistry.get_registry()
+        assert len(registry) >= n_bundles
+
+        results = {}
+        for n in [0, n_bundles - 1]:
+            bundle_id = 'org.sugarlabs.Benchmark%d' % n
+            bundle = registry.get_bundle(bundle_id)
+            lookups = [
+                ('get_bundle', lambda: registry.get_bundle(bundle_id)),
+                ('is_installed', lambda: registry.is_installed(bundle)),
+                ('find_bundle', lambda: registry._find_bundle(bundle_id,
+                                                              '1')),
+                ('get_activities_for_type',
+                 lambda: registry.get_activities_for_type(
+                     'text/x-benchmark-%d' % n)),
+            ]
+            for name, lookup in lookups:
+                elapsed = timeit.timeit(lookup, number=LOOKUPS)
+                results.setdefault(name, []).append(elapsed)
+        return results
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    print('%-24s %8s %12s %12s' % ('', 'bundles', 'first (us)', 'last (us)'))
+    for n_bundles in [largest // 10, largest]:
+        for name, times in sorted(_measure(n_bundles).items()):
+            first, last = [elapsed * 1e6 / LOOKUPS for elapsed in times]
+            print('%-24s %8d %12.2f %12.2f' % (name, n_bundles, first, last))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure how fast the favorites grid places icons without overlaps.
+
+Adds icons to a 1000x1000 Grid, like the random favorites layout does,
+and reports the time until no icons overlap, the number of icon moves
+and the overlaps left if the grid gave up.
+
+    python3 desktopgrid.py [number of icons]...
+"""
+
+import sys
+import time
+
+from jarabe.desktop.grid import Grid
+
+
+GRID_SIZE = 1000
+# An icon of style.GRID_CELL_SIZE pixels, in cells of the layout
+ICON_SIZE = 19
+
+
+class _Icon(object):
+    pass
+
+
+def _count_overlaps(grid, icons):
+    overlaps = 0
+    for icon in icons:
+        rect = grid.get_child_rect(icon)
+        overlaps += bool(grid.compute_weight(rect) > ICON_SIZE * ICON_SIZE)
+    return overlaps
+
+
+def _place(n_icons):
+    grid = Grid(GRID_SIZE, GRID_SIZE)
+    moves = [0]
+
+    def child_changed_cb(grid, child):
+        moves[0] += 1
+
+    grid.connect('child-changed', child_changed_cb)
+
+    icons = [_Icon() for i in range(n_icons)]
+    start = time.time()
+    for icon in icons:
+        grid.add(icon, ICON_SIZE, ICON_SIZE)
+    while grid._solve_collisions(n_icons):
+        pass
+    elapsed = time.time() - start
+
+    return elapsed, moves[0], _count_overlaps(grid, icons)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50, 150, 500, 1000]
+
+    print('%8s %10s %8s %10s' % ('icons', 'seconds', 'moves', 'overlaps'))
+    for n_icons in sizes:
+        elapsed, moves, overlaps = _place(n_icons)
+        print('%8d %10.3f %8d %10d' % (n_icons, elapsed, moves, overlaps))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure how long the favorites layouts take to place their icons.
+
+Reports the time of the first allocate_children of each layout, which
+computes the positions, and of the following ones with the same number
+of icons and allocation, which reuse them, for 50, 200 and 500 icons.
+
+    python3 favoriteslayout.py [number of allocations]
+"""
+
+import sys
+import time
+
+from gi.repository import Gdk
+
+from jarabe.desktop import favoriteslayout
+
+
+LAYOUTS = [favoriteslayout.RingLayout, favoriteslayout.SunflowerLayout,
+           favoriteslayout.BoxLayout, favoriteslayout.TriangleLayout]
+
+
+class _Icon(object):
+
+    def __init__(self, n):
+        self._name = 'Activity %d' % n
+        self._size = None
+
+    def get_activity_name(self):
+        return self._name
+
+    def set_size(self, size):
+        self._size = size
+
+    def get_preferred_width(self):
+        return self._size, self._size
+
+    def get_preferred_height(self):
+        return self._size, self._size
+
+    def size_allocate(self, allocation):
+        pass
+
+
+def _measure(layout_class, n_icons, allocations):
+    allocation = Gdk.Rectangle()
+    allocation.x = 0
+    allocation.y = 0
+    allocation.width = 1200
+    allocation.height = 900 - 75
+    icons = [_Icon(n) for n in range(n_icons)]
+    layout = layout_class()
+
+    start = time.time()
+    layout.allocate_children(allocation, icons)
+    first = time.time() - start
+
+    start = time.time()
+    for allocation_ in range(allocations):
+        layout.allocate_children(allocation, icons)
+    following = (time.time() - start) / allocations
+    return first, following
+
+
+def main():
+    allocations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print('%-16s %6s %12s %12s' % ('', 'icons', 'first (ms)', 'next (ms)'))
+    for layout_class in LAYOUTS:
+        for n_icons in [50, 200, 500]:
+            first, following = _measure(layout_class, n_icons, allocations)
+            print('%-16s %6d %12.2f %12.2f' % (layout_class.__name__, n_icons,
+                                               first * 1000,
+                                               following * 1000))
+
+
+if __name__ == '__main__':
+    main()
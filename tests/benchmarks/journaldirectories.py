@@ -0,0 +1,90 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Check that the Journal scans directory trees in linear time.
+
+Generates trees of up to 10000 nested directories, each holding one
+file, and reports the time InplaceResultSet takes to scan them. The time
+per directory should stay flat as the tree grows.
+
+    python3 journaldirectories.py [number of directories]
+"""
+
+import collections
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+from gi.repository import GLib
+
+from jarabe.journal import model
+
+
+BRANCHING = 4
+
+
+def _create_tree(root, n_directories):
+    # Breadth first, so the tree is both wide and deep
+    pending = collections.deque([root])
+    created = 0
+    while created < n_directories:
+        parent = pending.popleft()
+        for i in range(min(BRANCHING, n_directories - created)):
+            dir_path = os.path.join(parent, 'd%d' % i)
+            os.mkdir(dir_path)
+            with open(os.path.join(dir_path, 'file.txt'), 'w') as f:
+                f.write(dir_path)
+            pending.append(dir_path)
+            created += 1
+
+
+def _scan(root, n_files):
+    loop = GLib.MainLoop()
+
+    def ready_cb(**kwargs):
+        loop.quit()
+
+    result_set = model.InplaceResultSet({}, n_files + 1, root)
+    result_set.ready.connect(ready_cb)
+
+    start = time.time()
+    result_set.setup()
+    loop.run()
+    elapsed = time.time() - start
+
+    assert len(result_set.find_ids({})) == n_files
+    model._indexes.pop(root, None)
+    return elapsed
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    print('%12s %10s %16s' % ('directories', 'seconds', 'ms per directory'))
+    for n_directories in [largest // 4, largest // 2, largest]:
+        root = tempfile.mkdtemp()
+        try:
+            _create_tree(root, n_directories)
+            elapsed = _scan(root, n_directories)
+        finally:
+            shutil.rmtree(root)
+        print('%12d %10.2f %16.3f' %
+              (n_directories, elapsed, elapsed * 1000 / n_directories))
+
+
+if __name__ == '__main__':
+    main()
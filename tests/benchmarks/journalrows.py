@@ -0,0 +1,111 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure how fast the Journal list model prepares rows.
+
+Generates entries with metadata on a temporary mount point and reports
+the rows per second ListModel returns when a screen of rows is drawn
+again and again, asking for one column of every row at a time like the
+tree view does when it measures its columns. It reports the numbers with
+and without the row cache.
+
+    python3 journalrows.py [number of redraws]
+"""
+
+import json
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+from gi.repository import GLib
+
+from jarabe.journal import listmodel
+from jarabe.journal import model
+
+
+N_ENTRIES = 100
+VISIBLE_ROWS = 25
+
+
+def _create_entries(root):
+    metadata_dir = os.path.join(root, model.JOURNAL_METADATA_DIR)
+    os.mkdir(metadata_dir)
+    buddies = {'1': ['Alice', '#FF0000,#00FF00'],
+               '2': ['Bob', '#0000FF,#FFFF00']}
+    for i in range(N_ENTRIES):
+        file_name = 'entry%d.txt' % i
+        with open(os.path.join(root, file_name), 'w') as f:
+            f.write('%d\n' % i)
+        metadata = {'title': 'Entry <%d> & co' % i,
+                    'mime_type': 'text/plain',
+                    'activity': 'org.laptop.AbiWordActivity',
+                    'icon-color': '#FF0000,#00FF00',
+                    'timestamp': time.time() - i * 3600,
+                    'creation_time': time.time() - i * 7200,
+                    'filesize': i * 1024,
+                    'buddies': json.dumps(buddies)}
+        with open(os.path.join(metadata_dir, file_name + '.metadata'),
+                  'w') as f:
+            json.dump(metadata, f)
+
+
+def _draw(tree_model, redraws):
+    n_columns = tree_model.do_get_n_columns()
+    iterators = [tree_model.get_iter((i, )) for i in range(VISIBLE_ROWS)]
+
+    start = time.time()
+    for redraw_ in range(redraws):
+        for column in range(n_columns):
+            for iterator in iterators:
+                tree_model.do_get_value(iterator, column)
+    return time.time() - start
+
+
+def _load(root):
+    loop = GLib.MainLoop()
+    tree_model = listmodel.ListModel({'mountpoints': [root]})
+    tree_model.connect('ready', lambda tree_model: loop.quit())
+    tree_model.setup()
+    loop.run()
+    return tree_model
+
+
+def main():
+    redraws = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    root = tempfile.mkdtemp()
+    try:
+        _create_entries(root)
+        tree_model = _load(root)
+        cached = _draw(tree_model, redraws)
+        tree_model.stop()
+
+        listmodel.ROW_CACHE_SIZE = 0
+        tree_model = _load(root)
+        uncached = _draw(tree_model, redraws)
+        tree_model.stop()
+    finally:
+        shutil.rmtree(root)
+
+    rows = redraws * VISIBLE_ROWS
+    for name, elapsed in [('without row cache', uncached),
+                          ('with row cache', cached)]:
+        print('%-20s %8.2f s %10.0f rows/s' % (name, elapsed, rows / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure how fast the Journal scans a removable device.
+
+Generates a tree of files and reports the files per second scanned by
+InplaceResultSet handling one file per main loop iteration, handling
+time slices of files, crawling in a thread and reading back its own
+index.
+
+    python3 journalscan.py [number of files]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+from gi.repository import GLib
+
+from jarabe.journal import model
+
+
+FILES_PER_DIRECTORY = 100
+
+
+def _create_tree(root, n_files):
+    for i in range(n_files):
+        dir_path = os.path.join(root, 'dir%d' % (i // FILES_PER_DIRECTORY))
+        if i % FILES_PER_DIRECTORY == 0:
+            os.mkdir(dir_path)
+        with open(os.path.join(dir_path, 'file%d.txt' % i), 'w') as f:
+            f.write('%d\n' % i)
+
+    # Directories modified in the last seconds are not indexed
+    past = time.time() - 60
+    for dir_path, dir_names_, file_names_ in os.walk(root):
+        os.utime(dir_path, (past, past))
+
+
+def _scan(root, n_files, time_slice=model.SCAN_TIME_SLICE, threaded=False):
+    loop = GLib.MainLoop()
+
+    def ready_cb(**kwargs):
+        loop.quit()
+
+    # With a page bigger than the tree, ready is only sent once the scan
+    # is complete
+    result_set = model.InplaceResultSet({}, n_files + 1, root,
+                                        time_slice=time_slice,
+                                        threaded=threaded)
+    result_set.ready.connect(ready_cb)
+
+    start = time.time()
+    result_set.setup()
+    loop.run()
+    elapsed = time.time() - start
+
+    assert len(result_set.find_ids({})) == n_files
+    return elapsed
+
+
+def _drop_index(root):
+    model._indexes.pop(root, None)
+    shutil.rmtree(os.path.join(root, model.JOURNAL_METADATA_DIR),
+                  ignore_errors=True)
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    root = tempfile.mkdtemp()
+    try:
+        _create_tree(root, n_files)
+
+        _drop_index(root)
+        per_file = _scan(root, n_files, time_slice=0)
+        _drop_index(root)
+        sliced = _scan(root, n_files)
+        _drop_index(root)
+        threaded = _scan(root, n_files, threaded=True)
+        indexed = _scan(root, n_files)
+    finally:
+        shutil.rmtree(root)
+
+    print('%d files' % n_files)
+    for name, elapsed in [('one file per iteration', per_file),
+                          ('time sliced', sliced),
+                          ('thread', threaded),
+                          ('time sliced, indexed', indexed)]:
+        print('%-24s %8.2f s %10.0f files/s' %
+              (name, elapsed, n_files / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,509 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Replay presence traces against the neighborhood model.
+
+The Telepathy account manager and connection are replaced by an
+in-process stand-in answering the Contacts, BuddyInfo and
+ActivityProperties queries of jarabe.model.neighborhood from the trace,
+so a classroom joining at once can be measured without a connection
+manager. Reports the events replayed per second, the longest stalls of
+the main loop, the memory used per buddy and the queries sent.
+
+By default a synthetic trace is replayed: the buddies join in groups of
+ten, share the activities and then half of them leave. A trace saved
+with --save, or recorded in the same format, is replayed with --trace.
+The trace is replayed at its own pace unless --speed is given. The
+memory is counted once the trace is replayed, for the buddies still
+online.
+
+    python3 neighborhood.py [--buddies 500] [--activities 20] [--speed 1]
+"""
+
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from gi.repository import GLib
+from gi.repository import GObject
+
+from jarabe.model import buddy
+from jarabe.model import bundleregistry
+from jarabe.model import neighborhood
+from jarabe.model import shell
+from jarabe.model.querybatcher import _BATCH_DELAY
+
+
+_SALUT_PATH = '/org/freedesktop/Telepathy/Account/salut/local_xmpp/bench'
+_GABBLE_PATH = '/org/freedesktop/Telepathy/Account/gabble/jabber/bench'
+_CONNECTION_PATH = '/org/freedesktop/Telepathy/Connection/salut/bench'
+_CHANNEL_PATH = _CONNECTION_PATH + '/subscribe'
+
+_SELF_HANDLE = 1
+_COLORS = ['#FF2B34,#005FE4', '#00A0FF,#F8E800', '#8BFF7A,#AC32FF',
+           '#FF8F00,#00B20D', '#BCCDFF,#F8E800']
+
+# Milliseconds between the checks of the main loop
+_TICK = 10
+# Milliseconds without any query after which the model is settled
+_QUIET_TIME = 4 * _BATCH_DELAY
+
+
+def create_trace(n_buddies, n_activities, leaving=0.5):
+    """Return a trace of a classroom joining and sharing activities"""
+    buddies = {}
+    activities = {}
+    events = []
+
+    for n in range(n_activities):
+        room = 1000 + n
+        activities[room] = {'id': '%040x' % room,
+                            'type': 'org.sugarlabs.Benchmark%d' % (n % 5),
+                            'name': 'Shared activity %d' % n,
+                            'color': _COLORS[n % len(_COLORS)],
+                            'private': False}
+
+    for n in range(n_buddies):
+        handle = _SELF_HANDLE + 1 + n
+        buddies[handle] = {'id': 'buddy%d@bench' % n,
+                           'nick': 'Buddy %d' % n,
+                           'color': _COLORS[n % len(_COLORS)],
+                           'key': '%040x' % handle}
+
+    handles = sorted(buddies)
+    for n in range(0, n_buddies, 10):
+        events.append([n, 'join', handles[n:n + 10]])
+
+    if n_activities:
+        for n, handle in enumerate(handles):
+            room = 1000 + n % n_activities
+            events.append([n + 20, 'activities', [handle, [room]]])
+            events.append([n + 21, 'current', [handle, room]])
+
+    leaving_handles = handles[:int(n_buddies * leaving)]
+    for n in range(0, len(leaving_handles), 10):
+        events.append([n_buddies + 100 + n, 'leave',
+                       leaving_handles[n:n + 10]])
+
+    events.sort(key=lambda event: event[0])
+    return {'buddies': buddies, 'activities': activities, 'events': events}
+
+
+def load_trace(path):
+    with open(path) as f:
+        trace = json.load(f)
+    # The handles are strings in JSON objects
+    for name in ['buddies', 'activities']:
+        trace[name] = dict((int(handle), value)
+                           for handle, value in trace[name].items())
+    return trace
+
+
+class _Interface(object):
+
+    def __init__(self, obj, name):
+        self._obj = obj
+        self._name = name
+
+    def connect_to_signal(self, signal, handler, **kwargs):
+        self._obj.connect_to_signal(signal, handler, dbus_interface=self._name)
+
+    def __getattr__(self, method):
+        def call(*args, **kwargs):
+            kwargs.setdefault('dbus_interface', self._name)
+            return self._obj.call(method, *args, **kwargs)
+        return call
+
+
+class _Object(object):
+    """A D-Bus object, its methods are named after their interface"""
+
+    def __init__(self, bus):
+        self._bus = bus
+        self._receivers = {}
+
+    def connect_to_signal(self, signal, handler, dbus_interface=None,
+                          **kwargs):
+        self._receivers.setdefault((dbus_interface, signal), []).append(
+            handler)
+
+    def emit(self, interface, signal, *args):
+        for handler in self._receivers.get((interface, signal), []):
+            handler(*args)
+
+    def call(self, method, *args, **kwargs):
+        interface = kwargs.get('dbus_interface') or ''
+        name = '%s_%s' % (interface.split('.')[-1], method)
+        if not hasattr(self, name):
+            name = method
+        result = getattr(self, name)(*args)
+        return self._bus.reply(result, kwargs.get('reply_handler'))
+
+
+class _AccountManager(_Object):
+
+    def Properties_Get(self, interface, name):
+        return ([_SALUT_PATH, _GABBLE_PATH], )
+
+
+class _Account(_Object):
+
+    def __init__(self, bus, connection_path):
+        _Object.__init__(self, bus)
+        self._connection_path = connection_path
+
+    def Get(self, *args, **kwargs):
+        return self.call('_Get', *args, **kwargs)
+
+    def Set(self, *args, **kwargs):
+        return self.call('_Set', *args, **kwargs)
+
+    def _Get(self, interface, name):
+        if name == 'Connection':
+            return (self._connection_path, )
+        return ('', )
+
+    def _Set(self, interface, name, value):
+        return ()
+
+
+class _Channel(_Object):
+
+    def Properties_Get(self, interface, name):
+        return ([], )
+
+
+class _Connection(_Object):
+
+    def __init__(self, bus, trace):
+        _Object.__init__(self, bus)
+        self._buddies = trace['buddies']
+        self._activities = trace['activities']
+        self._buddy_activities = {}
+        self._current_activities = {}
+
+    def Connection_GetInterfaces(self):
+        return ([neighborhood.CONNECTION_INTERFACE_BUDDY_INFO,
+                 neighborhood.CONNECTION_INTERFACE_ACTIVITY_PROPERTIES], )
+
+    def Properties_Get(self, interface, name):
+        if name == 'Status':
+            return (neighborhood.CONNECTION_STATUS_CONNECTED, )
+        return (_SELF_HANDLE, )
+
+    def Requests_EnsureChannel(self, properties):
+        return (True, _CHANNEL_PATH, properties)
+
+    def Contacts_GetContactAttributes(self, handles, interfaces, hold):
+        attributes = {}
+        for handle in handles:
+            attributes[handle] = {
+                neighborhood.CONNECTION + '/contact-id':
+                    self._buddies[handle]['id'],
+                neighborhood.CONNECTION_INTERFACE_ALIASING + '/alias':
+                    self._buddies[handle]['nick']}
+        return (attributes, )
+
+    def BuddyInfo_GetProperties(self, handle):
+        return ({'key': self._buddies[handle]['key'].encode(),
+                 'color': self._buddies[handle]['color']}, )
+
+    def BuddyInfo_GetActivities(self, handle):
+        return (self._buddy_activities.get(handle, []), )
+
+    def BuddyInfo_GetCurrentActivity(self, handle):
+        return self._current_activities.get(handle, ('', 0))
+
+    def BuddyInfo_SetCurrentActivity(self, activity_id, room):
+        return ()
+
+    def ActivityProperties_GetProperties(self, room):
+        return (self._activities[room], )
+
+    def replay(self, channel, kind, args):
+        if kind == 'join':
+            channel.emit(neighborhood.CHANNEL_INTERFACE_GROUP,
+                         'MembersChanged', '', args, [], [], [], 0, 0)
+        elif kind == 'activities':
+            handle, rooms = args
+            activities = [(self._activities[room]['id'], room)
+                          for room in rooms]
+            self._buddy_activities[handle] = activities
+            self.emit(neighborhood.CONNECTION_INTERFACE_BUDDY_INFO,
+                      'ActivitiesChanged', handle, activities)
+        elif kind == 'current':
+            handle, room = args
+            current_activity = (self._activities[room]['id'], room)
+            self._current_activities[handle] = current_activity
+            self.emit(neighborhood.CONNECTION_INTERFACE_BUDDY_INFO,
+                      'CurrentActivityChanged', handle, *current_activity)
+        elif kind == 'leave':
+            offline = (neighborhood.CONNECTION_PRESENCE_TYPE_OFFLINE,
+                       'offline', '')
+            for handle in args:
+                self._buddy_activities.pop(handle, None)
+                self._current_activities.pop(handle, None)
+                self.emit(neighborhood.CONNECTION_INTERFACE_BUDDY_INFO,
+                          'ActivitiesChanged', handle, [])
+            self.emit(neighborhood.CONNECTION_INTERFACE_SIMPLE_PRESENCE,
+                      'PresencesChanged',
+                      dict((handle, offline) for handle in args))
+
+
+class _Bus(object):
+    """Answers the queries after latency milliseconds"""
+
+    def __init__(self, trace, latency):
+        self.latency = latency
+        self.pending = 0
+        self.calls = 0
+        self.last_activity = time.time()
+
+        self.connection = _Connection(self, trace)
+        self.channel = _Channel(self)
+        self._objects = {
+            neighborhood.ACCOUNT_MANAGER_PATH: _AccountManager(self),
+            _SALUT_PATH: _Account(self, _CONNECTION_PATH),
+            _GABBLE_PATH: _Account(self, '/'),
+            _CONNECTION_PATH: self.connection,
+            _CHANNEL_PATH: self.channel,
+        }
+
+    def get_object(self, service, path, **kwargs):
+        return self._objects[path]
+
+    def add_signal_receiver(self, *args, **kwargs):
+        pass
+
+    def reply(self, result, reply_handler):
+        self.calls += 1
+        self.last_activity = time.time()
+        if reply_handler is None:
+            return result[0] if len(result) == 1 else result
+        self.pending += 1
+        GLib.timeout_add(self.latency, self.__reply_cb, reply_handler,
+                         result)
+
+    def __reply_cb(self, reply_handler, result):
+        self.pending -= 1
+        self.last_activity = time.time()
+        reply_handler(*result)
+        return False
+
+
+class _DBus(object):
+    """Stands for the dbus module used by jarabe.model.neighborhood"""
+
+    PROPERTIES_IFACE = neighborhood.PROPERTIES_IFACE
+    UInt32 = int
+
+    def __init__(self, bus):
+        self._bus = bus
+
+    def Bus(self):
+        return self._bus
+
+    def Interface(self, obj, interface):
+        return _Interface(obj, interface)
+
+    def Dictionary(self, value, signature=None):
+        return dict(value)
+
+    def Array(self, value, signature=None):
+        return list(value)
+
+
+class _HomeModel(GObject.GObject):
+    __gsignals__ = {
+        'active-activity-changed': (GObject.SignalFlags.RUN_FIRST, None,
+                                    ([object])),
+    }
+
+    def get_active_activity(self):
+        return None
+
+    def add_shared_activity(self, activity_id, color):
+        pass
+
+    def remove_shared_activity(self, activity_id):
+        pass
+
+
+class _Registry(object):
+
+    def get_bundle(self, bundle_id):
+        return bundle_id
+
+
+class _Owner(buddy.BaseBuddyModel):
+
+    def is_owner(self):
+        return True
+
+
+class _Replay(object):
+
+    def __init__(self, trace, latency, speed):
+        self._events = trace['events']
+        self._speed = speed
+        self._bus = _Bus(trace, latency)
+        neighborhood.dbus = _DBus(self._bus)
+
+        self._loop = GLib.MainLoop()
+        self._gaps = []
+        self._last_tick = None
+        self._start = None
+        self._shown = {'buddy': 0, 'activity': 0}
+
+    def _run_until_settled(self):
+        GLib.timeout_add(_QUIET_TIME, self.__settled_cb)
+        self._loop.run()
+
+    def __settled_cb(self):
+        quiet_time = (time.time() - self._bus.last_activity) * 1000
+        if self._bus.pending or quiet_time < _QUIET_TIME or \
+                self._events:
+            return True
+        self._loop.quit()
+        return False
+
+    def __tick_cb(self):
+        now = time.time()
+        self._gaps.append((now - self._last_tick) * 1000 - _TICK)
+        self._last_tick = now
+        return True
+
+    def __event_cb(self, index):
+        event_time, kind, args = self._events[index]
+        self._bus.connection.replay(self._bus.channel, kind, args)
+        if index + 1 < len(self._events):
+            delay = 0
+            if self._speed:
+                delay = (self._events[index + 1][0] - event_time) / \
+                    self._speed
+            GLib.timeout_add(int(delay), self.__event_cb, index + 1)
+        else:
+            self._events = None
+        return False
+
+    def __shown_cb(self, model, item, name):
+        self._shown[name] += 1
+
+    def run(self, trace_memory):
+        events = self._events
+        self._events = None
+        model = neighborhood.Neighborhood()
+        model.connect('buddy-added', self.__shown_cb, 'buddy')
+        model.connect('activity-added', self.__shown_cb, 'activity')
+        self._run_until_settled()
+
+        if trace_memory:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        self._events = events
+        self._last_tick = self._start = time.time()
+        tick_sid = GLib.timeout_add(_TICK, self.__tick_cb)
+        GLib.timeout_add(0, self.__event_cb, 0)
+        self._run_until_settled()
+        GLib.source_remove(tick_sid)
+
+        results = {
+            'elapsed': self._bus.last_activity - self._start,
+            'gaps': sorted(self._gaps),
+            'calls': self._bus.calls,
+            'buddies': len(model.get_buddies()) - 1,
+            'activities': len(model.get_activities()),
+            'shown': self._shown,
+            'queries': model._link_local_account._queries.get_statistics(),
+        }
+        if trace_memory:
+            results['memory'] = tracemalloc.get_traced_memory()[0] - baseline
+            tracemalloc.stop()
+        return results
+
+
+def _count_online(trace):
+    online = set()
+    for event_time, kind, args in trace['events']:
+        if kind == 'join':
+            online.update(args)
+        elif kind == 'leave':
+            online.difference_update(args)
+    return len(online)
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Replay presence traces against the neighborhood model')
+    parser.add_argument('--buddies', type=int, default=500)
+    parser.add_argument('--activities', type=int, default=20)
+    parser.add_argument('--latency', type=int, default=5,
+                        help='milliseconds before a query is answered')
+    parser.add_argument('--speed', type=float, default=1,
+                        help='replay speed of the trace, 0 for as fast as '
+                             'possible')
+    parser.add_argument('--trace', help='replay the trace of this file')
+    parser.add_argument('--save', help='save the synthetic trace to a file')
+    options = parser.parse_args()
+
+    if options.trace:
+        trace = load_trace(options.trace)
+    else:
+        trace = create_trace(options.buddies, options.activities)
+    if options.save:
+        with open(options.save, 'w') as f:
+            json.dump(trace, f)
+
+    shell._model = _HomeModel()
+    bundleregistry._instance = _Registry()
+    buddy._owner_instance = _Owner(nick='Owner')
+
+    results = _Replay(trace, options.latency, options.speed).run(False)
+    memory = _Replay(trace, options.latency, options.speed).run(True)
+
+    n_events = len(trace['events'])
+    gaps = results['gaps']
+    print('%d buddies, %d activities, %d events' % (
+        len(trace['buddies']), len(trace['activities']), n_events))
+    print('%-28s %10.0f' % ('events per second',
+                            n_events / max(results['elapsed'], 1e-6)))
+    print('%-28s %10.1f' % ('replay and queries (ms)',
+                            results['elapsed'] * 1000))
+    print('%-28s %10.1f' % ('longest stall (ms)', max(gaps or [0])))
+    print('%-28s %10.1f' % ('95th percentile stall (ms)',
+                            _percentile(gaps, 95)))
+    print('%-28s %10.0f' % ('memory per buddy (bytes)',
+                            memory['memory'] / max(memory['buddies'], 1)))
+    print('%-28s %10d' % ('buddies left', results['buddies']))
+    print('%-28s %10d' % ('buddies expected', _count_online(trace)))
+    print('%-28s %10d' % ('buddies shown', results['shown']['buddy']))
+    print('%-28s %10d' % ('activities shown', results['shown']['activity']))
+    print('%-28s %10d' % ('D-Bus calls', results['calls']))
+    for name, statistics in sorted(results['queries'].items()):
+        print('  %-26s %10d calls %6d deduplicated' % (
+            name, statistics['calls'], statistics['deduplicated']))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from jarabe.model.activitysearch import ActivitySearchIndex
+
+
+class _Bundle(object):
+    def __init__(self, bundle_id, name, tags=None, summary=None):
+        self._bundle_id = bundle_id
+        self._name = name
+        self._tags = tags
+        self._summary = summary
+
+    def get_bundle_id(self):
+        return self._bundle_id
+
+    def get_name(self):
+        return self._name
+
+    def get_tags(self):
+        return self._tags
+
+    def get_summary(self):
+        return self._summary
+
+
+class TestActivitySearchIndex(unittest.TestCase):
+    def setUp(self):
+        self._index = ActivitySearchIndex()
+        for bundle in [
+                _Bundle('org.laptop.Oficina', 'Paint', ['Art']),
+                _Bundle('org.sugarlabs.MusicPainter', 'MusicPainter',
+                        ['Music', 'Art']),
+                _Bundle('org.laptop.Calculate', 'Calculate', ['Maths'],
+                        'Compute numbers'),
+                _Bundle('org.sugarlabs.Abacus', u'Ábaco')]:
+            self._index.add_bundle(bundle)
+
+    def test_name_prefix_ranks_first(self):
+        self.assertEqual(self._index.search('pai'),
+                         ['org.laptop.Oficina', 'org.sugarlabs.MusicPainter'])
+
+    def test_exact_name(self):
+        self.assertEqual(self._index.search('Paint')[0], 'org.laptop.Oficina')
+
+    def test_fields(self):
+        self.assertEqual(self._index.search('music'),
+                         ['org.sugarlabs.MusicPainter'])
+        self.assertEqual(self._index.search('maths'),
+                         ['org.laptop.Calculate'])
+        self.assertEqual(self._index.search('numb'),
+                         ['org.laptop.Calculate'])
+        self.assertEqual(self._index.search('oficina'),
+                         ['org.laptop.Oficina'])
+
+    def test_all_words_match(self):
+        self.assertEqual(self._index.search('art music'),
+                         ['org.sugarlabs.MusicPainter'])
+        self.assertEqual(self._index.search('art maths'), [])
+
+    def test_normalized(self):
+        self.assertEqual(self._index.search(u'ÁBA'),
+                         ['org.sugarlabs.Abacus'])
+
+    def test_typing(self):
+        self.assertEqual(len(self._index.search('a')), 4)
+        for query in ['c', 'ca', 'cal', 'calc']:
+            self.assertEqual(self._index.search(query)[0],
+                             'org.laptop.Calculate')
+        self.assertEqual(self._index.search('calcx'), [])
+        self.assertEqual(len(self._index.search('a')), 4)
+
+    def test_empty_query(self):
+        self.assertEqual(len(self._index.search('')), 4)
+
+    def test_changes(self):
+        self._index.remove_bundle('org.laptop.Oficina')
+        self.assertEqual(self._index.search('paint'),
+                         ['org.sugarlabs.MusicPainter'])
+        self._index.add_bundle(_Bundle('org.laptop.Oficina', 'Paint'))
+        self.assertEqual(len(self._index.search('paint')), 2)
@@ -0,0 +1,135 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from mock import patch
+
+from sugar3.bundle.helpers import bundle_from_dir
+
+from jarabe.model.bundlecache import BundleCache
+
+tests_dir = os.getcwd()
+data_dir = os.path.join(tests_dir, "data")
+
+
+class TestBundleCache(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._cache_path = os.path.join(self._temp_dir, 'bundle_cache')
+
+        activities_path = os.path.join(self._temp_dir, 'activities')
+        with zipfile.ZipFile(os.path.join(data_dir, 'activity-1.xo')) as xo:
+            xo.extractall(activities_path)
+        self._bundle_path = os.path.join(activities_path,
+                                         os.listdir(activities_path)[0])
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _fail_to_load(self, bundle_path):
+        self.fail('The bundle was parsed again')
+
+    def test_round_trip(self):
+        cache = BundleCache(self._cache_path)
+        cache.load()
+        bundle = cache.get_bundle(self._bundle_path, bundle_from_dir)
+        cache.save()
+        self.assertEqual(cache.misses, 1)
+
+        cache = BundleCache(self._cache_path)
+        cache.load()
+        cached_bundle = cache.get_bundle(self._bundle_path,
+                                         self._fail_to_load)
+        self.assertEqual(cache.hits, 1)
+        self.assertIsInstance(cached_bundle, type(bundle))
+        for getter in ['get_bundle_id', 'get_activity_version', 'get_path',
+                       'get_name', 'get_icon', 'get_installation_time']:
+            self.assertEqual(getattr(cached_bundle, getter)(),
+                             getattr(bundle, getter)())
+        self.assertEqual(cached_bundle.get_bundle_id(),
+                         'org.sugarlabs.MyActivity')
+
+    def test_parsed_on_demand(self):
+        cache = BundleCache(self._cache_path)
+        bundle = cache.get_bundle(self._bundle_path, bundle_from_dir)
+        cache.save()
+
+        loaded = []
+
+        def load_bundle(bundle_path):
+            loaded.append(bundle_path)
+            return bundle_from_dir(bundle_path)
+
+        cache = BundleCache(self._cache_path)
+        cache.load()
+        cached_bundle = cache.get_bundle(self._bundle_path, load_bundle)
+        cached_bundle.get_name()
+        self.assertEqual(loaded, [])
+
+        # The getters that are not cached come from the parsed bundle
+        self.assertEqual(cached_bundle.get_command(), bundle.get_command())
+        self.assertEqual(loaded, [self._bundle_path])
+
+    def test_changed_bundle(self):
+        cache = BundleCache(self._cache_path)
+        cache.get_bundle(self._bundle_path, bundle_from_dir)
+        cache.save()
+
+        info_path = os.path.join(self._bundle_path, 'activity',
+                                 'activity.info')
+        mtime = os.stat(info_path).st_mtime + 10
+        os.utime(info_path, (mtime, mtime))
+
+        cache = BundleCache(self._cache_path)
+        cache.load()
+        cache.get_bundle(self._bundle_path, bundle_from_dir)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 1)
+
+    def test_changed_translation(self):
+        with patch.dict(os.environ, {'LANG': 'es_ES.UTF-8', 'LANGUAGE': ''}):
+            cache = BundleCache(self._cache_path)
+            cache.get_bundle(self._bundle_path, bundle_from_dir)
+            cache.save()
+
+            linfo_dir = os.path.join(self._bundle_path, 'locale', 'es')
+            os.makedirs(linfo_dir)
+            with open(os.path.join(linfo_dir, 'activity.linfo'), 'w') as f:
+                f.write('[Activity]\nname = Mi actividad\n')
+
+            cache = BundleCache(self._cache_path)
+            cache.load()
+            cache.get_bundle(self._bundle_path, bundle_from_dir)
+            self.assertEqual(cache.hits, 0)
+            self.assertEqual(cache.misses, 1)
+
+    def test_removed_bundle(self):
+        cache = BundleCache(self._cache_path)
+        cache.get_bundle(self._bundle_path, bundle_from_dir)
+        cache.save()
+
+        cache = BundleCache(self._cache_path)
+        cache.load()
+        cache.save()
+
+        cache = BundleCache(self._cache_path)
+        cache.load()
+        cache.get_bundle(self._bundle_path, bundle_from_dir)
+        self.assertEqual(cache.misses, 1)
@@ -13,11 +13,14 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
 import shutil
 import tempfile
 import unittest
 import os
 
+from mock import patch
+
 from jarabe.model import bundleregistry
 from sugar3.bundle.helpers import bundle_from_archive
 
@@ -58,3 +61,47 @@ class TestBundleRegistry(unittest.TestCase):
         registry.install(bundle)
         installed_bundle = registry.get_bundle("org.sugarlabs.MyActivity")
         self.assertIsNotNone(installed_bundle)
+
+    def _install_favorite(self):
+        registry = bundleregistry.get_registry()
+        bundle = bundle_from_archive(os.path.join(data_dir, 'activity-1.xo'))
+        registry.install(bundle)
+        bundle_id = 'org.sugarlabs.MyActivity'
+        version = registry.get_bundle(bundle_id).get_activity_version()
+        registry.set_bundle_favorite(bundle_id, version, True)
+        registry.flush_favorites()
+        return registry, bundle_id, version
+
+    def test_favorites_written_on_flush(self):
+        registry, bundle_id, version = self._install_favorite()
+
+        with open(registry.get_favorites_path(0)) as f:
+            favorites = json.load(f)['favorites']
+        key = '%s %s' % (bundle_id, version)
+        self.assertTrue(favorites[key]['favorite'])
+
+    def test_favorites_writes_debounced(self):
+        registry, bundle_id, version = self._install_favorite()
+
+        with patch.object(bundleregistry.tempfile, 'mkstemp',
+                          wraps=tempfile.mkstemp) as mkstemp:
+            for n in range(10):
+                registry.set_bundle_position(bundle_id, version, n, n)
+            registry.flush_favorites()
+            self.assertEqual(mkstemp.call_count, 1)
+
+        self.assertEqual(registry.get_bundle_position(bundle_id, version),
+                         (9, 9))
+
+    def test_favorites_not_written_unchanged(self):
+        registry, bundle_id, version = self._install_favorite()
+
+        with patch.object(bundleregistry.tempfile, 'mkstemp',
+                          wraps=tempfile.mkstemp) as mkstemp:
+            # Nothing pending
+            registry.flush_favorites()
+            # Changes that are undone before the write
+            registry.set_bundle_favorite(bundle_id, version, False)
+            registry.set_bundle_favorite(bundle_id, version, True)
+            registry.flush_favorites()
+            self.assertFalse(mkstemp.called)
@@ -0,0 +1,108 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from jarabe.model import launchtimes
+from jarabe.model.launchtimes import LaunchTimes
+
+BUNDLE_ID = 'org.sugarlabs.MyActivity'
+
+
+class TestLaunchTimes(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._temp_dir, 'launch_times')
+
+    def tearDown(self):
+        shutil.rmtree(self._temp_dir)
+
+    def _launch(self, launch_times, activity_id, main_window):
+        launch_times.start(activity_id, BUNDLE_ID, 100)
+        launch_times.mark(activity_id, launchtimes.LAUNCHER_SHOWN, 100.1)
+        launch_times.mark(activity_id, launchtimes.FIRST_WINDOW,
+                          100 + main_window / 2.)
+        launch_times.mark(activity_id, launchtimes.MAIN_WINDOW,
+                          100 + main_window)
+        launch_times.finish(activity_id)
+
+    def test_percentiles(self):
+        launch_times = LaunchTimes(self._path)
+        for n in range(1, 11):
+            self._launch(launch_times, 'activity%d' % n, n)
+
+        statistics = launch_times.get_statistics()[BUNDLE_ID]
+        self.assertEqual(statistics['launches'], 10)
+        self.assertEqual(statistics['failures'], 0)
+        main_window = statistics['phases'][launchtimes.MAIN_WINDOW]
+        self.assertEqual(main_window['count'], 10)
+        self.assertEqual(main_window['median'], 5000)
+        self.assertEqual(main_window['p90'], 9000)
+        self.assertEqual(main_window['max'], 10000)
+        self.assertNotIn(launchtimes.SERVICE_STARTED, statistics['phases'])
+
+    def test_first_mark(self):
+        launch_times = LaunchTimes(self._path)
+        launch_times.start('activity', BUNDLE_ID, 100)
+        launch_times.mark('activity', launchtimes.FIRST_WINDOW, 101)
+        launch_times.mark('activity', launchtimes.FIRST_WINDOW, 102)
+        launch_times.finish('activity')
+
+        # Launches that were not started are not recorded
+        launch_times.mark('unknown', launchtimes.FIRST_WINDOW, 101)
+        launch_times.finish('unknown')
+
+        statistics = launch_times.get_statistics()
+        self.assertEqual(list(statistics.keys()), [BUNDLE_ID])
+        first_window = statistics[BUNDLE_ID]['phases'][
+            launchtimes.FIRST_WINDOW]
+        self.assertEqual(first_window['max'], 1000)
+
+    def test_rolling_samples(self):
+        launch_times = LaunchTimes(self._path)
+        for n in range(launchtimes._SAMPLES + 10):
+            self._launch(launch_times, 'activity%d' % n, 100 - n)
+
+        statistics = launch_times.get_statistics()[BUNDLE_ID]
+        self.assertEqual(statistics['launches'], launchtimes._SAMPLES + 10)
+        main_window = statistics['phases'][launchtimes.MAIN_WINDOW]
+        self.assertEqual(main_window['count'], launchtimes._SAMPLES)
+        self.assertEqual(main_window['max'], 90000)
+
+    def test_round_trip(self):
+        launch_times = LaunchTimes(self._path)
+        self._launch(launch_times, 'activity', 2)
+        launch_times.start('failed', BUNDLE_ID, 100)
+        launch_times.fail('failed')
+        launch_times.save()
+
+        loaded = LaunchTimes(self._path)
+        loaded.load()
+        self.assertEqual(loaded.get_statistics(),
+                         launch_times.get_statistics())
+        self.assertEqual(loaded.get_statistics()[BUNDLE_ID]['failures'], 1)
+        self.assertIn(BUNDLE_ID, loaded.format_statistics())
+
+    def test_flush(self):
+        launch_times = LaunchTimes(self._path)
+        launch_times.flush()
+        self.assertFalse(os.path.exists(self._path))
+
+        self._launch(launch_times, 'activity', 2)
+        launch_times.flush()
+        self.assertTrue(os.path.exists(self._path))
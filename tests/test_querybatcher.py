@@ -0,0 +1,193 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from gi.repository import GLib
+
+from jarabe.model.querybatcher import QueryBatcher
+
+
+class _Method(object):
+    """Replies asynchronously with the arguments it was called with"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self._fail = fail
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self._fail:
+            GLib.idle_add(kwargs['error_handler'], 'error')
+        else:
+            GLib.idle_add(kwargs['reply_handler'], args)
+
+
+class TestQueryBatcher(unittest.TestCase):
+    def setUp(self):
+        self._batcher = QueryBatcher(delay=1)
+        self._replies = []
+        self._errors = []
+
+    def _reply_cb(self, *args):
+        self._replies.append(args)
+
+    def _error_cb(self, error):
+        self._errors.append(error)
+
+    def _run(self):
+        loop = GLib.MainLoop()
+        GLib.timeout_add(50, loop.quit)
+        loop.run()
+
+    def test_deduplicate(self):
+        method = _Method()
+        for handle in [1, 2, 1, 1]:
+            self._batcher.call('GetProperties', method, [handle],
+                               self._reply_cb, self._error_cb, timeout=5)
+        self._run()
+
+        self.assertEqual(len(method.calls), 2)
+        self.assertEqual(method.calls[0][1]['timeout'], 5)
+        self.assertEqual(sorted(self._replies),
+                         [((1, ), ), ((1, ), ), ((1, ), ), ((2, ), )])
+
+        statistics = self._batcher.get_statistics()['GetProperties']
+        self.assertEqual(statistics['calls'], 2)
+        self.assertEqual(statistics['deduplicated'], 2)
+        self.assertEqual(statistics['in_flight'], 0)
+
+    def test_deduplicate_in_flight(self):
+        calls = []
+
+        def method(*args, **kwargs):
+            calls.append(kwargs['reply_handler'])
+
+        self._batcher.call('GetProperties', method, [1],
+                           self._reply_cb, self._error_cb)
+        self._run()
+        self._batcher.call('GetProperties', method, [1],
+                           self._reply_cb, self._error_cb)
+        self._run()
+        self.assertEqual(len(calls), 1)
+
+        calls[0]('properties')
+        self.assertEqual(self._replies, [('properties', )] * 2)
+        statistics = self._batcher.get_statistics()['GetProperties']
+        self.assertEqual(statistics['in_flight'], 0)
+
+    def test_refresh(self):
+        calls = []
+
+        def method(*args, **kwargs):
+            calls.append(kwargs['reply_handler'])
+
+        self._batcher.call('GetCurrentActivity', method, [1],
+                           self._reply_cb, self._error_cb)
+        self._run()
+        self._batcher.call('GetCurrentActivity', method, [1],
+                           self._reply_cb, self._error_cb, refresh=True)
+        self._batcher.call('GetCurrentActivity', method, [1],
+                           self._reply_cb, self._error_cb, refresh=True)
+        self._run()
+        self.assertEqual(len(calls), 2)
+
+        calls[0]('old')
+        calls[1]('new')
+        self.assertEqual(self._replies, [('old', ), ('new', ), ('new', )])
+        statistics = self._batcher.get_statistics()['GetCurrentActivity']
+        self.assertEqual(statistics['deduplicated'], 1)
+        self.assertEqual(statistics['in_flight'], 0)
+
+    def test_bulk(self):
+        method = _Method()
+        self._batcher.call_bulk('GetContactAttributes', method, [1, 2],
+                                ['interfaces', False],
+                                self._reply_cb, self._error_cb)
+        self._batcher.call_bulk('GetContactAttributes', method, [2, 3],
+                                ['interfaces', False],
+                                self._reply_cb, self._error_cb)
+        self._run()
+
+        self.assertEqual(len(method.calls), 1)
+        self.assertEqual(method.calls[0][0], ([1, 2, 3], 'interfaces', False))
+        self.assertEqual(len(self._replies), 1)
+
+    def test_bulk_handlers(self):
+        method = _Method()
+        other_replies = []
+        self._batcher.call_bulk('GetContactAttributes', method, [1],
+                                [['interfaces'], False],
+                                self._reply_cb, self._error_cb)
+        self._batcher.call_bulk('GetContactAttributes', method, [2],
+                                [['interfaces'], False],
+                                other_replies.append, self._error_cb)
+        self._batcher.call_bulk('GetContactAttributes', method, [3],
+                                [['other'], False],
+                                self._reply_cb, self._error_cb)
+        self._run()
+
+        self.assertEqual(len(method.calls), 2)
+        self.assertEqual(method.calls[0][0], ([1, 2], ['interfaces'], False))
+        self.assertEqual(method.calls[1][0], ([3], ['other'], False))
+        self.assertEqual(sorted(self._replies),
+                         [(([1, 2], ['interfaces'], False), ),
+                          (([3], ['other'], False), )])
+        self.assertEqual(other_replies, [([1, 2], ['interfaces'], False)])
+
+    def test_error(self):
+        method = _Method(fail=True)
+        self._batcher.call('GetActivities', method, [1],
+                           self._reply_cb, self._error_cb)
+        self._batcher.call('GetActivities', method, [1],
+                           self._reply_cb, self._error_cb)
+        self._run()
+
+        self.assertEqual(self._errors, ['error', 'error'])
+        self.assertEqual(self._replies, [])
+        statistics = self._batcher.get_statistics()['GetActivities']
+        self.assertEqual(statistics['in_flight'], 0)
+
+    def test_cancel(self):
+        method = _Method()
+        self._batcher.call('GetActivities', method, [1],
+                           self._reply_cb, self._error_cb)
+        self._batcher.cancel()
+        self._run()
+
+        self.assertEqual(method.calls, [])
+        self.assertEqual(self._replies, [])
+
+    def test_cancel_in_flight(self):
+        calls = []
+
+        def method(*args, **kwargs):
+            calls.append(kwargs['reply_handler'])
+
+        self._batcher.call('GetActivities', method, [1],
+                           self._reply_cb, self._error_cb)
+        self._run()
+        self._batcher.cancel()
+        self._batcher.call('GetActivities', method, [1],
+                           self._reply_cb, self._error_cb)
+        self._run()
+        self.assertEqual(len(calls), 2)
+
+        calls[0]('cancelled')
+        self.assertEqual(self._replies, [])
+        calls[1]('activities')
+        self.assertEqual(self._replies, [('activities', )])
+        statistics = self._batcher.get_statistics()['GetActivities']
+        self.assertEqual(statistics['in_flight'], 0)
@@ -0,0 +1,101 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import unittest
+
+from jarabe.journal.querymatcher import QueryMatcher
+
+
+PATH = '/media/USB/Drawings/Sunset.png'
+PROPERTIES = {'title': 'Sunset at the beach',
+              'description': 'Painted with my friends',
+              'tags': 'summer holidays',
+              'fulltext': 'the sun goes down'}
+
+QUERIES = ['sunset', 'SUNSET', 'drawings sunset', 'beach',
+           'friends painted', 'summer', 'goes down', 'sun', 'moon',
+           'sunset moon', 'beach friends', 'png', 'media', 'sunset  beach',
+           ' sunset']
+
+
+def _legacy_match(query_text, path, properties):
+    # How InplaceResultSet matched words before QueryMatcher
+    expression = ''
+    for word in query_text.split(' '):
+        expression += '(?=.*%s.*)' % word
+    regex = re.compile(expression, re.IGNORECASE)
+
+    if regex.match(path):
+        return True
+    if properties is None:
+        return False
+    for f in ['fulltext', 'title', 'description', 'tags']:
+        if f in properties and regex.match(properties[f]):
+            return True
+    return False
+
+
+class TestQueryMatcher(unittest.TestCase):
+
+    def _properties_cb(self):
+        self._properties_read += 1
+        return PROPERTIES
+
+    def setUp(self):
+        self._properties_read = 0
+
+    def test_legacy_semantics(self):
+        for query in QUERIES:
+            for properties in [PROPERTIES, None]:
+                matcher = QueryMatcher(query)
+                self.assertEqual(
+                    matcher.match(PATH, lambda: properties),
+                    _legacy_match(query, PATH, properties), query)
+
+    def test_path_match_skips_metadata(self):
+        matcher = QueryMatcher('sunset png')
+        self.assertTrue(matcher.match(PATH, self._properties_cb))
+        self.assertEqual(self._properties_read, 0)
+
+        matcher = QueryMatcher('summer')
+        self.assertTrue(matcher.match(PATH, self._properties_cb))
+        self.assertEqual(self._properties_read, 1)
+
+    def test_words_in_the_same_property(self):
+        matcher = QueryMatcher('beach summer')
+        self.assertFalse(matcher.match(PATH, self._properties_cb))
+
+    def test_phrase(self):
+        self.assertTrue(QueryMatcher('"at the beach"').match_text(
+            PROPERTIES['title']))
+        self.assertFalse(QueryMatcher('"the beach at"').match_text(
+            PROPERTIES['title']))
+        self.assertTrue(QueryMatcher('"SUNSET AT"').match(
+            PATH, self._properties_cb))
+
+    def test_special_characters(self):
+        self.assertTrue(QueryMatcher('c++').match_text('Learning C++'))
+        self.assertFalse(QueryMatcher('a.c').match_text('abc'))
+
+    def test_empty(self):
+        self.assertTrue(QueryMatcher('').is_empty())
+        self.assertTrue(QueryMatcher('   ').is_empty())
+        self.assertFalse(QueryMatcher('"').is_empty())
+
+    def test_properties_not_text(self):
+        matcher = QueryMatcher('1')
+        self.assertFalse(matcher.match(PATH, lambda: {'title': 1,
+                                                      'tags': ['1']}))
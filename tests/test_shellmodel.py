@@ -0,0 +1,190 @@
+# Copyright (C) 2026 Sugar Labs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from mock import patch, MagicMock
+
+from jarabe.model import shell
+
+
+ACTIVITIES = 300
+BUNDLES = 10
+
+
+class FakeWindow(object):
+    def __init__(self, xid, window_type):
+        self._xid = xid
+        self._window_type = window_type
+
+    def get_xid(self):
+        return self._xid
+
+    def get_window_type(self):
+        return self._window_type
+
+    def get_transient(self):
+        return None
+
+    def connect(self, signal, callback):
+        pass
+
+    def maximize(self):
+        pass
+
+    def close(self, timestamp):
+        pass
+
+
+class FakeActivityInfo(object):
+    def __init__(self, bundle_id, single_instance=False):
+        self._bundle_id = bundle_id
+        self._single_instance = single_instance
+
+    def get_bundle_id(self):
+        return self._bundle_id
+
+    def get_name(self):
+        return 'Activity %s' % self._bundle_id
+
+    def get_single_instance(self):
+        return self._single_instance
+
+
+class TestShellModel(unittest.TestCase):
+    def setUp(self):
+        self._window_properties = {}
+        self._patchers = [
+            patch('jarabe.model.shell.Wnck'),
+            patch('jarabe.model.shell.Gio'),
+            patch('jarabe.model.shell.Gdk'),
+            patch('jarabe.model.shell.GdkX11'),
+            patch('jarabe.model.shell.dbus'),
+            patch('jarabe.model.shell.profile'),
+            patch('jarabe.model.shell.SugarExt'),
+            patch('jarabe.model.shell.get_registry'),
+        ]
+        mocks = [patcher.start() for patcher in self._patchers]
+        self._wnck, gio_, gdk_, gdkx11_, dbus_, profile_, sugarext, \
+            registry = mocks
+
+        self._wnck.Screen.get_default.return_value.get_windows_stacked = \
+            self._get_windows_stacked
+        sugarext.wm_get_activity_id = \
+            lambda xid: self._window_properties[xid][0]
+        sugarext.wm_get_bundle_id = \
+            lambda xid: self._window_properties[xid][1]
+        registry.return_value.get_bundle = FakeActivityInfo
+
+        self._model = shell.ShellModel()
+        shell._model = self._model
+        self._windows = []
+
+    def tearDown(self):
+        shell._model = None
+        for patcher in self._patchers:
+            patcher.stop()
+
+    def _get_windows_stacked(self):
+        return list(self._windows)
+
+    def _open_window(self, xid, activity_id, bundle_id):
+        window = FakeWindow(xid, self._wnck.WindowType.NORMAL)
+        self._window_properties[xid] = (activity_id, bundle_id)
+        self._windows.append(window)
+        self._model._window_opened_cb(None, window)
+        return window
+
+    def _close_window(self, window):
+        self._windows.remove(window)
+        self._model._window_closed_cb(None, window)
+
+    def _open_activities(self):
+        windows = []
+        for n in range(ACTIVITIES):
+            windows.append(self._open_window(
+                1000 + n, 'activity%d' % n, 'org.sugarlabs.Bundle%d' %
+                (n % BUNDLES)))
+            # Some activities have a second window, like a dialog
+            if n % 3 == 0:
+                windows.append(self._open_window(
+                    5000 + n, 'activity%d' % n, 'org.sugarlabs.Bundle%d' %
+                    (n % BUNDLES)))
+        return windows
+
+    def test_lookups(self):
+        self._open_activities()
+        self.assertEqual(len(self._model), ACTIVITIES)
+
+        for n in range(ACTIVITIES):
+            activity = self._model.get_activity_by_id('activity%d' % n)
+            self.assertEqual(activity.get_activity_id(), 'activity%d' % n)
+            self.assertIs(self._model._get_activity_by_xid(1000 + n),
+                          activity)
+            if n % 3 == 0:
+                self.assertIs(self._model._get_activity_by_xid(5000 + n),
+                              activity)
+        self.assertIsNone(self._model.get_activity_by_id('unknown'))
+        self.assertIsNone(self._model._get_activity_by_xid(1))
+
+        self.assertEqual(
+            self._model.get_name_from_bundle_id('org.sugarlabs.Bundle3'),
+            'Activity org.sugarlabs.Bundle3')
+        self.assertEqual(
+            self._model.get_name_from_bundle_id('org.sugarlabs.Unknown'), '')
+
+    def test_close_windows(self):
+        windows = self._open_activities()
+
+        # Closing the second window keeps the activity
+        for window in windows:
+            if window.get_xid() >= 5000:
+                self._close_window(window)
+        self.assertEqual(len(self._model), ACTIVITIES)
+        self.assertIsNone(self._model._get_activity_by_xid(5000))
+        self.assertIsNotNone(self._model._get_activity_by_xid(1000))
+
+        for window in list(self._windows):
+            self._close_window(window)
+        self.assertEqual(len(self._model), 0)
+        self.assertEqual(self._model._activities_by_xid, {})
+        self.assertEqual(self._model._activities_by_id, {})
+        self.assertEqual(self._model._activities_by_bundle_id, {})
+
+    def test_remove_active_activity(self):
+        self._open_activities()
+        active = self._model.get_activity_by_id('activity0')
+        self.assertIs(self._model.get_active_activity(), active)
+
+        # The activity of the window at the top of the stack is activated
+        self._close_window(self._windows[1])
+        self._close_window(self._windows[0])
+        self.assertIs(self._model.get_active_activity(),
+                      self._model.get_activity_by_id(
+                          'activity%d' % (ACTIVITIES - 1)))
+
+    def test_can_launch_activity_instance(self):
+        self._open_activities()
+        single = FakeActivityInfo('org.sugarlabs.Bundle1',
+                                  single_instance=True)
+        self.assertFalse(self._model.can_launch_activity_instance(single))
+
+        other = FakeActivityInfo('org.sugarlabs.Unknown',
+                                 single_instance=True)
+        self.assertTrue(self._model.can_launch_activity_instance(other))
+
+        many = MagicMock()
+        many.get_single_instance.return_value = False
+        self.assertTrue(self._model.can_launch_activity_instance(many))